@@ -0,0 +1,12 @@
+"""
+Benchmarks for the timetable hot paths.
+
+Run `python -m benchmarks` from the project root to time them against a
+generated school and print JSON results; see `python -m benchmarks --help`.
+"""
+
+from benchmarks.generator import SchoolConfig, School, generate_school
+from benchmarks.harness import BENCHMARKS, run_benchmarks, compare_results
+
+__all__ = ["SchoolConfig", "School", "generate_school",
+           "BENCHMARKS", "run_benchmarks", "compare_results"]
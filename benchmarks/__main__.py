@@ -0,0 +1,57 @@
+"""
+Command line for the benchmarks.
+
+    python -m benchmarks --classes 200 --teachers 500 --output after.json
+    python -m benchmarks --compare before.json --output after.json
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.generator import SchoolConfig
+from benchmarks.harness import BENCHMARKS, run_benchmarks, compare_results
+
+
+def main(argv=None) -> int:
+    defaults = SchoolConfig()
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Time the timetable hot paths.")
+    for name in ("classes", "teachers", "subjects", "rooms", "days", "periods", "seed"):
+        parser.add_argument(f"--{name}", type=int, default=getattr(defaults, name))
+    parser.add_argument("--density", type=float, default=defaults.density)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS),
+                        help="run only this benchmark (may be repeated)")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="compare with earlier results; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown as a fraction (default: 0.10)")
+    args = parser.parse_args(argv)
+    
+    try:
+        config = SchoolConfig(args.classes, args.teachers, args.subjects, args.rooms,
+                              args.days, args.periods, args.density, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    results = run_benchmarks(config, args.repeat, args.only)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+        
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare_results(baseline, results, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
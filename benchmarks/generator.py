@@ -0,0 +1,123 @@
+"""
+Synthetic School Generator
+Builds realistic, conflict-free schools of any size from a seed, for
+benchmarking.
+"""
+
+import random
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List
+
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+
+
+@dataclass
+class SchoolConfig:
+    """Size and shape of a generated school."""
+    classes: int = 60
+    teachers: int = 150
+    subjects: int = 12
+    rooms: int = 70
+    days: int = 5
+    periods: int = 7
+    # Share of each class's weekly slots that get a lesson
+    density: float = 0.85
+    seed: int = 0
+    
+    def __post_init__(self):
+        if not 1 <= self.days <= len(DayOfWeek):
+            raise ValueError(f"days must be between 1 and {len(DayOfWeek)}")
+        if not 0 <= self.density <= 1:
+            raise ValueError("density must be between 0 and 1")
+        if min(self.classes, self.teachers, self.subjects, self.periods) < 1:
+            raise ValueError("classes, teachers, subjects and periods must be at least 1")
+            
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class School:
+    """Reference data and conflict-free lessons of a generated school."""
+    config: SchoolConfig
+    subjects: List[Subject] = field(default_factory=list)
+    teachers: List[Teacher] = field(default_factory=list)
+    classes: List[SchoolClass] = field(default_factory=list)
+    time_slots: List[TimeSlot] = field(default_factory=list)
+    entries: List[TimetableEntry] = field(default_factory=list)
+    
+    def timetable(self, with_entries: bool = True) -> Timetable:
+        """A new Timetable holding the school, with or without its lessons."""
+        timetable = Timetable()
+        for subject in self.subjects:
+            timetable.add_subject(subject)
+        for teacher in self.teachers:
+            timetable.add_teacher(teacher)
+        for school_class in self.classes:
+            timetable.add_class(school_class)
+        for time_slot in self.time_slots:
+            timetable.add_time_slot(time_slot)
+        if with_entries:
+            timetable.add_entries(self.entries)
+        return timetable
+
+
+def generate_school(config: SchoolConfig = None) -> School:
+    """
+    Generate a school. The same config (including seed) always gives the
+    same school.
+    
+    Teachers are qualified in one or two subjects, spread so every subject
+    has teachers. Each class gets lessons in about density of its weekly
+    slots; a lesson goes to a free qualified teacher and, when one is free,
+    a room. Slots where no teacher is free stay empty, so very dense
+    configurations with few teachers come out sparser than asked.
+    """
+    config = config or SchoolConfig()
+    rng = random.Random(config.seed)
+    school = School(config)
+    
+    school.subjects = [Subject(f"S{i:02}", f"Subject {i}") for i in range(config.subjects)]
+    codes = [subject.code for subject in school.subjects]
+    for i in range(config.teachers):
+        qualified = [codes[i % len(codes)]]
+        if len(codes) > 1 and rng.random() < 0.4:
+            qualified.append(rng.choice([c for c in codes if c != qualified[0]]))
+        school.teachers.append(Teacher(f"T{i:04}", f"Teacher {i}", qualified))
+    school.classes = [SchoolClass(f"C{i:04}", f"Class {i}", rng.randint(18, 32))
+                      for i in range(config.classes)]
+    school.time_slots = [TimeSlot(p, f"{7 + p:02}:00", f"{7 + p:02}:50")
+                         for p in range(1, config.periods + 1)]
+    rooms = [f"R{i:03}" for i in range(config.rooms)]
+    
+    by_subject: Dict[str, List[str]] = {code: [] for code in codes}
+    for teacher in school.teachers:
+        for code in teacher.subjects:
+            by_subject[code].append(teacher.id)
+            
+    days = list(DayOfWeek)[:config.days]
+    slots = [(day, time_slot) for day in days for time_slot in school.time_slots]
+    lessons_per_class = round(config.density * len(slots))
+    busy_teachers = {slot: set() for slot in range(len(slots))}
+    busy_rooms = {slot: set() for slot in range(len(slots))}
+    for school_class in school.classes:
+        for slot in sorted(rng.sample(range(len(slots)), lessons_per_class)):
+            day, time_slot = slots[slot]
+            code = rng.choice(codes)
+            free = [t for t in by_subject[code] if t not in busy_teachers[slot]]
+            if not free:
+                continue
+            teacher_id = rng.choice(free)
+            busy_teachers[slot].add(teacher_id)
+            room = None
+            if len(busy_rooms[slot]) < len(rooms):
+                room = rng.choice(rooms)
+                while room in busy_rooms[slot]:
+                    room = rng.choice(rooms)
+                busy_rooms[slot].add(room)
+            school.entries.append(TimetableEntry(day, time_slot, school_class.id,
+                                                 code, teacher_id, room))
+    return school
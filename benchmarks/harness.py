@@ -0,0 +1,203 @@
+"""
+Benchmark Harness
+Times the timetable hot paths against a generated school and produces
+JSON-friendly results that can be compared between commits.
+"""
+
+import gc
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from timetable import DayOfWeek, TimetableEntry
+from storage import TimetableStore
+from benchmarks.generator import School, SchoolConfig, generate_school
+
+
+# A benchmark setup takes the school and returns (state, timed function,
+# number of operations it performs), optionally followed by a cleanup
+# function. The timed function is called with the state, or with a fresh
+# result of the state if the state is a factory.
+Setup = Callable[[School], tuple]
+BENCHMARKS: Dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Register a benchmark setup function under a name."""
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@benchmark("add_entry")
+def _add_entry(school: School):
+    def run(timetable):
+        for entry in school.entries:
+            timetable.add_entry(entry)
+    # A fresh empty timetable for every repetition
+    return (lambda: school.timetable(with_entries=False)), run, len(school.entries)
+
+
+@benchmark("add_entries")
+def _add_entries(school: School):
+    return (lambda: school.timetable(with_entries=False)), \
+        (lambda timetable: timetable.add_entries(school.entries)), len(school.entries)
+
+
+@benchmark("has_conflict")
+def _has_conflict(school: School):
+    timetable = school.timetable()
+    # Every stored entry (all clash) and the same lessons moved a period on
+    slots = school.time_slots
+    next_slot = {slot.period: slots[(i + 1) % len(slots)] for i, slot in enumerate(slots)}
+    probes = list(school.entries)
+    for entry in school.entries:
+        probes.append(TimetableEntry(entry.day, next_slot[entry.time_slot.period], entry.class_id,
+                                     entry.subject_code, entry.teacher_id, entry.room))
+                                     
+    def run(_):
+        has_conflict = timetable.has_conflict
+        for probe in probes:
+            has_conflict(probe)
+    return None, run, len(probes)
+
+
+@benchmark("validate")
+def _validate(school: School):
+    timetable = school.timetable()
+    return None, (lambda _: timetable.validate()), len(school.entries)
+
+
+@benchmark("get_entries_for_class")
+def _entries_for_class(school: School):
+    timetable = school.timetable()
+    ids = list(timetable.classes)
+    return None, (lambda _: [timetable.get_entries_for_class(i) for i in ids]), len(ids)
+
+
+@benchmark("get_entries_for_teacher")
+def _entries_for_teacher(school: School):
+    timetable = school.timetable()
+    ids = list(timetable.teachers)
+    return None, (lambda _: [timetable.get_entries_for_teacher(i) for i in ids]), len(ids)
+
+
+@benchmark("get_entries_for_day")
+def _entries_for_day(school: School):
+    timetable = school.timetable()
+    days = list(DayOfWeek)
+    return None, (lambda _: [timetable.get_entries_for_day(d) for d in days]), len(days)
+
+
+@benchmark("display_class_timetable")
+def _display_class(school: School):
+    timetable = school.timetable()
+    ids = list(timetable.classes)
+    return None, (lambda _: [timetable.display_class_timetable(i) for i in ids]), len(ids)
+
+
+@benchmark("display_teacher_timetable")
+def _display_teacher(school: School):
+    timetable = school.timetable()
+    ids = list(timetable.teachers)
+    return None, (lambda _: [timetable.display_teacher_timetable(i) for i in ids]), len(ids)
+
+
+@benchmark("storage_save")
+def _storage_save(school: School):
+    timetable = school.timetable()
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench.db")
+    
+    def run(_):
+        with TimetableStore(path) as store:
+            store.save(timetable)
+    return None, run, len(school.entries), lambda: shutil.rmtree(directory)
+
+
+@benchmark("storage_load")
+def _storage_load(school: School):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench.db")
+    with TimetableStore(path) as store:
+        store.save(school.timetable())
+        
+    def run(_):
+        with TimetableStore(path) as store:
+            store.load()
+    return None, run, len(school.entries), lambda: shutil.rmtree(directory)
+
+
+def _time(setup: Setup, school: School, repeat: int) -> Tuple[List[float], int]:
+    prepared = setup(school)
+    state, run, ops = prepared[:3]
+    cleanup = prepared[3] if len(prepared) > 3 else None
+    timings = []
+    try:
+        for _ in range(repeat):
+            argument = state() if callable(state) else state
+            gc.collect()
+            start = time.perf_counter()
+            run(argument)
+            timings.append(time.perf_counter() - start)
+    finally:
+        if cleanup is not None:
+            cleanup()
+    return timings, ops
+
+
+def run_benchmarks(config: Optional[SchoolConfig] = None, repeat: int = 5,
+                   only: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Run the benchmarks (all, or the names in only) repeat times each and
+    return a JSON-serialisable result: the environment, the school config
+    and, per benchmark, the best and median time, the number of operations
+    and the best time per operation in microseconds.
+    """
+    config = config or SchoolConfig()
+    names = list(only) if only is not None else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"unknown benchmarks: {', '.join(unknown)}")
+    school = generate_school(config)
+    results = {}
+    for name in names:
+        timings, ops = _time(BENCHMARKS[name], school, repeat)
+        best = min(timings)
+        results[name] = {
+            "best": best,
+            "median": statistics.median(timings),
+            "ops": ops,
+            "us_per_op": best / ops * 1e6 if ops else 0.0,
+        }
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": config.to_dict(),
+        "entries": len(school.entries),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[str]:
+    """
+    Benchmarks whose best time in current is more than threshold (a
+    fraction) slower than in baseline, as human-readable lines.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None or before["best"] <= 0:
+            continue
+        ratio = result["best"] / before["best"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {before['best'] * 1e3:.2f} ms -> "
+                               f"{result['best'] * 1e3:.2f} ms ({ratio:.2f}x)")
+    return regressions
@@ -0,0 +1,154 @@
+"""
+Columnar Entry Table
+Compact, array-backed storage for large numbers of timetable entries,
+such as multi-year archives. Entries are held as small integer codes in
+parallel arrays and turned back into TimetableEntry objects on demand.
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from timetable import Timetable, TimetableEntry, TimeSlot, DayOfWeek
+
+
+class InternTable:
+    """Two-way mapping between values and dense integer codes."""
+    
+    def __init__(self):
+        self.values: List = []
+        self.codes: Dict = {}
+        
+    def code(self, value) -> int:
+        """Code for a value, assigning the next free code to new values."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+        
+    def find(self, value) -> Optional[int]:
+        """Code for a value, or None if it has never been seen."""
+        return self.codes.get(value)
+        
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class EntryTable:
+    """
+    Timetable entries stored column by column.
+    
+    Each entry costs one byte for the day plus four bytes each for the
+    period, class, subject, teacher and room codes (-1 for no room), about
+    21 bytes instead of a TimetableEntry object. Identifiers and time slots
+    are interned, so each distinct value is stored once however many
+    entries use it.
+    """
+    
+    def __init__(self, entries: Iterable[TimetableEntry] = ()):
+        self.days = array("B")
+        self.periods = array("i")
+        self.class_codes = array("i")
+        self.subject_codes = array("i")
+        self.teacher_codes = array("i")
+        self.room_codes = array("i")
+        self.time_slot_keys = InternTable()
+        self.time_slots: List[TimeSlot] = []
+        self.class_ids = InternTable()
+        self.subject_ids = InternTable()
+        self.teacher_ids = InternTable()
+        self.rooms = InternTable()
+        self._days = list(DayOfWeek)
+        self.extend(entries)
+        
+    @classmethod
+    def from_timetable(cls, timetable: Timetable) -> "EntryTable":
+        """Copy every entry of a timetable into a new table."""
+        return cls(timetable.entries)
+        
+    def append(self, entry: TimetableEntry) -> None:
+        """Add an entry at the end of the table."""
+        self.days.append(entry.day.value)
+        self.periods.append(self._slot_code(entry.time_slot))
+        self.class_codes.append(self.class_ids.code(entry.class_id))
+        self.subject_codes.append(self.subject_ids.code(entry.subject_code))
+        self.teacher_codes.append(self.teacher_ids.code(entry.teacher_id))
+        self.room_codes.append(-1 if entry.room is None else self.rooms.code(entry.room))
+        
+    def extend(self, entries: Iterable[TimetableEntry]) -> None:
+        """Add entries at the end of the table."""
+        for entry in entries:
+            self.append(entry)
+            
+    def _slot_code(self, time_slot: TimeSlot) -> int:
+        # TimeSlot is an unhashable dataclass, so intern it by its fields
+        key = (time_slot.period, time_slot.start_time, time_slot.end_time)
+        code = self.time_slot_keys.find(key)
+        if code is None:
+            code = self.time_slot_keys.code(key)
+            self.time_slots.append(time_slot)
+        return code
+        
+    def __len__(self) -> int:
+        return len(self.days)
+        
+    def __getitem__(self, index: int) -> TimetableEntry:
+        """Build a TimetableEntry view of the entry at index."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("entry index out of range")
+        room = self.room_codes[index]
+        return TimetableEntry(
+            self._days[self.days[index]],
+            self.time_slots[self.periods[index]],
+            self.class_ids.values[self.class_codes[index]],
+            self.subject_ids.values[self.subject_codes[index]],
+            self.teacher_ids.values[self.teacher_codes[index]],
+            None if room < 0 else self.rooms.values[room],
+        )
+        
+    def __iter__(self) -> Iterator[TimetableEntry]:
+        for index in range(len(self)):
+            yield self[index]
+            
+    def _matching(self, column: array, code: Optional[int]) -> List[int]:
+        if code is None:
+            return []
+        return [i for i, value in enumerate(column) if value == code]
+        
+    def indexes_for_class(self, class_id: str) -> List[int]:
+        """Positions of the entries of a class."""
+        return self._matching(self.class_codes, self.class_ids.find(class_id))
+        
+    def indexes_for_teacher(self, teacher_id: str) -> List[int]:
+        """Positions of the entries of a teacher."""
+        return self._matching(self.teacher_codes, self.teacher_ids.find(teacher_id))
+        
+    def entries_for_class(self, class_id: str) -> List[TimetableEntry]:
+        """TimetableEntry views of the entries of a class."""
+        return [self[i] for i in self.indexes_for_class(class_id)]
+        
+    def entries_for_teacher(self, teacher_id: str) -> List[TimetableEntry]:
+        """TimetableEntry views of the entries of a teacher."""
+        return [self[i] for i in self.indexes_for_teacher(teacher_id)]
+        
+    def to_timetable(self, timetable: Optional[Timetable] = None) -> Timetable:
+        """
+        Load the entries into a timetable (a new one by default). Raises
+        ValueError, leaving the timetable unchanged, if any entry clashes
+        with another or with the timetable's own entries.
+        """
+        timetable = timetable if timetable is not None else Timetable()
+        report = timetable.add_entries(self)
+        if not report.ok:
+            raise ValueError(f"{len(report.conflicts)} conflicting entries, "
+                             f"first {report.conflicts[0]}")
+        return timetable
+        
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the entry columns, excluding the intern tables."""
+        return sum(column.itemsize * len(column) for column in (
+            self.days, self.periods, self.class_codes, self.subject_codes,
+            self.teacher_codes, self.room_codes))
@@ -0,0 +1,219 @@
+"""
+Thread-Safe Timetables
+An opt-in reader-writer lock around the public Timetable operations, so
+one timetable can be shared by the threads of a web worker: queries run
+side by side, while each change, including add_entry's conflict check and
+insert, runs alone.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from timetable import Timetable, wrap_method, unwrap_method
+
+
+# Public operations that only read the timetable
+READ_METHODS = (
+    "has_conflict", "validate", "find_free_slots",
+    "get_entries_for_class", "get_entries_for_teacher", "get_entries_for_day",
+    "display_class_timetable", "display_teacher_timetable",
+)
+# Public operations that change it
+WRITE_METHODS = (
+    "add_subject", "add_teacher", "add_class", "add_time_slot",
+    "remove_subject", "remove_teacher", "remove_class", "remove_time_slot",
+    "add_entry", "add_entries", "remove_entry",
+)
+
+
+class ReadWriteLock:
+    """
+    Many readers or one writer. A waiting writer stops new readers from
+    entering, so a steady stream of queries cannot starve changes.
+    
+    Both sides are reentrant, and the writing thread may also read; a
+    thread holding only a read lock may not take the write lock, since two
+    such threads would wait for each other forever.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+        # Per thread: read depth, and whether it holds one of the _readers
+        self._local = threading.local()
+        
+    def acquire_read(self) -> None:
+        local = self._local
+        depth = getattr(local, "depth", 0)
+        if depth:
+            local.depth = depth + 1
+            return
+        if self._writer == threading.get_ident():
+            local.depth, local.shared = 1, False
+            return
+        with self._condition:
+            while self._writer is not None or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        local.depth, local.shared = 1, True
+        
+    def release_read(self) -> None:
+        local = self._local
+        local.depth -= 1
+        if local.depth or not local.shared:
+            return
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+                
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        if self._writer == me:
+            self._write_depth += 1
+            return
+        if getattr(self._local, "depth", 0):
+            raise RuntimeError("cannot take the write lock while holding a read lock")
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+            
+    def release_write(self) -> None:
+        self._write_depth -= 1
+        if self._write_depth:
+            return
+        with self._condition:
+            self._writer = None
+            self._condition.notify_all()
+            
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        """Hold a read lock for the duration of a block."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+            
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        """Hold the write lock for the duration of a block."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ThreadSafety:
+    """
+    Locks the public operations of one Timetable.
+    
+    Like instrumentation, enabling shadows each method in READ_METHODS and
+    WRITE_METHODS with a wrapper stored on the instance, around whatever
+    the attribute was before (so timing still applies), and detach()
+    takes out only these wrappers, whichever layer was added first.
+    Compound operations, other attachments' changes (journal undo and
+    redo, say) and reads of timetable.entries should be wrapped in
+    `with safety.reading():` or `with safety.writing():`.
+    
+    CPython's global interpreter lock still runs one thread's bytecode at
+    a time; the read lock only guarantees that queries never wait for
+    each other, only for changes.
+    """
+    
+    def __init__(self, timetable: Timetable):
+        self.timetable = timetable
+        self.lock = ReadWriteLock()
+        # The render cache's LRU order changes on every hit, so cached
+        # displays are serialized among readers
+        self._cache_lock = threading.Lock()
+        self._wrappers = {}
+        for name in READ_METHODS + WRITE_METHODS:
+            if name in WRITE_METHODS:
+                make = self._writer
+            elif name.startswith("display_"):
+                make = self._cached_reader
+            elif name == "find_free_slots":
+                make = self._free_slots_reader
+            else:
+                make = self._reader
+            self._wrappers[name] = wrap_method(timetable, name, make)
+            
+    def reading(self):
+        """Context manager holding the read lock."""
+        return self.lock.reading()
+        
+    def writing(self):
+        """Context manager holding the write lock."""
+        return self.lock.writing()
+        
+    def _reader(self, function):
+        lock = self.lock
+        
+        def locked(*args, **kwargs):
+            lock.acquire_read()
+            try:
+                return locked.__wrapped__(*args, **kwargs)
+            finally:
+                lock.release_read()
+        return locked
+        
+    def _writer(self, function):
+        lock = self.lock
+        
+        def locked(*args, **kwargs):
+            lock.acquire_write()
+            try:
+                return locked.__wrapped__(*args, **kwargs)
+            finally:
+                lock.release_write()
+        return locked
+        
+    def _cached_reader(self, function):
+        lock, cache_lock, timetable = self.lock, self._cache_lock, self.timetable
+        
+        def locked(*args, **kwargs):
+            # Read lock first, then the cache lock, as every reader does
+            lock.acquire_read()
+            try:
+                if timetable.render_cache is None:
+                    return locked.__wrapped__(*args, **kwargs)
+                with cache_lock:
+                    return locked.__wrapped__(*args, **kwargs)
+            finally:
+                lock.release_read()
+        return locked
+        
+    def _free_slots_reader(self, function):
+        # The first call creates the occupancy matrix, which is a change
+        lock, timetable = self.lock, self.timetable
+        
+        def locked(*args, **kwargs):
+            if timetable.occupancy is None:
+                acquire, release = lock.acquire_write, lock.release_write
+            else:
+                acquire, release = lock.acquire_read, lock.release_read
+            acquire()
+            try:
+                return locked.__wrapped__(*args, **kwargs)
+            finally:
+                release()
+        return locked
+        
+    def detach(self) -> None:
+        """Remove the locking wrappers."""
+        for name, wrapper in self._wrappers.items():
+            unwrap_method(self.timetable, name, wrapper)
+        if self.timetable.thread_safety is self:
+            self.timetable.thread_safety = None
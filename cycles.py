@@ -0,0 +1,407 @@
+"""
+Rotating and Cyclic Timetables
+Timetables for schools on an A/B-week, six-day or other rotating cycle.
+Each lesson is stored once with a bitmask of the cycle days it runs on,
+instead of cloning a whole Timetable for every week of the cycle.
+"""
+
+import calendar
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass, TimeSlot, TimetableEntry, DayOfWeek, SLOTS
+)
+
+
+class Cycle:
+    """
+    A rotation of `length` cycle days over the school days of the calendar.
+    
+    Cycle day 0 falls on `start`, and every later school day (a weekday in
+    `weekdays` that is not a holiday) is the next cycle day, wrapping
+    after length days; holidays do not use up a cycle day. A two-week A/B
+    rotation is Cycle(10, start); a six-day rotation over Monday to Friday
+    is Cycle(6, start).
+    """
+    
+    def __init__(self, length: int, start: date, weekdays: Sequence[int] = (0, 1, 2, 3, 4),
+                 labels: Optional[Sequence[str]] = None, holidays: Iterable[date] = ()):
+        if length < 1:
+            raise ValueError("length must be at least 1")
+        weekdays = sorted(set(weekdays))
+        if not weekdays or not all(0 <= day <= 6 for day in weekdays):
+            raise ValueError("weekdays must be a non-empty subset of 0 (Monday) to 6 (Sunday)")
+        if start.weekday() not in weekdays:
+            raise ValueError("the cycle must start on a school day")
+        self.length = length
+        self.start = start
+        self.weekdays = weekdays
+        # Only holidays on school days shift the cycle
+        self.holidays = sorted({day for day in holidays if day.weekday() in weekdays})
+        # School days within the first n days from start, for n in 0..6
+        self._prefix = [sum((start.weekday() + i) % 7 in weekdays for i in range(n))
+                        for n in range(7)]
+        if labels is None:
+            labels = [self._default_label(day) for day in range(length)]
+        if len(labels) != length:
+            raise ValueError(f"expected {length} labels, got {len(labels)}")
+        self.labels = list(labels)
+        
+    @property
+    def week_aligned(self) -> bool:
+        """
+        True if the cycle is made of whole weeks starting on the first
+        school weekday, so each cycle day has a fixed weekday (until a
+        holiday shifts the rotation).
+        """
+        return self.length % len(self.weekdays) == 0 and self.start.weekday() == self.weekdays[0]
+        
+    def _default_label(self, cycle_day: int) -> str:
+        if not self.week_aligned:
+            return f"Day {cycle_day + 1}"
+        week, index = divmod(cycle_day, len(self.weekdays))
+        name = calendar.day_name[self.weekdays[index]].upper()
+        if self.length == len(self.weekdays):
+            return name
+        return f"{chr(ord('A') + week) if week < 26 else week + 1} {name}"
+        
+    def day_of(self, when: date) -> Optional[int]:
+        """
+        Cycle day of a date, or None if it is not a school day. Constant
+        time without holidays; with them, a binary search over the list.
+        """
+        if when.weekday() not in self.weekdays:
+            return None
+        weeks, rest = divmod((when - self.start).days, 7)
+        school_days = weeks * len(self.weekdays) + self._prefix[rest]
+        if self.holidays:
+            index = bisect_left(self.holidays, when)
+            if index < len(self.holidays) and self.holidays[index] == when:
+                return None
+            school_days -= index - bisect_left(self.holidays, self.start)
+        return school_days % self.length
+        
+    def weekday_of(self, cycle_day: int) -> int:
+        """Weekday (0 = Monday) of a cycle day, for week-aligned cycles."""
+        if not self.week_aligned:
+            raise ValueError("cycle days do not fall on fixed weekdays")
+        return self.weekdays[cycle_day % len(self.weekdays)]
+        
+    def mask(self, *days: Union[int, str]) -> int:
+        """Recurrence mask of cycle days, given as indexes or labels."""
+        mask = 0
+        for day in days:
+            index = self.labels.index(day) if isinstance(day, str) else day
+            if not 0 <= index < self.length:
+                raise ValueError(f"cycle day {day} out of range")
+            mask |= 1 << index
+        return mask
+        
+    @property
+    def every_day(self) -> int:
+        """Mask of every day of the cycle."""
+        return (1 << self.length) - 1
+        
+    def every(self, weekday: int) -> int:
+        """Mask of every cycle day on a weekday, e.g. Monday of both A and B weeks."""
+        return self.mask(*(day for day in range(self.length) if self.weekday_of(day) == weekday))
+        
+    def days_in(self, mask: int) -> List[int]:
+        """Cycle days of a mask, in order."""
+        return [day for day in range(self.length) if mask >> day & 1]
+
+
+@dataclass(**SLOTS)
+class CyclicEntry:
+    """A lesson repeating on the cycle days set in `days`."""
+    days: int
+    time_slot: TimeSlot
+    class_id: str
+    subject_code: str
+    teacher_id: str
+    room: Optional[str] = None
+
+
+# (period, teacher/class/room id) -> cycle days booked
+SlotKey = Tuple[int, str]
+
+
+class CyclicTimetable:
+    """
+    A timetable over a Cycle, with one entry per recurring lesson.
+    
+    The slot indexes map (period, id) to the OR of the recurrence masks of
+    the entries booked there, so a conflict check is one AND per teacher,
+    class and room, whatever the cycle length, and an entry covering ten
+    days costs one object rather than ten. Entries are also indexed by
+    class, teacher and cycle day, so those queries never scan the whole
+    timetable.
+    """
+    
+    def __init__(self, cycle: Cycle):
+        self.cycle = cycle
+        self.subjects: Dict[str, Subject] = {}
+        self.teachers: Dict[str, Teacher] = {}
+        self.classes: Dict[str, SchoolClass] = {}
+        self.time_slots: List[TimeSlot] = []
+        self._entries: Dict[int, CyclicEntry] = {}
+        self._teacher_days: Dict[SlotKey, int] = {}
+        self._class_days: Dict[SlotKey, int] = {}
+        self._room_days: Dict[SlotKey, int] = {}
+        self._by_class: Dict[str, Dict[int, CyclicEntry]] = {}
+        self._by_teacher: Dict[str, Dict[int, CyclicEntry]] = {}
+        self._by_day: List[Dict[int, CyclicEntry]] = [{} for _ in range(cycle.length)]
+        
+    @property
+    def entries(self) -> List[CyclicEntry]:
+        """All entries, in the order they were added."""
+        return list(self._entries.values())
+        
+    def add_subject(self, subject: Subject) -> None:
+        """Add a subject, replacing any with the same code."""
+        self.subjects[subject.code] = subject
+        
+    def add_teacher(self, teacher: Teacher) -> None:
+        """Add a teacher, replacing any with the same id."""
+        self.teachers[teacher.id] = teacher
+        
+    def add_class(self, school_class: SchoolClass) -> None:
+        """Add a class, replacing any with the same id."""
+        self.classes[school_class.id] = school_class
+        
+    def add_time_slot(self, time_slot: TimeSlot) -> None:
+        """Add a time slot."""
+        self.time_slots.append(time_slot)
+        
+    def conflicts(self, entry: CyclicEntry) -> List[str]:
+        """What an entry would clash with: "teacher", "class" and/or "room"."""
+        period, days = entry.time_slot.period, entry.days
+        reasons = []
+        if self._teacher_days.get((period, entry.teacher_id), 0) & days:
+            reasons.append("teacher")
+        if self._class_days.get((period, entry.class_id), 0) & days:
+            reasons.append("class")
+        if entry.room is not None and self._room_days.get((period, entry.room), 0) & days:
+            reasons.append("room")
+        return reasons
+        
+    def has_conflict(self, entry: CyclicEntry) -> bool:
+        """Check whether an entry clashes on any of its cycle days."""
+        return bool(self.conflicts(entry))
+        
+    def add_entry(self, entry: CyclicEntry) -> bool:
+        """Add an entry if it conflicts with nothing. Returns True if added."""
+        if not entry.days & self.cycle.every_day or entry.days & ~self.cycle.every_day:
+            raise ValueError("entry days must be a non-empty mask of cycle days")
+        if self.has_conflict(entry):
+            return False
+        self._insert(entry)
+        return True
+        
+    def _insert(self, entry: CyclicEntry) -> None:
+        """Store an entry and book its days, without conflict checks."""
+        period, days = entry.time_slot.period, entry.days
+        for index, id_ in ((self._teacher_days, entry.teacher_id),
+                           (self._class_days, entry.class_id), (self._room_days, entry.room)):
+            if id_ is not None:
+                index[period, id_] = index.get((period, id_), 0) | days
+        key = id(entry)
+        self._entries[key] = entry
+        self._by_class.setdefault(entry.class_id, {})[key] = entry
+        self._by_teacher.setdefault(entry.teacher_id, {})[key] = entry
+        for cycle_day in self.cycle.days_in(days):
+            self._by_day[cycle_day][key] = entry
+            
+    def _remove(self, entry: CyclicEntry) -> None:
+        period, keep = entry.time_slot.period, ~entry.days
+        for index, id_ in ((self._teacher_days, entry.teacher_id),
+                           (self._class_days, entry.class_id), (self._room_days, entry.room)):
+            if id_ is not None:
+                days = index[period, id_] & keep
+                if days:
+                    index[period, id_] = days
+                else:
+                    del index[period, id_]
+        key = id(entry)
+        del self._entries[key]
+        for index, id_ in ((self._by_class, entry.class_id), (self._by_teacher, entry.teacher_id)):
+            bucket = index[id_]
+            del bucket[key]
+            if not bucket:
+                del index[id_]
+        for cycle_day in self.cycle.days_in(entry.days):
+            del self._by_day[cycle_day][key]
+            
+    def find_entry(self, cycle_day: int, period: int, class_id: str) -> Optional[CyclicEntry]:
+        """The entry of a class in one period of one cycle day, if any."""
+        if not self._class_days.get((period, class_id), 0) >> cycle_day & 1:
+            return None
+        for entry in self._by_class[class_id].values():
+            if entry.time_slot.period == period and entry.days >> cycle_day & 1:
+                return entry
+        return None
+        
+    def remove_entry(self, cycle_day: int, period: int, class_id: str) -> bool:
+        """
+        Cancel one occurrence of a class's lesson. A lesson recurring on
+        other days is kept for them. Returns True if found and removed.
+        """
+        entry = self.find_entry(cycle_day, period, class_id)
+        if entry is None:
+            return False
+        self._remove(entry)
+        rest = entry.days & ~(1 << cycle_day)
+        if rest:
+            self._insert(CyclicEntry(rest, entry.time_slot, entry.class_id,
+                                     entry.subject_code, entry.teacher_id, entry.room))
+        return True
+        
+    def get_entries_for_class(self, class_id: str) -> List[CyclicEntry]:
+        """Entries of a class, in the order they were added."""
+        return list(self._by_class.get(class_id, {}).values())
+        
+    def get_entries_for_teacher(self, teacher_id: str) -> List[CyclicEntry]:
+        """Entries of a teacher, in the order they were added."""
+        return list(self._by_teacher.get(teacher_id, {}).values())
+        
+    def get_entries_for_day(self, cycle_day: int) -> List[CyclicEntry]:
+        """Entries that run on a cycle day (none outside the cycle)."""
+        if not 0 <= cycle_day < self.cycle.length:
+            return []
+        return list(self._by_day[cycle_day].values())
+        
+    def entries_on(self, when: date) -> List[CyclicEntry]:
+        """Entries that run on a calendar date (none on non-school days)."""
+        cycle_day = self.cycle.day_of(when)
+        return [] if cycle_day is None else self.get_entries_for_day(cycle_day)
+        
+    def _render(self, title: str, entries: List[CyclicEntry], other: str) -> str:
+        # Same layout as Timetable.display_class_timetable, one section per cycle day
+        output = [f"\nTimetable for {title}", "=" * 70]
+        for cycle_day in range(self.cycle.length):
+            rows = sorted((entry for entry in entries if entry.days >> cycle_day & 1),
+                          key=lambda entry: entry.time_slot.period)
+            if not rows:
+                continue
+            output.append(f"\n{self.cycle.labels[cycle_day]}")
+            output.append("-" * 70)
+            for entry in rows:
+                subject = self.subjects.get(entry.subject_code)
+                subject_name = subject.name if subject is not None else entry.subject_code
+                if other == "teacher":
+                    teacher = self.teachers.get(entry.teacher_id)
+                    other_name = teacher.name if teacher is not None else entry.teacher_id
+                else:
+                    school_class = self.classes.get(entry.class_id)
+                    other_name = school_class.name if school_class is not None else entry.class_id
+                output.append(f"  {entry.time_slot} | {subject_name:20} | {other_name:20} | "
+                              f"Room: {entry.room or 'TBA'}")
+        return "\n".join(output)
+        
+    def display_class_timetable(self, class_id: str) -> str:
+        """Display a class's timetable, one section per cycle day."""
+        if class_id not in self.classes:
+            return f"Class {class_id} not found"
+        entries = self.get_entries_for_class(class_id)
+        if not entries:
+            return f"No timetable entries for class {class_id}"
+        return self._render(self.classes[class_id].name, entries, "teacher")
+        
+    def display_teacher_timetable(self, teacher_id: str) -> str:
+        """Display a teacher's timetable, one section per cycle day."""
+        if teacher_id not in self.teachers:
+            return f"Teacher {teacher_id} not found"
+        entries = self.get_entries_for_teacher(teacher_id)
+        if not entries:
+            return f"No timetable entries for teacher {teacher_id}"
+        return self._render(self.teachers[teacher_id].name, entries, "class")
+        
+    def validate(self) -> List[str]:
+        """Double bookings on any cycle day (possible only via _insert)."""
+        errors = []
+        for label, key_of in (("Teacher", lambda e: e.teacher_id), ("Class", lambda e: e.class_id),
+                              ("Room", lambda e: e.room)):
+            booked: Dict[SlotKey, int] = {}
+            clashes: Dict[SlotKey, int] = {}
+            for entry in self._entries.values():
+                id_ = key_of(entry)
+                if id_ is None:
+                    continue
+                key = (entry.time_slot.period, id_)
+                days = booked.get(key, 0)
+                if days & entry.days:
+                    clashes[key] = clashes.get(key, 0) | (days & entry.days)
+                booked[key] = days | entry.days
+            for (period, id_), days in clashes.items():
+                for cycle_day in self.cycle.days_in(days):
+                    errors.append(f"{label} {id_} has conflict on "
+                                  f"{self.cycle.labels[cycle_day]} period {period}")
+        return errors
+        
+    def week(self, index: int) -> Timetable:
+        """
+        One week of a week-aligned cycle (0 = week A) as a plain Timetable,
+        for the exporter, solver and other weekly tools.
+        """
+        cycle = self.cycle
+        per_week = len(cycle.weekdays)
+        if not cycle.week_aligned or max(cycle.weekdays) >= len(DayOfWeek):
+            raise ValueError("only cycles of whole Monday-Friday weeks can be split into weeks")
+        if not 0 <= index < cycle.length // per_week:
+            raise ValueError(f"week {index} out of range")
+        timetable = Timetable()
+        for subject in self.subjects.values():
+            timetable.add_subject(subject)
+        for teacher in self.teachers.values():
+            timetable.add_teacher(teacher)
+        for school_class in self.classes.values():
+            timetable.add_class(school_class)
+        for time_slot in self.time_slots:
+            timetable.add_time_slot(time_slot)
+        week_mask = ((1 << per_week) - 1) << (index * per_week)
+        for entry in self._entries.values():
+            for cycle_day in cycle.days_in(entry.days & week_mask):
+                timetable._insert(TimetableEntry(
+                    DayOfWeek(cycle.weekday_of(cycle_day)), entry.time_slot, entry.class_id,
+                    entry.subject_code, entry.teacher_id, entry.room))
+        return timetable
+        
+    @classmethod
+    def from_weeks(cls, cycle: Cycle, weeks: Sequence[Timetable]) -> "CyclicTimetable":
+        """
+        Merge one cloned Timetable per week of a week-aligned cycle into a
+        cyclic timetable, storing each lesson repeated across the weeks or
+        days once. Subjects, teachers, classes and time slots are taken
+        from the first week.
+        """
+        per_week = len(cycle.weekdays)
+        if not cycle.week_aligned or len(weeks) * per_week != cycle.length:
+            raise ValueError(f"expected {cycle.length // per_week} weeks for this cycle")
+        cyclic = cls(cycle)
+        first = weeks[0]
+        for subject in first.subjects.values():
+            cyclic.add_subject(subject)
+        for teacher in first.teachers.values():
+            cyclic.add_teacher(teacher)
+        for school_class in first.classes.values():
+            cyclic.add_class(school_class)
+        for time_slot in first.time_slots:
+            cyclic.add_time_slot(time_slot)
+        column = {weekday: index for index, weekday in enumerate(cycle.weekdays)}
+        lessons: Dict[tuple, int] = {}
+        slots: Dict[int, TimeSlot] = {}
+        for week, timetable in enumerate(weeks):
+            for entry in timetable.entries:
+                if entry.day.value not in column:
+                    raise ValueError(f"{entry.day.name} is not a school day of the cycle")
+                bit = 1 << (week * per_week + column[entry.day.value])
+                key = (entry.time_slot.period, entry.class_id, entry.subject_code,
+                       entry.teacher_id, entry.room)
+                lessons[key] = lessons.get(key, 0) | bit
+                slots.setdefault(entry.time_slot.period, entry.time_slot)
+        for (period, class_id, subject_code, teacher_id, room), days in lessons.items():
+            cyclic._insert(CyclicEntry(days, slots[period], class_id, subject_code, teacher_id, room))
+        return cyclic
@@ -0,0 +1,221 @@
+"""
+Multi-School District
+Keeps one Timetable shard per school, routes queries to the right shard
+and checks teachers and shared rooms across shards through a district-wide
+occupancy index, so teachers who work at several schools are never
+double-booked.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from substitutes import Cover, SubstituteFinder, school_days
+from timetable import Timetable, TimetableObserver, TimetableEntry, Teacher, DayOfWeek
+
+
+SlotKey = Tuple[DayOfWeek, int, str]
+
+
+class _ShardTracker(TimetableObserver):
+    """Feeds one shard's entry changes into the district index."""
+    
+    def __init__(self, district: "District", school_id: str):
+        self.district = district
+        self.school_id = school_id
+        
+    def entry_added(self, entry: TimetableEntry) -> None:
+        self.district._track(self.school_id, entry, 1)
+        
+    def entry_removed(self, entry: TimetableEntry) -> None:
+        self.district._track(self.school_id, entry, -1)
+
+
+# The district being validated, inherited by forked pool workers
+_worker_district: Optional["District"] = None
+
+
+def _validate_shard(school_id: str) -> List[str]:
+    return _worker_district.shards[school_id].validate()
+
+
+class District:
+    """
+    Timetables of several schools, one shard per school.
+    
+    Teacher ids are district-wide: the same id in two schools is the same
+    person. Room ids are local to a school, except for shared_rooms (a
+    sports hall, say), which are district-wide. The district index counts,
+    for every (day, period, teacher) and (day, period, shared room) slot,
+    how many entries each school has there; it follows every shard through
+    an observer, so entries added directly to a shard are tracked too.
+    """
+    
+    def __init__(self, shared_rooms: Iterable[str] = ()):
+        self.shards: Dict[str, Timetable] = {}
+        self.shared_rooms: Set[str] = set(shared_rooms)
+        self._teacher_slots: Dict[SlotKey, Dict[str, int]] = {}
+        self._room_slots: Dict[SlotKey, Dict[str, int]] = {}
+        # Lessons per school for every teacher, for routing teacher queries
+        self._teacher_schools: Dict[str, Dict[str, int]] = {}
+        self._trackers: Dict[str, _ShardTracker] = {}
+        # Substitute finders per school, created by find_cover()
+        self._finders: Dict[str, SubstituteFinder] = {}
+        
+    def add_school(self, school_id: str, timetable: Optional[Timetable] = None) -> Timetable:
+        """Add a school's shard (a new empty one by default) and return it."""
+        if school_id in self.shards:
+            raise ValueError(f"school '{school_id}' already exists")
+        timetable = timetable if timetable is not None else Timetable()
+        tracker = self._trackers[school_id] = _ShardTracker(self, school_id)
+        self.shards[school_id] = timetable
+        for entry in timetable.entries:
+            tracker.entry_added(entry)
+        timetable.add_observer(tracker)
+        return timetable
+        
+    def remove_school(self, school_id: str) -> Timetable:
+        """Take a school's shard out of the district and return it."""
+        timetable = self.shards.pop(school_id)
+        tracker = self._trackers.pop(school_id)
+        timetable.remove_observer(tracker)
+        finder = self._finders.pop(school_id, None)
+        if finder is not None:
+            finder.detach()
+        for entry in timetable.entries:
+            self._track(school_id, entry, -1)
+        return timetable
+        
+    def school(self, school_id: str) -> Timetable:
+        """The shard of one school."""
+        return self.shards[school_id]
+        
+    def add_teacher(self, teacher: Teacher, school_ids: Iterable[str]) -> None:
+        """Register a teacher with every school they work at."""
+        for school_id in school_ids:
+            self.shards[school_id].add_teacher(teacher)
+            
+    def _track(self, school_id: str, entry: TimetableEntry, delta: int) -> None:
+        day, period = entry.day, entry.time_slot.period
+        keys = [(self._teacher_slots, (day, period, entry.teacher_id))]
+        if entry.room in self.shared_rooms:
+            keys.append((self._room_slots, (day, period, entry.room)))
+        keys.append((self._teacher_schools, entry.teacher_id))
+        for index, key in keys:
+            counts = index.setdefault(key, {})
+            count = counts.get(school_id, 0) + delta
+            if count:
+                counts[school_id] = count
+            else:
+                del counts[school_id]
+                if not counts:
+                    del index[key]
+                    
+    def has_conflict(self, school_id: str, entry: TimetableEntry) -> bool:
+        """
+        Check an entry against its school's shard and against the teacher's
+        and any shared room's bookings at every other school.
+        """
+        if self.shards[school_id].has_conflict(entry):
+            return True
+        day, period = entry.day, entry.time_slot.period
+        if (day, period, entry.teacher_id) in self._teacher_slots:
+            return True
+        return entry.room in self.shared_rooms and (day, period, entry.room) in self._room_slots
+        
+    def add_entry(self, school_id: str, entry: TimetableEntry) -> bool:
+        """Add an entry to a school if it conflicts with nothing in the district."""
+        if self.has_conflict(school_id, entry):
+            return False
+        return self.shards[school_id].add_entry(entry)
+        
+    def remove_entry(self, school_id: str, day: DayOfWeek, period: int, class_id: str) -> bool:
+        """Remove a class's entry from a school. Returns True if found and removed."""
+        return self.shards[school_id].remove_entry(day, period, class_id)
+        
+    def schools_for_teacher(self, teacher_id: str) -> List[str]:
+        """Schools where a teacher has lessons."""
+        return list(self._teacher_schools.get(teacher_id, ()))
+        
+    def get_entries_for_class(self, school_id: str, class_id: str) -> List[TimetableEntry]:
+        """Entries of a class, from its school's shard only."""
+        return self.shards[school_id].get_entries_for_class(class_id)
+        
+    def get_entries_for_teacher(self, teacher_id: str) -> Dict[str, List[TimetableEntry]]:
+        """A teacher's entries per school, reading only the shards they teach at."""
+        return {school_id: self.shards[school_id].get_entries_for_teacher(teacher_id)
+                for school_id in self.schools_for_teacher(teacher_id)}
+                
+    def get_entries_for_day(self, day: DayOfWeek) -> Dict[str, List[TimetableEntry]]:
+        """Entries on one day, per school."""
+        return {school_id: timetable.get_entries_for_day(day)
+                for school_id, timetable in self.shards.items()}
+                
+    def is_free(self, day: DayOfWeek, period: int, teacher_id: Optional[str] = None,
+                room: Optional[str] = None) -> bool:
+        """Whether a teacher and/or shared room is free district-wide in a slot."""
+        if teacher_id is not None and (day, period, teacher_id) in self._teacher_slots:
+            return False
+        return room is None or (day, period, room) not in self._room_slots
+        
+    def find_cover(self, teacher_id: str, start: date, end: Optional[date] = None,
+                   cover_counts: Optional[Dict[str, int]] = None) -> List[Cover]:
+        """
+        Cover for an absent teacher's lessons at every school they teach at,
+        from start to end (inclusive). Substitutes are teachers of the
+        lesson's school who are free district-wide, and the cover is spread
+        across schools as by SubstituteFinder.find_cover().
+        """
+        days = school_days(start, end)
+        counts = cover_counts if cover_counts is not None else {}
+        booked = set()
+        is_free = lambda candidate, day, period: self.is_free(day, period, teacher_id=candidate)
+        covers = []
+        for school_id in self.schools_for_teacher(teacher_id):
+            finder = self._finders.get(school_id)
+            if finder is None:
+                finder = self._finders[school_id] = SubstituteFinder(self.shards[school_id])
+            covers.extend(finder._plan(teacher_id, days, is_free, counts, booked, school_id))
+        covers.sort(key=lambda cover: (cover.date, cover.entry.time_slot.period))
+        return covers
+        
+    def cross_school_conflicts(self) -> List[str]:
+        """Teachers and shared rooms booked at more than one school in the same slot."""
+        errors = []
+        for label, index in (("Teacher", self._teacher_slots), ("Room", self._room_slots)):
+            for (day, period, id_), counts in index.items():
+                if len(counts) > 1:
+                    errors.append(f"{label} {id_} has conflict across schools "
+                                  f"{', '.join(sorted(counts))} on {day.name} period {period}")
+        return errors
+        
+    def validate(self, workers: Optional[int] = None) -> List[str]:
+        """
+        Validate every shard, in parallel worker processes, and the
+        cross-school bookings. Shard errors are prefixed with the school id.
+        
+        Workers are forked so they share the shards without copying them;
+        where fork is unavailable, or with workers=1, shards are validated
+        in this process.
+        """
+        school_ids = list(self.shards)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(school_ids) < 2 or \
+                "fork" not in multiprocessing.get_all_start_methods():
+            results = [self.shards[school_id].validate() for school_id in school_ids]
+        else:
+            global _worker_district
+            _worker_district = self
+            try:
+                with ProcessPoolExecutor(
+                        max_workers=min(workers, len(school_ids)),
+                        mp_context=multiprocessing.get_context("fork")) as pool:
+                    results = list(pool.map(_validate_shard, school_ids))
+            finally:
+                _worker_district = None
+        errors = [f"{school_id}: {error}"
+                  for school_id, shard_errors in zip(school_ids, results)
+                  for error in shard_errors]
+        return errors + self.cross_school_conflicts()
@@ -0,0 +1,258 @@
+"""
+Bulk Timetable Export
+Renders the timetable of every class and every teacher from a single
+pass over the entries, as text, CSV, HTML or JSON, streaming the output
+so no complete document is ever built in memory.
+"""
+
+import csv
+import html
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+from urllib.parse import quote
+
+from timetable import Timetable, TimetableEntry
+
+
+FORMATS = ("text", "csv", "html", "json")
+EXTENSIONS = {"text": "txt", "csv": "csv", "html": "html", "json": "json"}
+CSV_COLUMNS = ("view", "id", "day", "period", "start_time", "end_time", "class_id", "class",
+               "subject_code", "subject", "teacher_id", "teacher", "room")
+
+# (kind, id, display name, entries sorted by day and period)
+View = Tuple[str, str, str, List[TimetableEntry]]
+
+
+class _Line(list):
+    """Minimal file stand-in that lets csv.writer format one row at a time."""
+    
+    def write(self, text: str) -> None:
+        self.append(text)
+
+
+def _file_name(kind: str, id_: str, fmt: str) -> str:
+    # Percent-escaping keeps names distinct: "A/B" and "A_B" must not share a file
+    return f"{kind}_{quote(id_, safe='')}.{EXTENSIONS[fmt]}"
+
+
+class _Snapshot:
+    """The parts of a Timetable the exporter reads, copied at one moment."""
+    
+    def __init__(self, timetable: Timetable):
+        # Model objects are replaced rather than changed, so shallow copies do
+        self.subjects = dict(timetable.subjects)
+        self.teachers = dict(timetable.teachers)
+        self.classes = dict(timetable.classes)
+        self.entries = timetable.entries
+
+
+class TimetableExporter:
+    """
+    Exports every class and teacher timetable of a Timetable.
+    
+    Entries are grouped by class and by teacher in one pass and each group
+    is sorted once, so exporting all views costs O(entries) rather than a
+    scan of all entries per view. Each view is rendered lazily as a stream
+    of text chunks.
+    """
+    
+    def __init__(self, timetable: Timetable, fmt: str = "text"):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format '{fmt}', expected one of {', '.join(FORMATS)}")
+        self.timetable = timetable
+        self.fmt = fmt
+        
+    def snapshot(self) -> "TimetableExporter":
+        """
+        An exporter over a copy of the timetable as it is now, which later
+        changes do not affect. Costs one pass over the entries; only
+        views(), stream() and write_all() work on it.
+        """
+        return TimetableExporter(_Snapshot(self.timetable), self.fmt)
+        
+    def views(self) -> Iterator[View]:
+        """Every class view followed by every teacher view."""
+        by_class: Dict[str, List[TimetableEntry]] = {}
+        by_teacher: Dict[str, List[TimetableEntry]] = {}
+        for entry in self.timetable.entries:
+            by_class.setdefault(entry.class_id, []).append(entry)
+            by_teacher.setdefault(entry.teacher_id, []).append(entry)
+        key = lambda e: (e.day.value, e.time_slot.period)
+        for class_id, school_class in self.timetable.classes.items():
+            yield "class", class_id, school_class.name, sorted(by_class.get(class_id, ()), key=key)
+        for teacher_id, teacher in self.timetable.teachers.items():
+            yield "teacher", teacher_id, teacher.name, sorted(by_teacher.get(teacher_id, ()), key=key)
+            
+    def view(self, kind: str, id_: str) -> View:
+        """The view of one class (kind "class") or teacher (kind "teacher")."""
+        key = lambda e: (e.day.value, e.time_slot.period)
+        if kind == "class":
+            school_class = self.timetable.classes[id_]
+            return kind, id_, school_class.name, sorted(
+                self.timetable.get_entries_for_class(id_), key=key)
+        if kind == "teacher":
+            teacher = self.timetable.teachers[id_]
+            return kind, id_, teacher.name, sorted(
+                self.timetable.get_entries_for_teacher(id_), key=key)
+        raise ValueError(f"unknown view kind '{kind}'")
+        
+    def _names(self, entry: TimetableEntry) -> Tuple[str, str, str]:
+        """Subject, teacher and class names of an entry, falling back to ids."""
+        subject = self.timetable.subjects.get(entry.subject_code)
+        teacher = self.timetable.teachers.get(entry.teacher_id)
+        school_class = self.timetable.classes.get(entry.class_id)
+        return (subject.name if subject is not None else entry.subject_code,
+                teacher.name if teacher is not None else entry.teacher_id,
+                school_class.name if school_class is not None else entry.class_id)
+                
+    def render(self, view: View) -> Iterator[str]:
+        """Text chunks of one view in the exporter's format."""
+        return getattr(self, f"_render_{self.fmt}")(view)
+        
+    def _render_text(self, view: View) -> Iterator[str]:
+        # Same layout as display_class_timetable / display_teacher_timetable
+        kind, id_, name, entries = view
+        if not entries:
+            yield f"No timetable entries for {kind} {id_}\n"
+            return
+        yield f"\nTimetable for {name}\n"
+        yield "=" * 70 + "\n"
+        current_day = None
+        for entry in entries:
+            if current_day != entry.day:
+                current_day = entry.day
+                yield f"\n{entry.day.name}\n"
+                yield "-" * 70 + "\n"
+            subject_name, teacher_name, class_name = self._names(entry)
+            other = teacher_name if kind == "class" else class_name
+            yield (f"  {entry.time_slot} | {subject_name:20} | {other:20} | "
+                   f"Room: {entry.room or 'TBA'}\n")
+                   
+    def _render_csv(self, view: View) -> Iterator[str]:
+        kind, id_, _, entries = view
+        line = _Line()
+        writer = csv.writer(line, lineterminator="\n")
+        for entry in entries:
+            subject_name, teacher_name, class_name = self._names(entry)
+            writer.writerow((kind, id_, entry.day.name, entry.time_slot.period,
+                             entry.time_slot.start_time, entry.time_slot.end_time,
+                             entry.class_id, class_name, entry.subject_code, subject_name,
+                             entry.teacher_id, teacher_name, entry.room or ""))
+            yield line.pop()
+            
+    def _render_html(self, view: View) -> Iterator[str]:
+        kind, id_, name, entries = view
+        other = "Teacher" if kind == "class" else "Class"
+        yield f'<section class="{kind}" id="{html.escape(kind)}-{html.escape(id_)}">\n'
+        yield f"<h2>Timetable for {html.escape(name)}</h2>\n"
+        if not entries:
+            yield f"<p>No timetable entries for {kind} {html.escape(id_)}</p>\n</section>\n"
+            return
+        yield (f"<table>\n<tr><th>Day</th><th>Period</th><th>Time</th><th>Subject</th>"
+               f"<th>{other}</th><th>Room</th></tr>\n")
+        for entry in entries:
+            subject_name, teacher_name, class_name = self._names(entry)
+            cells = (entry.day.name, str(entry.time_slot.period),
+                     f"{entry.time_slot.start_time}-{entry.time_slot.end_time}", subject_name,
+                     teacher_name if kind == "class" else class_name, entry.room or "TBA")
+            yield "<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in cells) + "</tr>\n"
+        yield "</table>\n</section>\n"
+        
+    def _render_json(self, view: View) -> Iterator[str]:
+        kind, id_, name, entries = view
+        yield json.dumps({"view": kind, "id": id_, "name": name}, ensure_ascii=False)[:-1]
+        yield ', "entries": ['
+        for index, entry in enumerate(entries):
+            subject_name, teacher_name, class_name = self._names(entry)
+            yield ("" if index == 0 else ", ") + json.dumps({
+                "day": entry.day.name, "period": entry.time_slot.period,
+                "start_time": entry.time_slot.start_time, "end_time": entry.time_slot.end_time,
+                "class_id": entry.class_id, "class": class_name,
+                "subject_code": entry.subject_code, "subject": subject_name,
+                "teacher_id": entry.teacher_id, "teacher": teacher_name, "room": entry.room,
+            }, ensure_ascii=False)
+        yield "]}"
+        
+    def _header(self) -> Iterator[str]:
+        if self.fmt == "csv":
+            yield ",".join(CSV_COLUMNS) + "\n"
+        elif self.fmt == "html":
+            yield '<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"><title>Timetables</title></head>\n<body>\n'
+            
+    def _footer(self) -> Iterator[str]:
+        if self.fmt == "html":
+            yield "</body>\n</html>\n"
+            
+    def write_view(self, view: View, handle: TextIO) -> None:
+        """Write one view as a complete document."""
+        handle.writelines(self._header())
+        handle.writelines(self.render(view))
+        if self.fmt == "json":
+            handle.write("\n")
+        handle.writelines(self._footer())
+        
+    def stream(self) -> Iterator[str]:
+        """Text chunks of every view as one document, as written by write_all()."""
+        yield from self._header()
+        for view in self.views():
+            yield from self.render(view)
+            if self.fmt == "json":
+                yield "\n"
+        yield from self._footer()
+        
+    def write_all(self, handle: TextIO) -> int:
+        """
+        Write every view to one stream: a single CSV table, HTML page or
+        text listing, or JSON Lines with one view per line. Returns the
+        number of views written.
+        """
+        handle.writelines(self._header())
+        count = 0
+        for view in self.views():
+            handle.writelines(self.render(view))
+            if self.fmt == "json":
+                handle.write("\n")
+            count += 1
+        handle.writelines(self._footer())
+        return count
+        
+    def export_to_directory(self, directory: str, workers: Optional[int] = 4) -> List[str]:
+        """
+        Write each view to its own file (class_<id>.<ext>, teacher_<id>.<ext>,
+        with the id percent-escaped) in directory, using a pool of writer
+        threads. Returns the paths written, in view order. Ids differing
+        only in case would overwrite each other on case-insensitive file
+        systems, so the later ones get a +2, +3, ... suffix.
+        """
+        views = list(self.views())
+        paths = []
+        taken = set()
+        for view in views:
+            name = _file_name(view[0], view[1], self.fmt)
+            stem, extension = os.path.splitext(name)
+            number = 1
+            # "+" is always escaped in ids, so a suffix cannot match another id
+            while name.casefold() in taken:
+                number += 1
+                name = f"{stem}+{number}{extension}"
+            taken.add(name.casefold())
+            paths.append(os.path.join(directory, name))
+        os.makedirs(directory, exist_ok=True)
+        
+        def write(view: View, path: str) -> str:
+            with open(path, "w", encoding="utf-8", newline="") as handle:
+                self.write_view(view, handle)
+            return path
+            
+        if workers == 1:
+            return [write(view, path) for view, path in zip(views, paths)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(write, views, paths))
+
+
+def export_timetables(timetable: Timetable, directory: str, fmt: str = "text",
+                      workers: Optional[int] = 4) -> List[str]:
+    """Convenience wrapper: write every class and teacher timetable to directory."""
+    return TimetableExporter(timetable, fmt).export_to_directory(directory, workers)
@@ -0,0 +1,234 @@
+"""
+Streaming Timetable Import
+Reads subjects, teachers, classes, time slots and lesson rows from CSV or
+JSON Lines files one row at a time, so memory use does not grow with the
+size of the file.
+"""
+
+import csv
+import json
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+
+
+# Day names, three-letter abbreviations and numbers, all lower case
+DAY_LOOKUP: Dict[str, DayOfWeek] = {}
+for _day in DayOfWeek:
+    DAY_LOOKUP[_day.name.lower()] = _day
+    DAY_LOOKUP[_day.name[:3].lower()] = _day
+    DAY_LOOKUP[str(_day.value)] = _day
+del _day
+
+
+@dataclass
+class RowError:
+    """A row that could not be imported."""
+    line: int
+    message: str
+    
+    def __str__(self):
+        return f"line {self.line}: {self.message}"
+
+
+@dataclass
+class ImportReport:
+    """Outcome of importing one file."""
+    imported: int = 0
+    failed: int = 0
+    # The first max_errors problems; `failed` counts all of them
+    errors: List[RowError] = field(default_factory=list)
+    
+    @property
+    def ok(self) -> bool:
+        """True if every row was imported."""
+        return self.failed == 0
+
+
+def _decoded(handle, bad: Set[int]) -> Iterator[str]:
+    """
+    Lines of a binary file as text, adding undecodable line numbers to bad.
+    A byte order mark (as Excel writes) is dropped from the first line.
+    """
+    for line_number, line in enumerate(handle, 1):
+        try:
+            yield line.decode("utf-8-sig" if line_number == 1 else "utf-8")
+        except UnicodeDecodeError:
+            bad.add(line_number)
+            yield line.decode("utf-8", "replace")
+
+
+def read_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (line number, row) pairs from a CSV file with a header row or a
+    JSON Lines file (.jsonl/.ndjson), one row at a time. Lines are decoded
+    one by one, so a row that is not valid UTF-8 fails on its own; an
+    undecodable CSV header raises ValueError.
+    """
+    with open(path, "rb") as handle:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line_number, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line.decode("utf-8-sig" if line_number == 1 else "utf-8"))
+                except UnicodeDecodeError:
+                    row = {"__error__": "not valid UTF-8 text"}
+                except ValueError as e:
+                    row = {"__error__": f"invalid JSON: {e}"}
+                if not isinstance(row, dict):
+                    row = {"__error__": "expected a JSON object"}
+                yield line_number, row
+        else:
+            bad: Set[int] = set()
+            reader = csv.DictReader(_decoded(handle, bad))
+            if reader.fieldnames is not None and bad:
+                raise ValueError(f"{path}: the header row is not valid UTF-8 text")
+            for row in reader:
+                if bad:
+                    # Only the lines of this record have been read since
+                    row = {"__error__": "not valid UTF-8 text"}
+                    bad.clear()
+                # line_num is the last physical line of the record
+                yield reader.line_num, row
+
+
+def _field(row: Dict[str, Any], name: str, required: bool = True) -> Optional[str]:
+    value = row.get(name)
+    if value is None or str(value).strip() == "":
+        if required:
+            raise ValueError(f"missing {name}")
+        return None
+    return str(value).strip()
+
+
+class TimetableImporter:
+    """
+    Streams rows from files into a Timetable.
+    
+    Rows are parsed one at a time; lesson rows are collected into batches
+    of batch_size and added with a single Timetable.add_entries() call, so
+    conflict checks run against the indexes in bulk. Days are resolved
+    through DAY_LOOKUP and periods through a period -> TimeSlot table.
+    """
+    
+    def __init__(self, timetable: Timetable, batch_size: int = 1000,
+                 max_errors: int = 1000, check_references: bool = True):
+        self.timetable = timetable
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.check_references = check_references
+        
+    def _fail(self, report: ImportReport, line: int, message: str) -> None:
+        report.failed += 1
+        if len(report.errors) < self.max_errors:
+            report.errors.append(RowError(line, message))
+            
+    def _import_simple(self, path: str, build: Callable[[Dict[str, Any]], None]) -> ImportReport:
+        report = ImportReport()
+        for line, row in read_rows(path):
+            try:
+                if "__error__" in row:
+                    raise ValueError(row["__error__"])
+                build(row)
+            except (ValueError, TypeError) as e:
+                self._fail(report, line, str(e))
+            else:
+                report.imported += 1
+        return report
+        
+    def import_subjects(self, path: str) -> ImportReport:
+        """Import subjects from rows with code and name columns."""
+        return self._import_simple(path, lambda row: self.timetable.add_subject(
+            Subject(_field(row, "code"), _field(row, "name"))))
+            
+    def import_teachers(self, path: str) -> ImportReport:
+        """
+        Import teachers from rows with id, name and subjects columns.
+        In CSV files subjects are separated by ';'; in JSON a list is accepted.
+        """
+        def build(row: Dict[str, Any]) -> None:
+            subjects = row.get("subjects") or []
+            if isinstance(subjects, str):
+                subjects = [code.strip() for code in subjects.split(";") if code.strip()]
+            self.timetable.add_teacher(Teacher(_field(row, "id"), _field(row, "name"),
+                                               [str(code) for code in subjects]))
+        return self._import_simple(path, build)
+        
+    def import_classes(self, path: str) -> ImportReport:
+        """Import classes from rows with id, name and students_count columns."""
+        return self._import_simple(path, lambda row: self.timetable.add_class(
+            SchoolClass(_field(row, "id"), _field(row, "name"),
+                        int(_field(row, "students_count", required=False) or 0))))
+                        
+    def import_time_slots(self, path: str) -> ImportReport:
+        """Import time slots from rows with period, start_time and end_time columns."""
+        return self._import_simple(path, lambda row: self.timetable.add_time_slot(
+            TimeSlot(int(_field(row, "period")), _field(row, "start_time"),
+                     _field(row, "end_time"))))
+                     
+    def _parse_entry(self, row: Dict[str, Any], slots: Dict[int, TimeSlot]) -> TimetableEntry:
+        """Build an entry from a lesson row, resolving day and period by lookup."""
+        if "__error__" in row:
+            raise ValueError(row["__error__"])
+        day_text = _field(row, "day")
+        day = DAY_LOOKUP.get(day_text.lower())
+        if day is None:
+            raise ValueError(f"unknown day '{day_text}'")
+        period_text = _field(row, "period")
+        try:
+            time_slot = slots[int(period_text)]
+        except (KeyError, ValueError):
+            raise ValueError(f"unknown period '{period_text}'") from None
+            
+        # Ids repeat across many rows; interning keeps one copy of each
+        room = _field(row, "room", required=False)
+        entry = TimetableEntry(day, time_slot, sys.intern(_field(row, "class_id")),
+                               sys.intern(_field(row, "subject_code")),
+                               sys.intern(_field(row, "teacher_id")),
+                               None if room is None else sys.intern(room))
+        if self.check_references:
+            errors = self.timetable.reference_errors(entry)
+            if errors:
+                raise ValueError("; ".join(errors))
+        return entry
+        
+    def import_entries(self, path: str) -> ImportReport:
+        """
+        Import lesson rows with day, period, class_id, subject_code,
+        teacher_id and optional room columns. Rows that clash with the
+        timetable or with earlier rows are reported and skipped.
+        """
+        report = ImportReport()
+        slots = {slot.period: slot for slot in self.timetable.time_slots}
+        batch: List[TimetableEntry] = []
+        lines: List[int] = []
+        
+        def flush() -> None:
+            result = self.timetable.add_entries(batch, atomic=False)
+            report.imported += result.added
+            for conflict in result.conflicts:
+                self._fail(report, lines[conflict.index],
+                           f"conflict: {', '.join(conflict.reasons)} already booked "
+                           f"on {conflict.entry.day.name} period {conflict.entry.time_slot.period}")
+            batch.clear()
+            lines.clear()
+            
+        for line, row in read_rows(path):
+            try:
+                entry = self._parse_entry(row, slots)
+            except (ValueError, TypeError) as e:
+                self._fail(report, line, str(e))
+                continue
+            batch.append(entry)
+            lines.append(line)
+            if len(batch) >= self.batch_size:
+                flush()
+        if batch:
+            flush()
+        return report
@@ -0,0 +1,176 @@
+"""
+Timetable Instrumentation
+Optional call counting, latency percentiles and cProfile capture for
+Timetable operations. Nothing is measured, and nothing costs anything,
+until instrumentation is enabled on a timetable.
+"""
+
+import cProfile
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from timetable import Timetable, wrap_method, unwrap_method
+
+
+# Public Timetable operations that are timed once instrumentation is on
+INSTRUMENTED_METHODS = (
+    "add_subject", "add_teacher", "add_class", "add_time_slot",
+    "remove_subject", "remove_teacher", "remove_class", "remove_time_slot",
+    "add_entry", "add_entries", "has_conflict", "remove_entry", "validate",
+    "get_entries_for_class", "get_entries_for_teacher", "get_entries_for_day",
+    "display_class_timetable", "display_teacher_timetable",
+)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+class MethodStats:
+    """Call count, total and recent latencies of one operation."""
+    
+    def __init__(self, sample_size: int):
+        # The most recent latencies, for percentiles
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+        self.clear()
+        
+    def clear(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples.clear()
+        
+    def add(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        self.samples.append(elapsed)
+        
+    def summary(self) -> Dict[str, float]:
+        """Counts and latencies in seconds."""
+        ordered = sorted(self.samples)
+        return {
+            "calls": self.calls,
+            "total": self.total,
+            "mean": self.total / self.calls if self.calls else 0.0,
+            "p50": _percentile(ordered, 0.50),
+            "p90": _percentile(ordered, 0.90),
+            "p99": _percentile(ordered, 0.99),
+            "max": self.max,
+        }
+
+
+class Instrumentation:
+    """
+    Times the operations of one Timetable.
+    
+    Enabling shadows each method in INSTRUMENTED_METHODS with a timing
+    wrapper stored on the timetable instance, around whatever the
+    attribute was before (such as thread-safety locking); detach() takes
+    only these wrappers out again, so a timetable without instrumentation
+    runs the plain class methods. Calls made from one operation to
+    another (add_entry calling has_conflict) are counted for both.
+    """
+    
+    def __init__(self, timetable: Timetable, sample_size: int = 10000):
+        self.timetable = timetable
+        self.sample_size = sample_size
+        self.methods: Dict[str, MethodStats] = {}
+        self._profiler: Optional[cProfile.Profile] = None
+        self._profile_method: Optional[str] = None
+        self._profile_path: Optional[str] = None
+        self._profile_depth = 0
+        self._wrappers = {name: wrap_method(timetable, name, self._timer(name))
+                          for name in INSTRUMENTED_METHODS}
+                          
+    def _timer(self, name: str):
+        record = self.methods[name] = MethodStats(self.sample_size)
+        perf_counter = time.perf_counter
+        
+        def make(function):
+            def timed(*args, **kwargs):
+                if self._profile_method == name:
+                    return self._profiled(record, timed.__wrapped__, args, kwargs)
+                start = perf_counter()
+                try:
+                    return timed.__wrapped__(*args, **kwargs)
+                finally:
+                    record.add(perf_counter() - start)
+            return timed
+        return make
+        
+    def _profiled(self, record: MethodStats, function, args, kwargs):
+        self._profile_depth += 1
+        start = time.perf_counter()
+        try:
+            if self._profile_depth > 1:
+                return function(*args, **kwargs)
+            return self._profiler.runcall(function, *args, **kwargs)
+        finally:
+            record.add(time.perf_counter() - start)
+            self._profile_depth -= 1
+            
+    def detach(self) -> None:
+        """Remove the timing wrappers, writing any pending profile first."""
+        self.stop_profile()
+        for name, wrapper in self._wrappers.items():
+            unwrap_method(self.timetable, name, wrapper)
+        if self.timetable.instrumentation is self:
+            self.timetable.instrumentation = None
+            
+    def reset(self) -> None:
+        """Clear every counter."""
+        for record in self.methods.values():
+            record.clear()
+            
+    def start_profile(self, method: str, path: str) -> None:
+        """
+        Run every later call of one operation under cProfile. The collected
+        profile is written to path, in pstats format, by stop_profile().
+        """
+        if method not in self.methods:
+            raise ValueError(f"'{method}' is not an instrumented operation")
+        self.stop_profile()
+        self._profiler = cProfile.Profile()
+        self._profile_method = method
+        self._profile_path = path
+        
+    def stop_profile(self) -> Optional[str]:
+        """Stop profiling and write the profile; returns its path, if any."""
+        if self._profiler is None:
+            return None
+        path = self._profile_path
+        self._profiler.dump_stats(path)
+        self._profiler = self._profile_method = self._profile_path = None
+        return path
+        
+    def gauges(self) -> Dict[str, int]:
+        """Current sizes of the timetable."""
+        timetable = self.timetable
+        return {
+            "entries": len(timetable._entries),
+            "subjects": len(timetable.subjects),
+            "teachers": len(timetable.teachers),
+            "classes": len(timetable.classes),
+            "time_slots": len(timetable.time_slots),
+            "observers": len(timetable._observers),
+        }
+        
+    def stats(self) -> Dict:
+        """Per-operation counters, gauges and cache statistics."""
+        caches = {}
+        if self.timetable.render_cache is not None:
+            caches["render"] = self.timetable.render_cache.stats()
+        return {
+            "methods": {name: record.summary()
+                        for name, record in self.methods.items() if record.calls},
+            "gauges": self.gauges(),
+            "caches": caches,
+        }
@@ -0,0 +1,220 @@
+"""
+Change Journal
+Records every change to a Timetable so that changes can be undone and
+redone, and the timetable can be rolled back to a snapshot, by applying
+inverse changes instead of copying the timetable.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from timetable import (
+    Timetable, TimetableObserver, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry
+)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """A point in a journal's history, as returned by ChangeJournal.snapshot()."""
+    steps: int
+    # Serial number of the last change before the snapshot (0 for none),
+    # used to detect snapshots whose history was discarded
+    serial: int
+
+
+class ChangeJournal(TimetableObserver):
+    """
+    Undo/redo history of a Timetable, fed by observer notifications.
+    
+    Each change is recorded as (serial, kind, new, previous). Changes are
+    grouped into steps: one per change, or one per `with journal.step():`
+    block. undo() and redo() move a whole step back or forward by applying
+    inverse changes through the timetable's own index maintenance, so
+    every index and observer (occupancy, render cache, storage) follows
+    along. Making a new change after undoing discards the undone steps.
+    """
+    
+    def __init__(self, timetable: Timetable):
+        self.timetable = timetable
+        self._changes: List[Tuple[int, str, object, object]] = []
+        # Index into _changes at which each step starts
+        self._step_starts: List[int] = []
+        # Number of changes and steps currently applied
+        self._position = 0
+        self._steps = 0
+        self._serial = 0
+        self._group_depth = 0
+        self._group_open = False
+        self._replaying = False
+        timetable.add_observer(self)
+        
+    def detach(self) -> None:
+        """Stop recording and forget the history."""
+        self.timetable.remove_observer(self)
+        if self.timetable.journal is self:
+            self.timetable.journal = None
+        self.clear()
+        
+    def clear(self) -> None:
+        """Forget every recorded change; the current state becomes the start."""
+        self._changes.clear()
+        self._step_starts.clear()
+        self._position = self._steps = 0
+        
+    @contextmanager
+    def step(self) -> Iterator[None]:
+        """Group every change made inside the block into one undo step."""
+        self._group_depth += 1
+        try:
+            yield
+        finally:
+            self._group_depth -= 1
+            if not self._group_depth:
+                self._group_open = False
+                
+    @property
+    def can_undo(self) -> bool:
+        return self._steps > 0
+        
+    @property
+    def can_redo(self) -> bool:
+        return self._steps < len(self._step_starts)
+        
+    def __len__(self) -> int:
+        """Number of steps that can be undone."""
+        return self._steps
+        
+    def _record(self, kind: str, new, previous=None) -> None:
+        if self._replaying:
+            return
+        if self._position < len(self._changes):
+            # A new change after undo: the undone steps can no longer be redone
+            del self._changes[self._position:]
+            del self._step_starts[self._steps:]
+        if not self._group_open:
+            self._step_starts.append(self._position)
+            self._steps += 1
+            self._group_open = self._group_depth > 0
+        self._serial += 1
+        self._changes.append((self._serial, kind, new, previous))
+        self._position += 1
+        
+    def _step_end(self, step: int) -> int:
+        """Index into _changes just past the end of a step."""
+        return self._step_starts[step + 1] if step + 1 < len(self._step_starts) else len(self._changes)
+        
+    def undo(self) -> bool:
+        """Undo the last step; returns False if there is nothing to undo."""
+        if not self.can_undo:
+            return False
+        start = self._step_starts[self._steps - 1]
+        self._replaying = True
+        try:
+            for index in range(self._position - 1, start - 1, -1):
+                self._apply(self._changes[index], forward=False)
+        finally:
+            self._replaying = False
+        self._position = start
+        self._steps -= 1
+        self._group_open = False
+        return True
+        
+    def redo(self) -> bool:
+        """Redo the last undone step; returns False if there is nothing to redo."""
+        if not self.can_redo:
+            return False
+        end = self._step_end(self._steps)
+        self._replaying = True
+        try:
+            for index in range(self._position, end):
+                self._apply(self._changes[index], forward=True)
+        finally:
+            self._replaying = False
+        self._position = end
+        self._steps += 1
+        self._group_open = False
+        return True
+        
+    def snapshot(self) -> Snapshot:
+        """Mark the current state; O(1), nothing is copied."""
+        # Later changes of an open step() block start a new step, so the
+        # snapshot falls on a step boundary
+        self._group_open = False
+        serial = self._changes[self._position - 1][0] if self._position else 0
+        return Snapshot(self._steps, serial)
+        
+    def restore(self, snapshot: Snapshot) -> None:
+        """
+        Undo or redo until the timetable is back at a snapshot. Raises
+        ValueError if the snapshot's history was discarded by a later change.
+        """
+        steps = snapshot.steps
+        if steps > len(self._step_starts):
+            raise ValueError("snapshot is no longer in the journal")
+        position = self._step_starts[steps] if steps < len(self._step_starts) else len(self._changes)
+        serial = self._changes[position - 1][0] if position else 0
+        if serial != snapshot.serial:
+            raise ValueError("snapshot is no longer in the journal")
+        while self._steps > steps:
+            self.undo()
+        while self._steps < steps:
+            self.redo()
+            
+    def _apply(self, change: Tuple[int, str, object, object], forward: bool) -> None:
+        """Apply a change (forward) or its inverse."""
+        _, kind, new, previous = change
+        timetable = self.timetable
+        if kind == "entry_added" or kind == "entry_removed":
+            if (kind == "entry_added") == forward:
+                timetable._insert(new)
+            else:
+                timetable._remove(new)
+        elif kind == "time_slot_added" or kind == "time_slot_removed":
+            if (kind == "time_slot_added") == forward:
+                timetable.add_time_slot(new)
+            else:
+                timetable.remove_time_slot(new)
+        else:
+            add, remove, key = {
+                "subject": (timetable.add_subject, timetable.remove_subject, "code"),
+                "teacher": (timetable.add_teacher, timetable.remove_teacher, "id"),
+                "class": (timetable.add_class, timetable.remove_class, "id"),
+            }[kind]
+            # new/previous are the value after/before the change; None means absent
+            target = new if forward else previous
+            if target is not None:
+                add(target)
+            else:
+                remove(getattr(previous if forward else new, key))
+                
+    def entry_added(self, entry: TimetableEntry) -> None:
+        self._record("entry_added", entry)
+        
+    def entry_removed(self, entry: TimetableEntry) -> None:
+        self._record("entry_removed", entry)
+        
+    def time_slot_added(self, time_slot: TimeSlot) -> None:
+        self._record("time_slot_added", time_slot)
+        
+    def time_slot_removed(self, time_slot: TimeSlot) -> None:
+        self._record("time_slot_removed", time_slot)
+        
+    def subject_added(self, subject: Subject, previous: Optional[Subject]) -> None:
+        self._record("subject", subject, previous)
+        
+    def subject_removed(self, subject: Subject) -> None:
+        self._record("subject", None, subject)
+        
+    def teacher_added(self, teacher: Teacher, previous: Optional[Teacher]) -> None:
+        self._record("teacher", teacher, previous)
+        
+    def teacher_removed(self, teacher: Teacher) -> None:
+        self._record("teacher", None, teacher)
+        
+    def class_added(self, school_class: SchoolClass, previous: Optional[SchoolClass]) -> None:
+        self._record("class", school_class, previous)
+        
+    def class_removed(self, school_class: SchoolClass) -> None:
+        self._record("class", None, school_class)
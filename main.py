@@ -4,21 +4,77 @@ School Timetable Application CLI
 Command-line interface for building and editing school timetables.
 """
 
+import argparse
+import json
+import os
+import sqlite3
 import sys
+from datetime import date
 from typing import Optional
 from timetable import (
     Timetable, Subject, Teacher, SchoolClass, 
     TimeSlot, TimetableEntry, DayOfWeek
 )
+from storage import TimetableStore
+# The solver, importer and exporter are imported where they are used, so
+# short commands such as `validate` start without loading them
+
+
+# Weekly hours used by --generate when none are given
+DEFAULT_SAMPLE_HOURS = "MATH=5,ENG=5,SCI=4,HIST=3,PE=2"
 
 
 class TimetableCLI:
     """Command-line interface for the timetable application."""
     
-    def __init__(self):
-        self.timetable = Timetable()
-        self.setup_default_time_slots()
+    def __init__(self, db_path: Optional[str] = None, create: bool = True):
+        """
+        Open the timetable stored at db_path, or an unsaved one. Unless
+        create is set, a database that does not exist yet is refused with
+        FileNotFoundError rather than created.
+        """
+        self.store: Optional[TimetableStore] = None
+        self._unsaved_default_slots = False
+        if db_path:
+            if not create and not os.path.exists(db_path):
+                raise FileNotFoundError(f"no timetable database at {db_path}")
+            # Changes are written to the database as they are made
+            self.store = TimetableStore(db_path)
+            self.timetable = self.store.load()
+        else:
+            self.timetable = Timetable()
+        if not self.timetable.time_slots:
+            # The defaults are only written once there are entries using them
+            if self.store:
+                self.store.detach()
+            self.setup_default_time_slots()
+            if self.store:
+                self.store.attach(self.timetable)
+                self._unsaved_default_slots = True
+        # Named journal snapshots from the Edit Timetable menu
+        self.snapshots = {}
         
+    def close(self):
+        """Write any pending changes and close the database, if any."""
+        if self.store:
+            if self._unsaved_default_slots and len(self.timetable):
+                for time_slot in self.timetable.time_slots:
+                    self.store.time_slot_added(time_slot)
+            self.store.close()
+            self.store = None
+            
+    def replace_timetable(self, timetable: Timetable):
+        """Switch to a new timetable, saving it in place of the stored one."""
+        # Undo history does not carry over to the new timetable
+        if self.timetable.journal is not None:
+            self.timetable.journal.detach()
+            timetable.enable_journal()
+        self.snapshots.clear()
+        self.timetable = timetable
+        if self.store:
+            self.store.save(timetable)
+            self._unsaved_default_slots = False
+            
     def setup_default_time_slots(self):
         """Setup default time slots for a school day."""
         default_slots = [
@@ -38,6 +94,8 @@ class TimetableCLI:
         print("=" * 70)
         print("School Timetable Builder")
         print("=" * 70)
+        # Record changes from here on so they can be undone
+        self.timetable.enable_journal()
         
         while True:
             print("\nMain Menu:")
@@ -49,9 +107,10 @@ class TimetableCLI:
             print("6. Edit Timetable")
             print("7. Validate Timetable")
             print("8. Load Sample Data")
-            print("9. Exit")
+            print("9. Generate Timetable")
+            print("10. Exit")
             
-            choice = input("\nEnter your choice (1-9): ").strip()
+            choice = input("\nEnter your choice (1-10): ").strip()
             
             if choice == "1":
                 self.manage_subjects()
@@ -68,8 +127,12 @@ class TimetableCLI:
             elif choice == "7":
                 self.validate_timetable()
             elif choice == "8":
-                self.load_sample_data()
+                # Undone as a single change
+                with self.timetable.journal.step():
+                    self.load_sample_data()
             elif choice == "9":
+                self.generate_timetable()
+            elif choice == "10":
                 print("\nExiting... Goodbye!")
                 break
             else:
@@ -241,11 +304,66 @@ class TimetableCLI:
                 print("\nTimetable entry added successfully!")
             else:
                 print("\nCannot add entry: Conflict detected!")
-                print("Either the teacher or the class is already scheduled at this time.")
-                
+                print("The teacher, the class or the room is already scheduled at this time.")
+                suggestions = self.timetable.find_free_slots(teacher_id, class_id, room, limit=5)
+                if suggestions:
+                    print("Free slots for this class, teacher and room:")
+                    for free_day, free_slot in suggestions:
+                        print(f"  {free_day.name} {free_slot}")
+                        
+        except ValueError as e:
+            print(f"Invalid input: {e}")
+            
+    def generate_timetable(self):
+        """Generate a complete timetable automatically."""
+        print("\n--- Generate Timetable ---")
+        
+        if not self.timetable.classes:
+            print("No classes available. Please add classes first.")
+            return
+        if not self.timetable.teachers:
+            print("No teachers available. Please add teachers first.")
+            return
+            
+        from solver import parse_hours
+        spec = input("Enter weekly hours per subject for every class (e.g. MATH=5,ENG=4): ").strip()
+        try:
+            hours = parse_hours(spec)
         except ValueError as e:
             print(f"Invalid input: {e}")
+            return
+        if not hours:
+            print("No subject hours given.")
+            return
+            
+        if len(self.timetable):
+            confirm = input(f"This replaces the existing {len(self.timetable)} entries. "
+                            "Continue? (y/n): ").strip().lower()
+            if confirm != "y":
+                print("Generation cancelled.")
+                return
+                
+        if self.run_generator(hours):
+            print(f"\nGenerated {len(self.timetable)} timetable entries.")
             
+    def run_generator(self, hours) -> bool:
+        """
+        Replace the timetable with a generated one giving every class the
+        same weekly subject hours. Returns True if a timetable was found.
+        """
+        from solver import TimetableSolver
+        requirements = {class_id: dict(hours) for class_id in self.timetable.classes}
+        try:
+            result = TimetableSolver.from_timetable(self.timetable, requirements).solve()
+        except ValueError as e:
+            print(f"Cannot generate timetable: {e}")
+            return False
+        if result is None:
+            print("No conflict-free timetable could be found for these requirements.")
+            return False
+        self.replace_timetable(result)
+        return True
+        
     def view_timetables(self):
         """View timetables menu."""
         while True:
@@ -253,9 +371,10 @@ class TimetableCLI:
             print("1. View Class Timetable")
             print("2. View Teacher Timetable")
             print("3. View All Entries")
-            print("4. Back to Main Menu")
+            print("4. Export All Timetables")
+            print("5. Back to Main Menu")
             
-            choice = input("\nEnter your choice (1-4): ").strip()
+            choice = input("\nEnter your choice (1-5): ").strip()
             
             if choice == "1":
                 class_id = input("Enter class ID: ").strip()
@@ -270,58 +389,113 @@ class TimetableCLI:
                 else:
                     print("Teacher not found.")
             elif choice == "3":
-                if self.timetable.entries:
+                if len(self.timetable):
                     print("\nAll Timetable Entries:")
                     for entry in self.timetable.entries:
                         print(f"  - {entry}")
                 else:
                     print("\nNo timetable entries yet.")
             elif choice == "4":
+                self.export_timetables()
+            elif choice == "5":
                 break
             else:
                 print("Invalid choice.")
                 
-    def edit_timetable(self):
-        """Edit/remove timetable entries."""
-        print("\n--- Edit Timetable ---")
-        
-        if not self.timetable.entries:
-            print("No timetable entries to edit.")
+    def export_timetables(self):
+        """Write every class and teacher timetable to a directory."""
+        from exporter import FORMATS, export_timetables
+        directory = input("Output directory: ").strip()
+        fmt = input(f"Format ({'/'.join(FORMATS)}) [text]: ").strip().lower() or "text"
+        if not directory or fmt not in FORMATS:
+            print("Invalid directory or format.")
             return
-            
-        print("\nCurrent Entries:")
-        for i, entry in enumerate(self.timetable.entries, 1):
-            print(f"{i}. {entry}")
-            
-        print("\n1. Remove an entry")
-        print("2. Back to Main Menu")
-        
-        choice = input("\nEnter your choice (1-2): ").strip()
+        try:
+            paths = export_timetables(self.timetable, directory, fmt)
+        except (OSError, ValueError) as e:
+            print(f"Export failed: {e}")
+            return
+        print(f"Exported {len(paths)} timetables to {directory}.")
         
-        if choice == "1":
-            try:
-                class_id = input("Enter class ID: ").strip()
-                day_num = int(input("Enter day (0-4): ").strip())
-                day = DayOfWeek(day_num)
-                period = int(input("Enter period: ").strip())
+    def edit_timetable(self):
+        """Edit/remove timetable entries, undo and redo changes."""
+        journal = self.timetable.enable_journal()
+        while True:
+            print("\n--- Edit Timetable ---")
+            
+            if len(self.timetable):
+                print("\nCurrent Entries:")
+                for i, entry in enumerate(self.timetable.entries, 1):
+                    print(f"{i}. {entry}")
+            else:
+                print("\nNo timetable entries yet.")
                 
-                if self.timetable.remove_entry(day, period, class_id):
-                    print("Entry removed successfully!")
-                else:
-                    print("Entry not found.")
-            except (ValueError, KeyError) as e:
-                print(f"Invalid input: {e}")
+            print("\n1. Remove an entry")
+            print(f"2. Undo last change ({len(journal)} available)")
+            print("3. Redo")
+            print("4. Save snapshot")
+            print("5. Restore snapshot")
+            print("6. Back to Main Menu")
+            
+            choice = input("\nEnter your choice (1-6): ").strip()
+            
+            if choice == "1":
+                try:
+                    class_id = input("Enter class ID: ").strip()
+                    day_num = int(input("Enter day (0-4): ").strip())
+                    day = DayOfWeek(day_num)
+                    period = int(input("Enter period: ").strip())
+                    
+                    if self.timetable.remove_entry(day, period, class_id):
+                        print("Entry removed successfully!")
+                    else:
+                        print("Entry not found.")
+                except (ValueError, KeyError) as e:
+                    print(f"Invalid input: {e}")
+            elif choice == "2":
+                print("Change undone." if journal.undo() else "Nothing to undo.")
+            elif choice == "3":
+                print("Change redone." if journal.redo() else "Nothing to redo.")
+            elif choice == "4":
+                name = input("Snapshot name: ").strip()
+                if name:
+                    self.snapshots[name] = journal.snapshot()
+                    print(f"Snapshot '{name}' saved.")
+            elif choice == "5":
+                if not self.snapshots:
+                    print("No snapshots saved.")
+                    continue
+                print("Snapshots: " + ", ".join(self.snapshots))
+                name = input("Snapshot name: ").strip()
+                if name not in self.snapshots:
+                    print("Snapshot not found.")
+                    continue
+                try:
+                    journal.restore(self.snapshots[name])
+                    print(f"Restored snapshot '{name}'.")
+                except ValueError as e:
+                    print(f"Cannot restore: {e}")
+            elif choice == "6":
+                break
+            else:
+                print("Invalid choice.")
                 
     def validate_timetable(self):
         """Validate the timetable for conflicts."""
         print("\n--- Validate Timetable ---")
         errors = self.timetable.validate()
+        # Kept up to date from here on, so later checks cost nothing
+        violations = self.timetable.enable_rules().messages()
         
         if errors:
             print("\nValidation Errors Found:")
             for error in errors:
                 print(f"  - {error}")
-        else:
+        if violations:
+            print("\nRule Violations Found:")
+            for violation in violations:
+                print(f"  - {violation}")
+        if not errors and not violations:
             print("\nTimetable is valid! No conflicts found.")
             
     def load_sample_data(self):
@@ -373,9 +547,8 @@ class TimetableCLI:
             TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[1], "C3", "PE", "T005", "GYM"),
         ]
         
-        for entry in sample_entries:
-            self.timetable.add_entry(entry)
-            
+        self.timetable.add_entries(sample_entries)
+        
         print("Sample data loaded successfully!")
         print(f"  - {len(subjects)} subjects")
         print(f"  - {len(teachers)} teachers")
@@ -383,30 +556,351 @@ class TimetableCLI:
         print(f"  - {len(sample_entries)} timetable entries")
 
 
+# Subcommands for scripts: each works on a SQLite timetable file, prints
+# JSON (or the requested format for `show`) and exits 0 on success, 1 when
+# the command ran but the outcome is negative (conflict, invalid timetable,
+# rejected rows, unknown id) and 2 for bad arguments.
+EXIT_OK, EXIT_FAILED, EXIT_USAGE = 0, 1, 2
+DEFAULT_DB = "timetable.db"
+IMPORT_KINDS = ("subjects", "teachers", "classes", "time-slots", "entries")
+
+
+def _emit(data) -> None:
+    print(json.dumps(data))
+
+
+def _parse_day(text: str) -> DayOfWeek:
+    from importer import DAY_LOOKUP
+    day = DAY_LOOKUP.get(text.strip().lower())
+    if day is None:
+        raise argparse.ArgumentTypeError(f"unknown day '{text}'")
+    return day
+
+
+def cmd_import(cli: TimetableCLI, args) -> int:
+    """Import one CSV or JSON Lines file."""
+    from importer import TimetableImporter
+    importer = TimetableImporter(cli.timetable)
+    method = getattr(importer, "import_" + args.kind.replace("-", "_"))
+    report = method(args.path)
+    _emit({"imported": report.imported, "failed": report.failed,
+           "errors": [{"line": e.line, "message": e.message} for e in report.errors]})
+    return EXIT_OK if report.ok else EXIT_FAILED
+
+
+def cmd_add_entry(cli: TimetableCLI, args) -> int:
+    """Add one lesson, refusing it if it conflicts."""
+    slots = {slot.period: slot for slot in cli.timetable.time_slots}
+    if args.period not in slots:
+        print(f"unknown period {args.period}", file=sys.stderr)
+        return EXIT_USAGE
+    entry = TimetableEntry(args.day, slots[args.period], args.class_id,
+                           args.subject, args.teacher, args.room)
+    errors = cli.timetable.reference_errors(entry)
+    if errors:
+        print("; ".join(errors), file=sys.stderr)
+        return EXIT_FAILED
+    report = cli.timetable.add_entries([entry])
+    _emit({"added": report.added,
+           "conflicts": report.conflicts[0].reasons if report.conflicts else []})
+    return EXIT_OK if report.ok else EXIT_FAILED
+
+
+def cmd_remove_entry(cli: TimetableCLI, args) -> int:
+    """Remove the lesson of a class in one slot."""
+    removed = cli.timetable.remove_entry(args.day, args.period, args.class_id)
+    _emit({"removed": int(removed)})
+    return EXIT_OK if removed else EXIT_FAILED
+
+
+def cmd_free_slots(cli: TimetableCLI, args) -> int:
+    """List slots where a teacher, class and room are all free, best first."""
+    slots = cli.timetable.find_free_slots(args.teacher, args.class_id, args.room,
+                                          args.day, args.limit)
+    _emit({"free": [{"day": day.name, "period": slot.period, "start_time": slot.start_time,
+                     "end_time": slot.end_time} for day, slot in slots]})
+    return EXIT_OK if slots else EXIT_FAILED
+
+
+def cmd_cover(cli: TimetableCLI, args) -> int:
+    """Propose substitutes for every lesson of an absent teacher."""
+    from substitutes import SubstituteFinder
+    if args.teacher not in cli.timetable.teachers:
+        print(f"Teacher {args.teacher} not found", file=sys.stderr)
+        return EXIT_FAILED
+    try:
+        covers = SubstituteFinder(cli.timetable).find_cover(args.teacher, args.start, args.end)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    uncovered = sum(1 for cover in covers if cover.substitute is None)
+    _emit({"covers": [{"date": cover.date.isoformat(), "day": cover.entry.day.name,
+                       "period": cover.entry.time_slot.period, "class_id": cover.entry.class_id,
+                       "subject_code": cover.entry.subject_code, "room": cover.entry.room,
+                       "substitute": cover.substitute, "candidates": cover.candidates}
+                      for cover in covers],
+           "uncovered": uncovered})
+    return EXIT_OK if not uncovered else EXIT_FAILED
+
+
+def cmd_validate(cli: TimetableCLI, args) -> int:
+    """Check the stored timetable for conflicts."""
+    errors = cli.timetable.validate()
+    result = {"valid": not errors, "entries": len(cli.timetable), "errors": errors}
+    if args.rules or args.max_periods is not None:
+        from rules import default_rules
+        engine = cli.timetable.enable_rules(default_rules(args.max_periods))
+        result["violations"] = [{"rule": violation.rule, "message": violation.message}
+                                for violation in engine.violations]
+        result["valid"] = not errors and engine.ok
+    _emit(result)
+    return EXIT_OK if result["valid"] else EXIT_FAILED
+
+
+def cmd_show(cli: TimetableCLI, args) -> int:
+    """Print the timetable of one class or teacher."""
+    known = cli.timetable.classes if args.kind == "class" else cli.timetable.teachers
+    if args.id not in known:
+        print(f"{args.kind.capitalize()} {args.id} not found", file=sys.stderr)
+        return EXIT_FAILED
+    if args.format == "text":
+        if args.kind == "class":
+            print(cli.timetable.display_class_timetable(args.id))
+        else:
+            print(cli.timetable.display_teacher_timetable(args.id))
+    else:
+        from exporter import TimetableExporter
+        exporter = TimetableExporter(cli.timetable, args.format)
+        exporter.write_view(exporter.view(args.kind, args.id), sys.stdout)
+    return EXIT_OK
+
+
+def cmd_export(cli: TimetableCLI, args) -> int:
+    """Write every class and teacher timetable to a directory."""
+    from exporter import export_timetables
+    paths = export_timetables(cli.timetable, args.directory, args.format, args.workers)
+    _emit({"written": len(paths), "directory": args.directory})
+    return EXIT_OK
+
+
+def cmd_generate(cli: TimetableCLI, args) -> int:
+    """Replace the stored entries with a generated timetable."""
+    from solver import TimetableSolver, parse_hours
+    try:
+        hours = parse_hours(args.hours)
+        requirements = {class_id: dict(hours) for class_id in cli.timetable.classes}
+        result = TimetableSolver.from_timetable(cli.timetable, requirements).solve(seed=args.seed)
+    except ValueError as e:
+        print(f"cannot generate timetable: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if result is None:
+        _emit({"generated": False, "entries": 0})
+        return EXIT_FAILED
+    cli.replace_timetable(result)
+    _emit({"generated": True, "entries": len(result)})
+    return EXIT_OK
+
+
+def cmd_stats(cli: TimetableCLI, args) -> int:
+    """Time the common read operations on the stored timetable."""
+    from instrumentation import INSTRUMENTED_METHODS
+    timetable = cli.timetable
+    instrumentation = timetable.enable_instrumentation()
+    if args.profile:
+        if args.profile not in INSTRUMENTED_METHODS:
+            print(f"unknown operation '{args.profile}'", file=sys.stderr)
+            return EXIT_USAGE
+        instrumentation.start_profile(args.profile, args.profile_output)
+    if args.render_cache:
+        timetable.enable_render_cache()
+    entries = timetable.entries
+    for _ in range(args.repeat):
+        timetable.validate()
+        for entry in entries:
+            timetable.has_conflict(entry)
+        for day in DayOfWeek:
+            timetable.get_entries_for_day(day)
+        for class_id in timetable.classes:
+            timetable.get_entries_for_class(class_id)
+            timetable.display_class_timetable(class_id)
+        for teacher_id in timetable.teachers:
+            timetable.get_entries_for_teacher(teacher_id)
+            timetable.display_teacher_timetable(teacher_id)
+    result = instrumentation.stats()
+    result["profile"] = instrumentation.stop_profile()
+    _emit(result)
+    return EXIT_OK
+
+
+def cmd_serve(cli: TimetableCLI, args) -> int:
+    """Serve the stored timetable as a JSON API until interrupted."""
+    from server import serve
+    serve(cli.timetable, args.host, args.port, cli.store)
+    return EXIT_OK
+
+
+# Only these commands create a database that does not exist yet; the
+# others report a missing one, so a mistyped --db path is not mistaken
+# for an empty, valid timetable
+CREATING_COMMANDS = (cmd_import, cmd_add_entry, cmd_generate)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser for the scriptable subcommands."""
+    parser = argparse.ArgumentParser(
+        prog="main.py", description="Work with a timetable stored in a SQLite file.")
+    parser.add_argument("--db", default=os.environ.get("TIMETABLE_DB", DEFAULT_DB),
+                        help=f"timetable file (default: $TIMETABLE_DB or {DEFAULT_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    command = commands.add_parser("import", help="import a CSV or JSON Lines file")
+    command.add_argument("kind", choices=IMPORT_KINDS)
+    command.add_argument("path")
+    command.set_defaults(handler=cmd_import)
+    
+    for name, handler in (("add-entry", cmd_add_entry), ("remove-entry", cmd_remove_entry)):
+        command = commands.add_parser(name, help=handler.__doc__.rstrip(".").lower())
+        command.add_argument("--day", required=True, type=_parse_day)
+        command.add_argument("--period", required=True, type=int)
+        command.add_argument("--class", dest="class_id", required=True)
+        if name == "add-entry":
+            command.add_argument("--subject", required=True)
+            command.add_argument("--teacher", required=True)
+            command.add_argument("--room")
+        command.set_defaults(handler=handler)
+        
+    command = commands.add_parser("free-slots", help="suggest slots free for a teacher, class and room")
+    command.add_argument("--teacher")
+    command.add_argument("--class", dest="class_id")
+    command.add_argument("--room")
+    command.add_argument("--day", action="append", type=_parse_day,
+                         help="only this day (may be repeated)")
+    command.add_argument("--limit", type=int, default=10)
+    command.set_defaults(handler=cmd_free_slots)
+    
+    command = commands.add_parser("cover", help="propose substitutes for an absent teacher")
+    command.add_argument("--teacher", required=True)
+    command.add_argument("--from", dest="start", required=True, type=date.fromisoformat,
+                         help="first day of the absence, YYYY-MM-DD")
+    command.add_argument("--to", dest="end", type=date.fromisoformat,
+                         help="last day of the absence (default: the first day)")
+    command.set_defaults(handler=cmd_cover)
+    
+    command = commands.add_parser("validate", help="check the timetable for conflicts")
+    command.add_argument("--rules", action="store_true",
+                         help="also check qualifications and unknown ids")
+    command.add_argument("--max-periods", type=int, metavar="N",
+                         help="also check that no teacher teaches more than N periods a day")
+    command.set_defaults(handler=cmd_validate)
+    
+    command = commands.add_parser("show", help="print a class or teacher timetable")
+    command.add_argument("kind", choices=("class", "teacher"))
+    command.add_argument("id")
+    command.add_argument("--format", choices=("text", "csv", "html", "json"), default="text")
+    command.set_defaults(handler=cmd_show)
+    
+    command = commands.add_parser("export", help="write every timetable to a directory")
+    command.add_argument("directory")
+    command.add_argument("--format", choices=("text", "csv", "html", "json"), default="text")
+    command.add_argument("--workers", type=int, default=4)
+    command.set_defaults(handler=cmd_export)
+    
+    command = commands.add_parser("generate", help="generate entries for the stored school")
+    command.add_argument("hours", nargs="?", default=DEFAULT_SAMPLE_HOURS,
+                         help=f"weekly hours per subject (default: {DEFAULT_SAMPLE_HOURS})")
+    command.add_argument("--seed", type=int)
+    command.set_defaults(handler=cmd_generate)
+    
+    command = commands.add_parser("stats", help="time common operations on the timetable")
+    command.add_argument("--repeat", type=int, default=3, help="workload rounds (default: 3)")
+    command.add_argument("--render-cache", action="store_true",
+                         help="enable the render cache and report its statistics")
+    command.add_argument("--profile", metavar="OPERATION",
+                         help="write a cProfile of this operation, e.g. validate")
+    command.add_argument("--profile-output", default="timetable.prof",
+                         help="profile file (default: timetable.prof)")
+    command.set_defaults(handler=cmd_stats)
+    
+    command = commands.add_parser("serve", help="serve the timetable as a JSON API")
+    command.add_argument("--host", default="127.0.0.1",
+                         help="address to listen on (default: 127.0.0.1)")
+    command.add_argument("--port", type=int, default=8080, help="port (default: 8080)")
+    command.set_defaults(handler=cmd_serve)
+    return parser
+
+
+def run_command(argv) -> int:
+    """Run one subcommand and return its exit code."""
+    args = build_parser().parse_args(argv)
+    cli = None
+    try:
+        cli = TimetableCLI(args.db, create=args.handler in CREATING_COMMANDS)
+        return args.handler(cli, args)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        # Missing or unreadable files, ones that cannot be decoded, and
+        # files that are not timetable databases
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    finally:
+        if cli is not None:
+            cli.close()
+
+
 def main():
     """Main entry point for the application."""
-    cli = TimetableCLI()
+    args = sys.argv[1:]
+    # Subcommands, with or without a leading --db PATH
+    command_at = 2 if len(args) > 1 and args[0] == "--db" else 0
+    if args[command_at:command_at + 1] in (["-h"], ["--help"]) or (
+            len(args) > command_at and not args[command_at].startswith("-")):
+        sys.exit(run_command(args))
+        
+    db_path = None
+    if len(args) > 1 and args[0] == "--db":
+        db_path = args[1]
+        args = args[2:]
+    cli = TimetableCLI(db_path)
     
-    # Check if running in interactive mode
-    if len(sys.argv) > 1 and sys.argv[1] == "--demo":
-        # Load sample data and display
-        cli.load_sample_data()
-        print("\n" + "=" * 70)
-        print("Sample Timetable for Grade 9A:")
-        print(cli.timetable.display_class_timetable("C1"))
-        print("\n" + "=" * 70)
-        print("Sample Timetable for Mr. Smith:")
-        print(cli.timetable.display_teacher_timetable("T001"))
-    else:
-        # Run interactive CLI
-        try:
-            cli.run()
-        except KeyboardInterrupt:
-            print("\n\nInterrupted. Exiting...")
-        except Exception as e:
-            print(f"\nError: {e}")
-            sys.exit(1)
-
+    try:
+        # Check if running in interactive mode
+        if args and args[0] == "--demo":
+            # Load sample data and display
+            cli.load_sample_data()
+            print("\n" + "=" * 70)
+            print("Sample Timetable for Grade 9A:")
+            print(cli.timetable.display_class_timetable("C1"))
+            print("\n" + "=" * 70)
+            print("Sample Timetable for Mr. Smith:")
+            print(cli.timetable.display_teacher_timetable("T001"))
+        elif args and args[0] == "--generate":
+            # Generate a full week for the sample school and display it
+            from solver import parse_hours
+            spec = args[1] if len(args) > 1 else DEFAULT_SAMPLE_HOURS
+            try:
+                hours = parse_hours(spec)
+            except ValueError as e:
+                print(f"Invalid hours: {e}")
+                sys.exit(2)
+            cli.load_sample_data()
+            if not cli.run_generator(hours):
+                sys.exit(1)
+            for class_id in cli.timetable.classes:
+                print(cli.timetable.display_class_timetable(class_id))
+            errors = cli.timetable.validate()
+            print(f"\nGenerated {len(cli.timetable)} entries, "
+                  f"{len(errors)} validation errors.")
+        else:
+            # Run interactive CLI
+            try:
+                cli.run()
+            except KeyboardInterrupt:
+                print("\n\nInterrupted. Exiting...")
+            except Exception as e:
+                print(f"\nError: {e}")
+                sys.exit(1)
+                
+    finally:
+        cli.close()
 
 if __name__ == "__main__":
     main()
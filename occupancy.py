@@ -0,0 +1,213 @@
+"""
+Bitset Occupancy Matrix
+Whole-week occupancy of every teacher, class and room held as integer
+bitsets, so availability and load questions are answered with a few
+bitwise operations instead of loops over timetable entries.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from timetable import Timetable, TimetableObserver, TimetableEntry, TimeSlot, DayOfWeek
+
+
+# Number of set bits in a mask, shared by every module working on bitsets
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:  # Python < 3.10
+    def popcount(mask: int) -> int:
+        return bin(mask).count("1")
+
+
+class OccupancyMatrix(TimetableObserver):
+    """
+    Occupancy bitsets shaped [teacher x slot], [class x slot] and [room x slot].
+    
+    Every (day, period) slot of the week owns one bit. Bits are laid out
+    period-major (bit = period_index * day_count + day), so periods added
+    to the timetable later simply take the next higher bits. The matrix
+    registers itself as an observer and stays in sync as entries are added
+    and removed.
+    """
+    
+    def __init__(self, timetable: Timetable, days: Optional[Iterable[DayOfWeek]] = None):
+        self.timetable = timetable
+        self.days: List[DayOfWeek] = list(days) if days is not None else list(DayOfWeek)
+        self._day_index = {day: i for i, day in enumerate(self.days)}
+        self._period_index: Dict[int, int] = {}
+        self._slots: List[TimeSlot] = []
+        self.teacher_masks: Dict[str, int] = {}
+        self.class_masks: Dict[str, int] = {}
+        self.room_masks: Dict[str, int] = {}
+        # Number of lessons taught in each slot, indexed by bit position
+        self.slot_counts: List[int] = []
+        # Per-day masks in self.days order, rebuilt when a period is added
+        self._day_masks: Optional[List[int]] = None
+        
+        for time_slot in sorted(timetable.time_slots, key=lambda s: s.period):
+            self._add_period(time_slot)
+        for entry in timetable.entries:
+            self.entry_added(entry)
+        timetable.add_observer(self)
+        
+    def detach(self) -> None:
+        """Stop following the timetable."""
+        self.timetable.remove_observer(self)
+        if self.timetable.occupancy is self:
+            self.timetable.occupancy = None
+            
+    def _add_period(self, time_slot: TimeSlot) -> int:
+        """Give a period its own row of bits; returns the period index."""
+        index = len(self._slots)
+        self._period_index[time_slot.period] = index
+        self._slots.append(time_slot)
+        self.slot_counts.extend([0] * len(self.days))
+        self._day_masks = None
+        return index
+        
+    @property
+    def full_mask(self) -> int:
+        """Mask with a bit set for every slot of the week."""
+        return (1 << (len(self._slots) * len(self.days))) - 1
+        
+    def slot_bit(self, day: DayOfWeek, period: int) -> int:
+        """Bit position of a (day, period) slot."""
+        return self._period_index[period] * len(self.days) + self._day_index[day]
+        
+    def slot_at(self, bit: int) -> Tuple[DayOfWeek, TimeSlot]:
+        """(day, TimeSlot) for a bit position."""
+        period_index, day_index = divmod(bit, len(self.days))
+        return self.days[day_index], self._slots[period_index]
+        
+    def time_slot_added(self, time_slot: TimeSlot) -> None:
+        if time_slot.period not in self._period_index:
+            self._add_period(time_slot)
+            
+    def _entry_bit(self, entry: TimetableEntry) -> int:
+        if entry.time_slot.period not in self._period_index:
+            self._add_period(entry.time_slot)
+        return self.slot_bit(entry.day, entry.time_slot.period)
+        
+    def entry_added(self, entry: TimetableEntry) -> None:
+        bit = self._entry_bit(entry)
+        mask = 1 << bit
+        self.teacher_masks[entry.teacher_id] = self.teacher_masks.get(entry.teacher_id, 0) | mask
+        self.class_masks[entry.class_id] = self.class_masks.get(entry.class_id, 0) | mask
+        if entry.room is not None:
+            self.room_masks[entry.room] = self.room_masks.get(entry.room, 0) | mask
+        self.slot_counts[bit] += 1
+        
+    def entry_removed(self, entry: TimetableEntry) -> None:
+        bit = self._entry_bit(entry)
+        mask = ~(1 << bit)
+        self.teacher_masks[entry.teacher_id] &= mask
+        self.class_masks[entry.class_id] &= mask
+        if entry.room is not None:
+            self.room_masks[entry.room] &= mask
+        self.slot_counts[bit] -= 1
+        
+    def busy_mask(self, teacher_id: Optional[str] = None, class_id: Optional[str] = None,
+                  room: Optional[str] = None) -> int:
+        """Slots in which any of the given teacher, class or room is busy."""
+        mask = 0
+        if teacher_id is not None:
+            mask |= self.teacher_masks.get(teacher_id, 0)
+        if class_id is not None:
+            mask |= self.class_masks.get(class_id, 0)
+        if room is not None:
+            mask |= self.room_masks.get(room, 0)
+        return mask
+        
+    def free_mask(self, teacher_id: Optional[str] = None, class_id: Optional[str] = None,
+                  room: Optional[str] = None) -> int:
+        """Slots in which the given teacher, class and room are all free."""
+        return self.full_mask & ~self.busy_mask(teacher_id, class_id, room)
+        
+    def slots_in(self, mask: int) -> List[Tuple[DayOfWeek, TimeSlot]]:
+        """(day, TimeSlot) pairs for the bits of a mask, in bit order."""
+        slots = []
+        while mask:
+            low = mask & -mask
+            slots.append(self.slot_at(low.bit_length() - 1))
+            mask ^= low
+        return slots
+        
+    def free_slots(self, teacher_id: Optional[str] = None, class_id: Optional[str] = None,
+                   room: Optional[str] = None) -> List[Tuple[DayOfWeek, TimeSlot]]:
+        """(day, TimeSlot) pairs free for the given teacher, class and room."""
+        return self.slots_in(self.free_mask(teacher_id, class_id, room))
+        
+    def is_free(self, day: DayOfWeek, period: int, teacher_id: Optional[str] = None,
+                class_id: Optional[str] = None, room: Optional[str] = None) -> bool:
+        """Whether the given teacher, class and room are all free in a slot."""
+        if period not in self._period_index:
+            return True
+        return not self.busy_mask(teacher_id, class_id, room) >> self.slot_bit(day, period) & 1
+        
+    def teacher_load(self) -> Dict[str, int]:
+        """Lessons per week for every teacher."""
+        return {tid: popcount(mask) for tid, mask in self.teacher_masks.items()}
+        
+    def class_load(self) -> Dict[str, int]:
+        """Lessons per week for every class."""
+        return {cid: popcount(mask) for cid, mask in self.class_masks.items()}
+        
+    def room_usage(self) -> Dict[str, int]:
+        """Booked slots per week for every room."""
+        return {room: popcount(mask) for room, mask in self.room_masks.items()}
+        
+    def day_mask(self, day: DayOfWeek) -> int:
+        """Mask selecting every slot of one day."""
+        return self._all_day_masks()[self._day_index[day]]
+        
+    def _all_day_masks(self) -> List[int]:
+        if self._day_masks is None:
+            step = len(self.days)
+            # One bit per period, repeated every `step` bits, shifted per day
+            base = 0
+            for period_index in range(len(self._slots)):
+                base |= 1 << (period_index * step)
+            self._day_masks = [base << offset for offset in range(step)]
+        return self._day_masks
+        
+    def find_free_slots(self, teacher_id: Optional[str] = None, class_id: Optional[str] = None,
+                        room: Optional[str] = None, days: Optional[Iterable[DayOfWeek]] = None,
+                        limit: Optional[int] = None) -> List[Tuple[DayOfWeek, TimeSlot]]:
+        """
+        (day, TimeSlot) pairs where the teacher, class and room are all
+        free, optionally only on some days, best first: days on which the
+        teacher and class already have the fewest lessons come first, to
+        spread the load, then earlier periods, then earlier days.
+        """
+        free = self.free_mask(teacher_id, class_id, room)
+        day_masks = self._all_day_masks()
+        if days is not None:
+            allowed = 0
+            for day in days:
+                if day in self._day_index:
+                    allowed |= day_masks[self._day_index[day]]
+            free &= allowed
+        if not free:
+            return []
+        teacher_lessons = self.busy_mask(teacher_id=teacher_id)
+        class_lessons = self.busy_mask(class_id=class_id)
+        day_load = [popcount(teacher_lessons & mask) + popcount(class_lessons & mask)
+                    for mask in day_masks]
+        step = len(self.days)
+        bits = []
+        while free:
+            low = free & -free
+            bits.append(low.bit_length() - 1)
+            free ^= low
+        # Bits are period-major, so ordering by bit is earlier period, then earlier day
+        bits.sort(key=lambda bit: (day_load[bit % step], bit))
+        if limit is not None:
+            bits = bits[:limit]
+        return [self.slot_at(bit) for bit in bits]
+        
+    def period_fill(self) -> Dict[Tuple[DayOfWeek, int], int]:
+        """Number of lessons running in each (day, period) slot."""
+        fill = {}
+        for bit, count in enumerate(self.slot_counts):
+            day, time_slot = self.slot_at(bit)
+            fill[(day, time_slot.period)] = count
+        return fill
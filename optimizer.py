@@ -0,0 +1,346 @@
+"""
+School Timetable Optimizer
+Local search that improves a conflict-free timetable against soft
+constraints: teacher gaps, repeated subjects in a day and heavy days.
+"""
+
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from occupancy import popcount
+from timetable import Timetable, TimetableEntry, DayOfWeek
+
+
+@dataclass
+class CostWeights:
+    """Penalty weights for the soft constraints."""
+    teacher_gap: float = 1.0       # per free period between a teacher's lessons
+    repeated_subject: float = 2.0  # per extra lesson of a subject in a class's day
+    heavy_day: float = 1.0         # per lesson above a teacher's daily maximum
+
+
+def _teacher_day_cost(mask: int, weights: CostWeights, max_daily_lessons: int) -> float:
+    """Gap and heavy-day penalty for a bitmask of one teacher's periods on one day."""
+    if not mask:
+        return 0.0
+    lessons = popcount(mask)
+    first = (mask & -mask).bit_length() - 1
+    gaps = mask.bit_length() - first - lessons
+    heavy = max(0, lessons - max_daily_lessons)
+    return weights.teacher_gap * gaps + weights.heavy_day * heavy
+
+
+def timetable_cost(timetable: Timetable, weights: Optional[CostWeights] = None,
+                   max_daily_lessons: int = 5) -> float:
+    """
+    Soft-constraint cost of a timetable, as TimetableOptimizer.cost()
+    scores it, but without the optimizer's limit on periods per day.
+    """
+    weights = weights or CostWeights()
+    period_index = {s.period: i for i, s in
+                    enumerate(sorted(timetable.time_slots, key=lambda s: s.period))}
+    masks: Dict[Tuple[str, DayOfWeek], int] = {}
+    subject_counts: Dict[Tuple[str, DayOfWeek, str], int] = {}
+    for entry in timetable.entries:
+        period = entry.time_slot.period
+        if period not in period_index:
+            period_index[period] = len(period_index)
+        key = (entry.teacher_id, entry.day)
+        masks[key] = masks.get(key, 0) | 1 << period_index[period]
+        key = (entry.class_id, entry.day, entry.subject_code)
+        subject_counts[key] = subject_counts.get(key, 0) + 1
+    total = sum(_teacher_day_cost(mask, weights, max_daily_lessons) for mask in masks.values())
+    total += weights.repeated_subject * sum(n - 1 for n in subject_counts.values() if n > 1)
+    return total
+
+
+class TimetableOptimizer:
+    """
+    Simulated annealing over lesson moves and swaps.
+    
+    Two kinds of moves are tried: relocating a lesson to a slot where its
+    class, teacher and room are free, and swapping two lessons of the same
+    class when both teachers and rooms are free in the exchanged slots.
+    Hard constraints therefore hold after every move. The soft cost is a
+    sum of independent per (teacher, day) and per (class, day) terms, so a
+    move is scored from the handful of terms it touches rather than by
+    re-scoring the whole timetable.
+    """
+    
+    def __init__(self, timetable: Timetable, weights: Optional[CostWeights] = None,
+                 max_daily_lessons: int = 5):
+        self.timetable = timetable
+        self.weights = weights or CostWeights()
+        self.max_daily_lessons = max_daily_lessons
+        self.days: List[DayOfWeek] = list(DayOfWeek)
+        self.time_slots = sorted(timetable.time_slots, key=lambda s: s.period)
+        self.moves = 0
+        self.accepted = 0
+        self.best_cost = 0.0
+        
+        self._period_index = {s.period: i for i, s in enumerate(self.time_slots)}
+        for entry in timetable.entries:
+            if entry.time_slot.period not in self._period_index:
+                self._period_index[entry.time_slot.period] = len(self.time_slots)
+                self.time_slots.append(entry.time_slot)
+        if len(self.time_slots) > 16:
+            raise ValueError("The optimizer supports at most 16 periods per day")
+            
+        # Teacher-day cost for every possible bitmask of occupied periods
+        period_count = len(self.time_slots)
+        self._day_cost = [self._teacher_day_cost(mask) for mask in range(1 << period_count)]
+        self._load_state()
+        
+    def _teacher_day_cost(self, mask: int) -> float:
+        """Gap and heavy-day penalty for one teacher's periods on one day."""
+        return _teacher_day_cost(mask, self.weights, self.max_daily_lessons)
+        
+    def _load_state(self) -> None:
+        """Encode the timetable's entries as flat integer arrays."""
+        entries = self.timetable.entries
+        day_index = {day: i for i, day in enumerate(self.days)}
+        day_count, period_count = len(self.days), len(self.time_slots)
+        
+        def intern(values: List[str]) -> Tuple[List[int], List[str]]:
+            codes: Dict[str, int] = {}
+            return [codes.setdefault(v, len(codes)) for v in values], list(codes)
+            
+        self._entries = entries
+        self._class, self._class_ids = intern([e.class_id for e in entries])
+        self._teacher, self._teacher_ids = intern([e.teacher_id for e in entries])
+        self._subject, _ = intern([e.subject_code for e in entries])
+        rooms = [e.room for e in entries]
+        room_codes: Dict[str, int] = {}
+        self._room = [-1 if r is None else room_codes.setdefault(r, len(room_codes))
+                      for r in rooms]
+        self._day = [day_index[e.day] for e in entries]
+        self._period = [self._period_index[e.time_slot.period] for e in entries]
+        
+        # Occupancy: bitmask of periods per (teacher, day) and (room, day),
+        # lesson index per (class, day, period)
+        self._teacher_mask = [0] * (len(self._teacher_ids) * day_count)
+        self._room_mask = [0] * (len(room_codes) * day_count)
+        self._class_at = [-1] * (len(self._class_ids) * day_count * period_count)
+        self._subject_count: Dict[Tuple[int, int], int] = {}
+        for i in range(len(entries)):
+            d, p = self._day[i], self._period[i]
+            self._teacher_mask[self._teacher[i] * day_count + d] |= 1 << p
+            if self._room[i] >= 0:
+                self._room_mask[self._room[i] * day_count + d] |= 1 << p
+            self._class_at[(self._class[i] * day_count + d) * period_count + p] = i
+            key = (self._class[i] * day_count + d, self._subject[i])
+            self._subject_count[key] = self._subject_count.get(key, 0) + 1
+            
+    def cost(self) -> float:
+        """Total soft-constraint cost of the current state, computed from scratch."""
+        total = sum(self._day_cost[mask] for mask in self._teacher_mask)
+        total += self.weights.repeated_subject * sum(
+            n - 1 for n in self._subject_count.values() if n > 1)
+        return total
+        
+    def _move_subject(self, class_day_from: int, class_day_to: int, subject: int) -> float:
+        """Move one lesson's subject count between class days; returns the penalty delta."""
+        if class_day_from == class_day_to:
+            return 0.0
+        counts = self._subject_count
+        delta = 0
+        key = (class_day_from, subject)
+        n = counts[key]
+        if n > 1:
+            delta -= 1
+        if n == 1:
+            del counts[key]
+        else:
+            counts[key] = n - 1
+        key = (class_day_to, subject)
+        n = counts.get(key, 0)
+        if n > 0:
+            delta += 1
+        counts[key] = n + 1
+        return self.weights.repeated_subject * delta
+        
+    def _relocate(self, i: int, d: int, p: int) -> float:
+        """Move lesson i to (day d, period p); returns the cost delta."""
+        day_count, period_count = len(self.days), len(self.time_slots)
+        d0, p0 = self._day[i], self._period[i]
+        t, r, c = self._teacher[i], self._room[i], self._class[i]
+        masks, cost = self._teacher_mask, self._day_cost
+        
+        a, b = t * day_count + d0, t * day_count + d
+        if a == b:
+            old = masks[a]
+            masks[a] = old & ~(1 << p0) | (1 << p)
+            delta = cost[masks[a]] - cost[old]
+        else:
+            old_a, old_b = masks[a], masks[b]
+            masks[a] = old_a & ~(1 << p0)
+            masks[b] = old_b | (1 << p)
+            delta = (cost[masks[a]] - cost[old_a]) + (cost[masks[b]] - cost[old_b])
+        if r >= 0:
+            rooms = self._room_mask
+            rooms[r * day_count + d0] &= ~(1 << p0)
+            rooms[r * day_count + d] |= 1 << p
+        self._class_at[(c * day_count + d0) * period_count + p0] = -1
+        self._class_at[(c * day_count + d) * period_count + p] = i
+        delta += self._move_subject(c * day_count + d0, c * day_count + d, self._subject[i])
+        self._day[i], self._period[i] = d, p
+        return delta
+        
+    def _can_relocate(self, i: int, d: int, p: int) -> bool:
+        """Whether lesson i's class, teacher and room are free at (d, p)."""
+        day_count, period_count = len(self.days), len(self.time_slots)
+        if self._class_at[(self._class[i] * day_count + d) * period_count + p] >= 0:
+            return False
+        if self._teacher_mask[self._teacher[i] * day_count + d] >> p & 1:
+            return False
+        r = self._room[i]
+        return r < 0 or not self._room_mask[r * day_count + d] >> p & 1
+        
+    def _try_swap(self, i: int, j: int) -> Optional[float]:
+        """
+        Swap the slots of lessons i and j of the same class.
+        Returns the cost delta, or None (leaving the state untouched) if a
+        teacher or room would be double-booked.
+        """
+        di, pi, dj, pj = self._day[i], self._period[i], self._day[j], self._period[j]
+        # Vacate both slots, then check each lesson fits the other's slot
+        delta = self._relocate_out(i) + self._relocate_out(j)
+        if self._fits(i, dj, pj) and self._fits(j, di, pi):
+            return delta + self._relocate_in(i, dj, pj) + self._relocate_in(j, di, pi)
+        self._relocate_in(i, di, pi)
+        self._relocate_in(j, dj, pj)
+        return None
+        
+    def _relocate_out(self, i: int) -> float:
+        """Take lesson i out of its teacher and room occupancy; returns the cost delta."""
+        day_count = len(self.days)
+        d, p = self._day[i], self._period[i]
+        key = self._teacher[i] * day_count + d
+        old = self._teacher_mask[key]
+        self._teacher_mask[key] = old & ~(1 << p)
+        if self._room[i] >= 0:
+            self._room_mask[self._room[i] * day_count + d] &= ~(1 << p)
+        return self._day_cost[old & ~(1 << p)] - self._day_cost[old]
+        
+    def _fits(self, i: int, d: int, p: int) -> bool:
+        """Whether lesson i's teacher and room are free at (d, p)."""
+        day_count = len(self.days)
+        if self._teacher_mask[self._teacher[i] * day_count + d] >> p & 1:
+            return False
+        r = self._room[i]
+        return r < 0 or not self._room_mask[r * day_count + d] >> p & 1
+        
+    def _relocate_in(self, i: int, d: int, p: int) -> float:
+        """Put a vacated lesson i back at (d, p); returns the cost delta."""
+        day_count, period_count = len(self.days), len(self.time_slots)
+        c = self._class[i]
+        key = self._teacher[i] * day_count + d
+        old = self._teacher_mask[key]
+        self._teacher_mask[key] = old | (1 << p)
+        if self._room[i] >= 0:
+            self._room_mask[self._room[i] * day_count + d] |= 1 << p
+        self._class_at[(c * day_count + d) * period_count + p] = i
+        delta = self._day_cost[old | (1 << p)] - self._day_cost[old]
+        delta += self._move_subject(c * day_count + self._day[i], c * day_count + d,
+                                    self._subject[i])
+        self._day[i], self._period[i] = d, p
+        return delta
+        
+    def optimize(self, time_budget: float = 1.0, seed: Optional[int] = None,
+                 max_moves: Optional[int] = None, start_temperature: float = 2.0,
+                 end_temperature: float = 0.02) -> Timetable:
+        """
+        Improve the timetable by simulated annealing.
+        Runs until the time budget (seconds) or max_moves is used up, and
+        returns a new Timetable holding the best state found. With max_moves
+        and no time budget the run is fully reproducible for a given seed.
+        """
+        if not time_budget and not max_moves:
+            raise ValueError("Either time_budget or max_moves must be set")
+        rng = random.Random(seed)
+        lesson_count = len(self._entries)
+        day_count, period_count = len(self.days), len(self.time_slots)
+        current = self.cost()
+        best = current
+        best_state = (self._day[:], self._period[:])
+        if lesson_count == 0:
+            return self._build_timetable(best_state)
+            
+        start = time.perf_counter()
+        temperature = start_temperature
+        ratio = end_temperature / start_temperature
+        class_at = self._class_at
+        moves = accepted = 0
+        while True:
+            if moves % 256 == 0:
+                progress = 0.0
+                if time_budget:
+                    progress = (time.perf_counter() - start) / time_budget
+                if max_moves:
+                    progress = max(progress, moves / max_moves)
+                if progress >= 1.0:
+                    break
+                temperature = start_temperature * ratio ** progress
+            moves += 1
+            
+            i = rng.randrange(lesson_count)
+            d = rng.randrange(day_count)
+            p = rng.randrange(period_count)
+            d0, p0 = self._day[i], self._period[i]
+            j = class_at[(self._class[i] * day_count + d) * period_count + p]
+            if j == i:
+                continue
+            if j < 0:
+                if not self._can_relocate(i, d, p):
+                    continue
+                delta = self._relocate(i, d, p)
+                undo = (i, d0, p0)
+            else:
+                delta = self._try_swap(i, j)
+                if delta is None:
+                    continue
+                undo = (i, j)
+                
+            if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                accepted += 1
+                current += delta
+                if current < best - 1e-9:
+                    best = current
+                    best_state = (self._day[:], self._period[:])
+            elif len(undo) == 3:
+                self._relocate(*undo)
+            else:
+                self._try_swap(*undo)
+                
+        self.moves, self.accepted, self.best_cost = moves, accepted, best
+        return self._build_timetable(best_state)
+        
+    def _build_timetable(self, state: Tuple[List[int], List[int]]) -> Timetable:
+        """Create a new Timetable with every lesson at its slot in the given state."""
+        days, periods = state
+        result = Timetable()
+        for subject in self.timetable.subjects.values():
+            result.add_subject(subject)
+        for teacher in self.timetable.teachers.values():
+            result.add_teacher(teacher)
+        for school_class in self.timetable.classes.values():
+            result.add_class(school_class)
+        for time_slot in self.timetable.time_slots:
+            result.add_time_slot(time_slot)
+        for i, entry in enumerate(self._entries):
+            moved = TimetableEntry(self.days[days[i]], self.time_slots[periods[i]],
+                                   entry.class_id, entry.subject_code,
+                                   entry.teacher_id, entry.room)
+            if not result.add_entry(moved):
+                raise RuntimeError(f"Optimizer produced a conflicting entry: {moved}")
+        return result
+
+
+def optimize_timetable(timetable: Timetable, time_budget: float = 1.0,
+                       seed: Optional[int] = None,
+                       weights: Optional[CostWeights] = None) -> Timetable:
+    """Return an improved copy of a timetable, searching for time_budget seconds."""
+    return TimetableOptimizer(timetable, weights).optimize(time_budget, seed)
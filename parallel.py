@@ -0,0 +1,169 @@
+"""
+Parallel Multi-Start Solving
+Runs independent generation and optimization attempts with different
+seeds across a process pool and keeps the best timetable.
+"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from solver import TimetableSolver
+from optimizer import TimetableOptimizer, timetable_cost
+
+
+@dataclass
+class MultiStartResult:
+    """Best timetable found by a multi-start run."""
+    timetable: Timetable
+    seed: int
+    cost: float
+    solved: int
+
+
+def encode_problem(classes: Iterable[SchoolClass], teachers: Iterable[Teacher],
+                   time_slots: Iterable[TimeSlot],
+                   requirements: Dict[str, Dict[str, int]],
+                   subjects: Iterable[Subject] = ()) -> tuple:
+    """
+    Encode solver inputs as plain tuples, which pickle far smaller and
+    faster than the dataclasses themselves.
+    """
+    return (
+        tuple((c.id, c.name, c.students_count) for c in classes),
+        tuple((t.id, t.name, tuple(t.subjects)) for t in teachers),
+        tuple((s.period, s.start_time, s.end_time) for s in time_slots),
+        tuple((class_id, tuple(hours.items())) for class_id, hours in requirements.items()),
+        tuple((s.code, s.name) for s in subjects),
+    )
+
+
+def decode_problem(problem: tuple) -> TimetableSolver:
+    """Rebuild a solver from encode_problem() output."""
+    classes, teachers, time_slots, requirements, subjects = problem
+    return TimetableSolver(
+        [SchoolClass(*c) for c in classes],
+        [Teacher(id_, name, list(codes)) for id_, name, codes in teachers],
+        [TimeSlot(*s) for s in time_slots],
+        {class_id: dict(hours) for class_id, hours in requirements},
+        [Subject(*s) for s in subjects],
+    )
+
+
+def pack_entries(timetable: Timetable, class_ids: Sequence[str],
+                 teacher_ids: Sequence[str], subject_codes: Sequence[str],
+                 periods: Sequence[int]) -> bytes:
+    """
+    Pack entries into a flat array of small integers: day, period index,
+    class index, subject index and teacher index per entry. Rooms are not
+    packed; generated entries never have one.
+    """
+    class_index = {v: i for i, v in enumerate(class_ids)}
+    teacher_index = {v: i for i, v in enumerate(teacher_ids)}
+    subject_index = {v: i for i, v in enumerate(subject_codes)}
+    period_index = {v: i for i, v in enumerate(periods)}
+    packed = array("H")
+    for entry in timetable.entries:
+        packed.extend((entry.day.value, period_index[entry.time_slot.period],
+                       class_index[entry.class_id], subject_index[entry.subject_code],
+                       teacher_index[entry.teacher_id]))
+    return packed.tobytes()
+
+
+def unpack_entries(data: bytes, time_slots: Sequence[TimeSlot], class_ids: Sequence[str],
+                   teacher_ids: Sequence[str],
+                   subject_codes: Sequence[str]) -> List[TimetableEntry]:
+    """Inverse of pack_entries()."""
+    packed = array("H")
+    packed.frombytes(data)
+    return [
+        TimetableEntry(DayOfWeek(packed[i]), time_slots[packed[i + 1]],
+                       class_ids[packed[i + 2]], subject_codes[packed[i + 3]],
+                       teacher_ids[packed[i + 4]])
+        for i in range(0, len(packed), 5)
+    ]
+
+
+def _subject_codes(problem: tuple) -> List[str]:
+    """Subject codes that can appear in a solution, in a stable order."""
+    return sorted({code for _, hours in problem[3] for code, _ in hours})
+
+
+# Per-process problem, set once by the pool initializer so each task only
+# ships its seed
+_worker_problem: Optional[tuple] = None
+
+
+def _init_worker(problem: tuple) -> None:
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _attempt(seed: int, optimize_moves: int, problem: Optional[tuple] = None
+             ) -> Optional[Tuple[int, float, bytes]]:
+    """Solve (and optionally optimize) with one seed; returns (seed, cost, packed entries)."""
+    problem = problem if problem is not None else _worker_problem
+    solver = decode_problem(problem)
+    timetable = solver.solve(seed=seed)
+    if timetable is None:
+        return None
+    if optimize_moves:
+        optimizer = TimetableOptimizer(timetable)
+        timetable = optimizer.optimize(time_budget=0, seed=seed, max_moves=optimize_moves)
+        cost = optimizer.best_cost
+    else:
+        cost = timetable_cost(timetable)
+    packed = pack_entries(timetable, [c[0] for c in problem[0]], [t[0] for t in problem[1]],
+                          _subject_codes(problem), [s.period for s in solver.time_slots])
+    return seed, cost, packed
+
+
+def solve_parallel(classes: Iterable[SchoolClass], teachers: Iterable[Teacher],
+                   time_slots: Iterable[TimeSlot],
+                   requirements: Dict[str, Dict[str, int]],
+                   subjects: Iterable[Subject] = (), attempts: int = 8,
+                   workers: Optional[int] = None, base_seed: int = 0,
+                   optimize_moves: int = 0) -> Optional[MultiStartResult]:
+    """
+    Run `attempts` independent solves with seeds base_seed, base_seed + 1, ...
+    and return the lowest-cost timetable, or None if every attempt failed.
+    
+    Each attempt optionally runs optimize_moves optimizer moves, which
+    needs at most 16 periods per day; without moves any number of periods
+    is fine. Attempts are deterministic per seed, and ties go to the
+    lowest seed, so the result does not depend on the number of workers.
+    workers=1 runs in this process without a pool.
+    """
+    problem = encode_problem(classes, teachers, time_slots, requirements, subjects)
+    seeds = range(base_seed, base_seed + attempts)
+    if workers == 1:
+        results = [_attempt(seed, optimize_moves, problem) for seed in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(problem,)) as pool:
+            results = list(pool.map(_attempt, seeds, [optimize_moves] * attempts))
+            
+    solved = [r for r in results if r is not None]
+    if not solved:
+        return None
+    seed, cost, packed = min(solved, key=lambda r: (r[1], r[0]))
+    
+    solver = decode_problem(problem)
+    timetable = Timetable()
+    for subject in solver.subjects:
+        timetable.add_subject(subject)
+    for teacher in solver.teachers:
+        timetable.add_teacher(teacher)
+    for school_class in solver.classes:
+        timetable.add_class(school_class)
+    for time_slot in solver.time_slots:
+        timetable.add_time_slot(time_slot)
+    for entry in unpack_entries(packed, solver.time_slots, [c.id for c in solver.classes],
+                                [t.id for t in solver.teachers], _subject_codes(problem)):
+        timetable.add_entry(entry)
+    return MultiStartResult(timetable, seed, cost, len(solved))
@@ -0,0 +1,143 @@
+"""
+Rendered Timetable Cache
+Keeps the text of recently displayed class and teacher timetables and
+drops exactly the views affected by each change to the timetable.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from timetable import Timetable, TimetableObserver, TimetableEntry, Subject, Teacher, SchoolClass
+
+
+# ("class", class_id) or ("teacher", teacher_id) for views, and also
+# ("subject", code) for the things a view depends on
+Key = Tuple[str, str]
+
+
+class RenderCache(TimetableObserver):
+    """
+    LRU cache of rendered class and teacher timetables.
+    
+    Each cached view records what it was rendered from: its own class or
+    teacher, plus every subject, teacher and class named in its rows.
+    Adding or removing an entry drops the views of that entry's class and
+    teacher; replacing a subject, teacher or class drops the views that
+    depend on it. At most max_size views are kept.
+    """
+    
+    def __init__(self, timetable: Timetable, max_size: int = 256):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.timetable = timetable
+        self.max_size = max_size
+        self._views: "OrderedDict[Key, str]" = OrderedDict()
+        self._depends_on: Dict[Key, Set[Key]] = {}
+        self._dependents: Dict[Key, Set[Key]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        timetable.add_observer(self)
+        
+    def detach(self) -> None:
+        """Stop following the timetable and forget every view."""
+        self.timetable.remove_observer(self)
+        if self.timetable.render_cache is self:
+            self.timetable.render_cache = None
+        self.clear()
+        
+    def __len__(self) -> int:
+        return len(self._views)
+        
+    def render(self, kind: str, id_: str) -> str:
+        """Rendered timetable of a class (kind "class") or teacher (kind "teacher")."""
+        key = (kind, id_)
+        text = self._views.get(key)
+        if text is not None:
+            self.hits += 1
+            self._views.move_to_end(key)
+            return text
+        self.misses += 1
+        if kind == "class":
+            text = self.timetable._render_class_timetable(id_)
+            entries = self.timetable.get_entries_for_class(id_)
+            depends_on = {("teacher", e.teacher_id) for e in entries}
+        elif kind == "teacher":
+            text = self.timetable._render_teacher_timetable(id_)
+            entries = self.timetable.get_entries_for_teacher(id_)
+            depends_on = {("class", e.class_id) for e in entries}
+        else:
+            raise ValueError(f"unknown view kind '{kind}'")
+        depends_on.update(("subject", e.subject_code) for e in entries)
+        depends_on.add(key)
+        self._store(key, text, depends_on)
+        return text
+        
+    def _store(self, key: Key, text: str, depends_on: Set[Key]) -> None:
+        self._views[key] = text
+        self._depends_on[key] = depends_on
+        for dependency in depends_on:
+            self._dependents.setdefault(dependency, set()).add(key)
+        while len(self._views) > self.max_size:
+            oldest = next(iter(self._views))
+            self._drop(oldest)
+            self.evictions += 1
+            
+    def _drop(self, key: Key) -> None:
+        del self._views[key]
+        for dependency in self._depends_on.pop(key):
+            dependents = self._dependents[dependency]
+            dependents.discard(key)
+            if not dependents:
+                del self._dependents[dependency]
+                
+    def invalidate(self, kind: str, id_: str) -> None:
+        """Drop the view of a class or teacher, if cached."""
+        key = (kind, id_)
+        if key in self._views:
+            self._drop(key)
+            self.invalidations += 1
+            
+    def invalidate_dependents(self, kind: str, id_: str) -> None:
+        """Drop every view rendered from a subject, teacher or class."""
+        for key in list(self._dependents.get((kind, id_), ())):
+            self._drop(key)
+            self.invalidations += 1
+            
+    def clear(self) -> None:
+        """Forget every cached view."""
+        self._views.clear()
+        self._depends_on.clear()
+        self._dependents.clear()
+        
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss, eviction and invalidation counters and the current size."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "invalidations": self.invalidations, "size": len(self._views)}
+                
+    def entry_added(self, entry: TimetableEntry) -> None:
+        self.invalidate("class", entry.class_id)
+        self.invalidate("teacher", entry.teacher_id)
+        
+    def entry_removed(self, entry: TimetableEntry) -> None:
+        self.invalidate("class", entry.class_id)
+        self.invalidate("teacher", entry.teacher_id)
+        
+    def subject_added(self, subject: Subject, previous: Optional[Subject]) -> None:
+        self.invalidate_dependents("subject", subject.code)
+        
+    def teacher_added(self, teacher: Teacher, previous: Optional[Teacher]) -> None:
+        self.invalidate_dependents("teacher", teacher.id)
+        
+    def class_added(self, school_class: SchoolClass, previous: Optional[SchoolClass]) -> None:
+        self.invalidate_dependents("class", school_class.id)
+        
+    def subject_removed(self, subject: Subject) -> None:
+        self.invalidate_dependents("subject", subject.code)
+        
+    def teacher_removed(self, teacher: Teacher) -> None:
+        self.invalidate_dependents("teacher", teacher.id)
+        
+    def class_removed(self, school_class: SchoolClass) -> None:
+        self.invalidate_dependents("class", school_class.id)
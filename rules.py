@@ -0,0 +1,288 @@
+"""
+Incremental Validation Rules
+Keeps a live set of rule violations for a Timetable, updated with each
+change, so the current violations can be read at any time without
+re-validating the whole timetable.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, ValuesView
+
+from timetable import (
+    Timetable, TimetableObserver, Subject, Teacher, SchoolClass, TimetableEntry, DayOfWeek
+)
+
+
+@dataclass
+class Violation:
+    """A broken rule; entry is the offending entry, if the rule is about one."""
+    rule: str
+    message: str
+    entry: Optional[TimetableEntry] = None
+    
+    def __str__(self):
+        return self.message
+
+
+class Rule:
+    """
+    Base class for incremental rules. A rule follows entry and reference
+    changes through the engine's notifications and calls engine.report()
+    and engine.resolve() to keep its violations current.
+    """
+    name = "rule"
+    
+    def entry_added(self, engine: "RuleEngine", entry: TimetableEntry) -> None:
+        """Called after an entry has been added."""
+        
+    def entry_removed(self, engine: "RuleEngine", entry: TimetableEntry) -> None:
+        """Called after an entry has been removed."""
+        
+    def reference_changed(self, engine: "RuleEngine", kind: str, id_: str) -> None:
+        """Called after a subject, teacher or class has been added, replaced or removed."""
+
+
+class EntryRule(Rule):
+    """
+    A rule about single entries. Subclasses implement check(); the entry
+    is re-checked whenever its subject, teacher or class changes.
+    """
+    
+    def check(self, timetable: Timetable, entry: TimetableEntry) -> Optional[str]:
+        """Violation message for an entry, or None if it satisfies the rule."""
+        raise NotImplementedError
+        
+    def _check(self, engine: "RuleEngine", entry: TimetableEntry) -> None:
+        message = self.check(engine.timetable, entry)
+        if message is None:
+            engine.resolve(self.name, id(entry))
+        else:
+            engine.report(self.name, id(entry), message, entry)
+            
+    def entry_added(self, engine: "RuleEngine", entry: TimetableEntry) -> None:
+        self._check(engine, entry)
+        
+    def entry_removed(self, engine: "RuleEngine", entry: TimetableEntry) -> None:
+        engine.resolve(self.name, id(entry))
+        
+    def reference_changed(self, engine: "RuleEngine", kind: str, id_: str) -> None:
+        for entry in engine.entries_for(kind, id_):
+            self._check(engine, entry)
+
+
+def _where(entry: TimetableEntry) -> str:
+    return f"{entry.day.name} period {entry.time_slot.period}, class {entry.class_id}"
+
+
+class QualificationRule(EntryRule):
+    """The teacher of an entry must teach its subject."""
+    name = "qualification"
+    
+    def check(self, timetable: Timetable, entry: TimetableEntry) -> Optional[str]:
+        teacher = timetable.teachers.get(entry.teacher_id)
+        # Unknown teachers are reported by UnknownReferenceRule
+        if teacher is None or entry.subject_code in teacher.subjects:
+            return None
+        return (f"Teacher {entry.teacher_id} is not qualified to teach "
+                f"{entry.subject_code} ({_where(entry)})")
+
+
+class UnknownReferenceRule(EntryRule):
+    """The subject, teacher and class of an entry must exist."""
+    name = "unknown_reference"
+    
+    def check(self, timetable: Timetable, entry: TimetableEntry) -> Optional[str]:
+        unknown = []
+        if entry.subject_code not in timetable.subjects:
+            unknown.append(f"subject {entry.subject_code}")
+        if entry.teacher_id not in timetable.teachers:
+            unknown.append(f"teacher {entry.teacher_id}")
+        if entry.class_id not in timetable.classes:
+            unknown.append(f"class {entry.class_id}")
+        if not unknown:
+            return None
+        return f"Unknown {', '.join(unknown)} ({_where(entry)})"
+
+
+class RoomCapacityRule(EntryRule):
+    """
+    The room of an entry must seat its class. Rooms are not modelled by
+    the timetable, so their capacities are given to the rule; rooms
+    without a known capacity are not checked.
+    """
+    name = "room_capacity"
+    
+    def __init__(self, capacities: Dict[str, int]):
+        self.capacities = dict(capacities)
+        
+    def check(self, timetable: Timetable, entry: TimetableEntry) -> Optional[str]:
+        capacity = self.capacities.get(entry.room)
+        school_class = timetable.classes.get(entry.class_id)
+        if capacity is None or school_class is None or school_class.students_count <= capacity:
+            return None
+        return (f"Room {entry.room} seats {capacity} but class {entry.class_id} has "
+                f"{school_class.students_count} students ({_where(entry)})")
+
+
+class MaxPeriodsPerDayRule(Rule):
+    """A teacher may teach at most max_periods periods a day."""
+    name = "max_periods_per_day"
+    
+    def __init__(self, max_periods: int):
+        if max_periods < 1:
+            raise ValueError("max_periods must be at least 1")
+        self.max_periods = max_periods
+        self._counts: Dict[Tuple[str, DayOfWeek], int] = {}
+        
+    def _update(self, engine: "RuleEngine", entry: TimetableEntry, delta: int) -> None:
+        key = (entry.teacher_id, entry.day)
+        count = self._counts.get(key, 0) + delta
+        if count:
+            self._counts[key] = count
+        else:
+            del self._counts[key]
+        if count > self.max_periods:
+            engine.report(self.name, key,
+                          f"Teacher {entry.teacher_id} teaches {count} periods on "
+                          f"{entry.day.name} (max {self.max_periods})")
+        else:
+            engine.resolve(self.name, key)
+            
+    def entry_added(self, engine: "RuleEngine", entry: TimetableEntry) -> None:
+        self._update(engine, entry, 1)
+        
+    def entry_removed(self, engine: "RuleEngine", entry: TimetableEntry) -> None:
+        self._update(engine, entry, -1)
+
+
+def default_rules(max_periods_per_day: Optional[int] = None,
+                  room_capacities: Optional[Dict[str, int]] = None) -> List[Rule]:
+    """
+    Qualification and unknown-reference rules, plus the daily limit and
+    room capacity rules when their settings are given.
+    """
+    rules: List[Rule] = [UnknownReferenceRule(), QualificationRule()]
+    if max_periods_per_day is not None:
+        rules.append(MaxPeriodsPerDayRule(max_periods_per_day))
+    if room_capacities is not None:
+        rules.append(RoomCapacityRule(room_capacities))
+    return rules
+
+
+class RuleEngine(TimetableObserver):
+    """
+    Live rule violations of a Timetable.
+    
+    Violations are kept in a dict keyed by (rule name, key), where the
+    key identifies what the violation is about (an entry, or a teacher
+    and day). Every change to the timetable is passed to each rule, which
+    reports or resolves only the violations it affects, so the cost of a
+    change does not grow with the size of the timetable and reading the
+    current violations is O(1).
+    """
+    
+    def __init__(self, timetable: Timetable, rules: Optional[Iterable[Rule]] = None):
+        self.timetable = timetable
+        self.rules: List[Rule] = []
+        self._violations: Dict[Tuple[str, Hashable], Violation] = {}
+        # Entries per subject; the timetable indexes classes and teachers
+        self._by_subject: Dict[str, Dict[int, TimetableEntry]] = {}
+        for entry in timetable.entries:
+            self._by_subject.setdefault(entry.subject_code, {})[id(entry)] = entry
+        for rule in rules if rules is not None else default_rules():
+            self.add_rule(rule)
+        timetable.add_observer(self)
+        
+    def detach(self) -> None:
+        """Stop following the timetable."""
+        self.timetable.remove_observer(self)
+        if self.timetable.rule_engine is self:
+            self.timetable.rule_engine = None
+            
+    def add_rule(self, rule: Rule) -> None:
+        """Add a rule and check the existing entries against it."""
+        if any(existing.name == rule.name for existing in self.rules):
+            raise ValueError(f"rule '{rule.name}' already exists")
+        self.rules.append(rule)
+        for entry in self.timetable.entries:
+            rule.entry_added(self, entry)
+            
+    def remove_rule(self, name: str) -> Rule:
+        """Remove a rule, and its violations, by name."""
+        for index, rule in enumerate(self.rules):
+            if rule.name == name:
+                del self.rules[index]
+                for key in [key for key in self._violations if key[0] == name]:
+                    del self._violations[key]
+                return rule
+        raise KeyError(name)
+        
+    @property
+    def violations(self) -> ValuesView[Violation]:
+        """The current violations, as a live view (no copy is made)."""
+        return self._violations.values()
+        
+    def __len__(self) -> int:
+        return len(self._violations)
+        
+    @property
+    def ok(self) -> bool:
+        """True if no rule is broken."""
+        return not self._violations
+        
+    def messages(self) -> List[str]:
+        """Messages of the current violations, sorted."""
+        return sorted(violation.message for violation in self._violations.values())
+        
+    def report(self, rule: str, key: Hashable, message: str,
+               entry: Optional[TimetableEntry] = None) -> None:
+        """Record, or update, the violation of a rule about key."""
+        self._violations[rule, key] = Violation(rule, message, entry)
+        
+    def resolve(self, rule: str, key: Hashable) -> None:
+        """Drop the violation of a rule about key, if any."""
+        self._violations.pop((rule, key), None)
+        
+    def entries_for(self, kind: str, id_: str) -> List[TimetableEntry]:
+        """Entries of a subject, teacher or class."""
+        if kind == "subject":
+            return list(self._by_subject.get(id_, {}).values())
+        if kind == "teacher":
+            return self.timetable.get_entries_for_teacher(id_)
+        return self.timetable.get_entries_for_class(id_)
+        
+    def entry_added(self, entry: TimetableEntry) -> None:
+        self._by_subject.setdefault(entry.subject_code, {})[id(entry)] = entry
+        for rule in self.rules:
+            rule.entry_added(self, entry)
+            
+    def entry_removed(self, entry: TimetableEntry) -> None:
+        entries = self._by_subject.get(entry.subject_code)
+        if entries is not None:
+            entries.pop(id(entry), None)
+            if not entries:
+                del self._by_subject[entry.subject_code]
+        for rule in self.rules:
+            rule.entry_removed(self, entry)
+            
+    def _reference_changed(self, kind: str, id_: str) -> None:
+        for rule in self.rules:
+            rule.reference_changed(self, kind, id_)
+            
+    def subject_added(self, subject: Subject, previous: Optional[Subject]) -> None:
+        self._reference_changed("subject", subject.code)
+        
+    def subject_removed(self, subject: Subject) -> None:
+        self._reference_changed("subject", subject.code)
+        
+    def teacher_added(self, teacher: Teacher, previous: Optional[Teacher]) -> None:
+        self._reference_changed("teacher", teacher.id)
+        
+    def teacher_removed(self, teacher: Teacher) -> None:
+        self._reference_changed("teacher", teacher.id)
+        
+    def class_added(self, school_class: SchoolClass, previous: Optional[SchoolClass]) -> None:
+        self._reference_changed("class", school_class.id)
+        
+    def class_removed(self, school_class: SchoolClass) -> None:
+        self._reference_changed("class", school_class.id)
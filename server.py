@@ -0,0 +1,468 @@
+"""
+Timetable JSON API Server
+A small asyncio HTTP/1.1 server over a Timetable for many concurrent
+readers: class, teacher and day views, free-slot and validation queries,
+streamed exports, and serialized writes. Uses only the standard library.
+"""
+
+import asyncio
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from timetable import (
+    Timetable, TimetableObserver, Subject, Teacher, SchoolClass, TimetableEntry, DayOfWeek
+)
+
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1 << 20
+# Export output is sent in chunks of about this many characters
+CHUNK_SIZE = 1 << 16
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+           431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    """A request that cannot be served, with its HTTP status."""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, List[str]]
+    body: bytes
+    # Path parameters captured by the route
+    params: Dict[str, str] = field(default_factory=dict)
+    
+    def arg(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """First value of a query parameter."""
+        values = self.query.get(name)
+        return values[0] if values else default
+        
+    def json(self) -> Dict[str, Any]:
+        """The body parsed as a JSON object."""
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body is not valid JSON") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        return data
+
+
+@dataclass
+class Response:
+    status: int
+    body: bytes = b""
+    content_type: str = "application/json"
+    # Text chunks sent with chunked transfer encoding instead of body
+    chunks: Optional[Iterator[str]] = None
+
+
+def json_response(data: Any, status: int = 200) -> Response:
+    return Response(status, json.dumps(data).encode())
+
+
+def entry_to_dict(entry: TimetableEntry) -> Dict[str, Any]:
+    """JSON form of an entry, as used in every response."""
+    return {"day": entry.day.name, "period": entry.time_slot.period,
+            "start_time": entry.time_slot.start_time, "end_time": entry.time_slot.end_time,
+            "class_id": entry.class_id, "subject_code": entry.subject_code,
+            "teacher_id": entry.teacher_id, "room": entry.room}
+
+
+def _sorted_entries(entries: List[TimetableEntry]) -> List[Dict[str, Any]]:
+    entries = sorted(entries, key=lambda e: (e.day.value, e.time_slot.period))
+    return [entry_to_dict(entry) for entry in entries]
+
+
+def _parse_day(text: str) -> DayOfWeek:
+    from importer import DAY_LOOKUP
+    day = DAY_LOOKUP.get(text.strip().lower())
+    if day is None:
+        raise HTTPError(400, f"unknown day '{text}'")
+    return day
+
+
+def _required(data: Dict[str, Any], name: str) -> str:
+    value = data.get(name)
+    if value is None or str(value).strip() == "":
+        raise HTTPError(400, f"missing field '{name}'")
+    return str(value).strip()
+
+
+def _int(text: Any, name: str) -> int:
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"'{name}' must be an integer") from None
+
+
+class TimetableServer(TimetableObserver):
+    """
+    Serves a Timetable as a JSON API.
+    
+    Routes:
+        GET    /classes, /classes/{id}       class list, class timetable
+        GET    /teachers, /teachers/{id}     teacher list, teacher timetable
+        GET    /days/{day}                   every lesson on a day
+        GET    /free-slots                   ?teacher=&class=&room=&day=&limit=
+        GET    /validate                     conflicts and rule violations
+        GET    /export                       ?format=text|csv|html|json, streamed
+        POST   /entries                      add a lesson (409 if it conflicts)
+        DELETE /entries/{day}/{period}/{class_id}
+        POST   /subjects, /teachers, /classes
+        
+    Class and teacher timetables are kept encoded until they change, and
+    accept ?format=text, which is served from the render cache. Reads run
+    straight on the event loop against the timetable's indexes, occupancy
+    matrix and rule engine, which are all kept up to date incrementally,
+    so a read never waits for a rebuild. Writes take a lock, so they are
+    serialized; an export takes it only to snapshot the timetable, and
+    streams the snapshot after releasing it. Responses are always sent
+    outside the lock. Connections are kept alive.
+    """
+    
+    def __init__(self, timetable: Timetable, store=None):
+        self.timetable = timetable
+        # Optional TimetableStore, flushed after every write
+        self.store = store
+        timetable.enable_occupancy()
+        timetable.enable_render_cache()
+        timetable.enable_rules()
+        # Encoded JSON class and teacher views, dropped when they change
+        self._views: Dict[Tuple[str, str], bytes] = {}
+        # Changes to entries since start, and validate() as of a version
+        self._version = 0
+        self._validated: Tuple[int, List[str]] = (-1, [])
+        timetable.add_observer(self)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self.routes: List[Tuple[str, "re.Pattern", Callable[[Request], Response], bool]] = []
+        for method, pattern, handler, exclusive in (
+                ("GET", "/classes", self.list_classes, False),
+                ("GET", "/classes/{id}", self.get_class, False),
+                ("GET", "/teachers", self.list_teachers, False),
+                ("GET", "/teachers/{id}", self.get_teacher, False),
+                ("GET", "/days/{day}", self.get_day, False),
+                ("GET", "/free-slots", self.free_slots, False),
+                ("GET", "/validate", self.validate, False),
+                ("GET", "/export", self.export, True),
+                ("POST", "/entries", self.add_entry, True),
+                ("DELETE", "/entries/{day}/{period}/{class_id}", self.remove_entry, True),
+                ("POST", "/subjects", self.add_subject, True),
+                ("POST", "/teachers", self.add_teacher, True),
+                ("POST", "/classes", self.add_class, True)):
+            regex = re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern) + "$")
+            self.routes.append((method, regex, handler, exclusive))
+            
+    def entry_added(self, entry: TimetableEntry) -> None:
+        self._version += 1
+        self._views.pop(("class", entry.class_id), None)
+        self._views.pop(("teacher", entry.teacher_id), None)
+        
+    def entry_removed(self, entry: TimetableEntry) -> None:
+        self.entry_added(entry)
+        
+    def teacher_added(self, teacher: Teacher, previous: Optional[Teacher]) -> None:
+        self._views.pop(("teacher", teacher.id), None)
+        
+    def teacher_removed(self, teacher: Teacher) -> None:
+        self._views.pop(("teacher", teacher.id), None)
+        
+    def class_added(self, school_class: SchoolClass, previous: Optional[SchoolClass]) -> None:
+        self._views.pop(("class", school_class.id), None)
+        
+    def class_removed(self, school_class: SchoolClass) -> None:
+        self._views.pop(("class", school_class.id), None)
+        
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """Start listening (on a free port by default) and return the server."""
+        self._write_lock = asyncio.Lock()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+        
+    @property
+    def port(self) -> int:
+        """The port the server is listening on."""
+        return self._server.sockets[0].getsockname()[1]
+        
+    async def close(self) -> None:
+        """Stop listening and stop following the timetable."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.timetable.remove_observer(self)
+        
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until it is closed."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, json_response({"error": "headers too large"}, 431),
+                                     "HTTP/1.1", False)
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    await self._send(writer, json_response({"error": "bad request line"}, 400),
+                                     "HTTP/1.1", False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else \
+                    connection == "keep-alive"
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY:
+                    await self._send(writer, json_response({"error": "bad body length"}, 413),
+                                     version, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                if not await self._dispatch(writer, method, target, body, version, keep_alive):
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            
+    async def _dispatch(self, writer: asyncio.StreamWriter, method: str, target: str,
+                        body: bytes, version: str, keep_alive: bool) -> bool:
+        """Route one request and send the response; returns keep_alive."""
+        url = urlsplit(target)
+        request = Request(method, url.path, parse_qs(url.query), body)
+        allowed = False
+        for route_method, regex, handler, exclusive in self.routes:
+            match = regex.match(url.path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            request.params = {name: unquote(value) for name, value in match.groupdict().items()}
+            if not exclusive:
+                response = self._call(handler, request)
+                return await self._send(writer, response, version, keep_alive)
+            async with self._write_lock:
+                response = self._call(handler, request)
+                if self.store is not None and method != "GET":
+                    self.store.flush()
+            # Sent after releasing the lock, so a slow client holds up nobody
+            return await self._send(writer, response, version, keep_alive)
+        if allowed:
+            return await self._send(writer, json_response({"error": "method not allowed"}, 405),
+                                    version, keep_alive)
+        return await self._send(writer, json_response({"error": "not found"}, 404),
+                                version, keep_alive)
+                                
+    @staticmethod
+    def _call(handler: Callable[[Request], Response], request: Request) -> Response:
+        try:
+            return handler(request)
+        except HTTPError as e:
+            return json_response({"error": e.message}, e.status)
+        except Exception as e:
+            print(f"error serving {request.method} {request.path}: {e!r}", file=sys.stderr)
+            return json_response({"error": "internal error"}, 500)
+            
+    async def _send(self, writer: asyncio.StreamWriter, response: Response, version: str,
+                    keep_alive: bool) -> bool:
+        """Write a response; returns whether the connection stays open."""
+        status = f"{version} {response.status} {REASONS.get(response.status, '')}\r\n"
+        connection = "keep-alive" if keep_alive else "close"
+        if response.chunks is None:
+            writer.write((f"{status}Content-Type: {response.content_type}\r\n"
+                          f"Content-Length: {len(response.body)}\r\n"
+                          f"Connection: {connection}\r\n\r\n").encode() + response.body)
+            await writer.drain()
+            return keep_alive
+        # Streamed: chunked for HTTP/1.1, ended by closing the connection otherwise
+        chunked = version == "HTTP/1.1"
+        keep_alive = keep_alive and chunked
+        headers = f"{status}Content-Type: {response.content_type}\r\n"
+        if chunked:
+            headers += "Transfer-Encoding: chunked\r\n"
+        writer.write(f"{headers}Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                     .encode())
+        buffered: List[str] = []
+        size = 0
+        for text in response.chunks:
+            buffered.append(text)
+            size += len(text)
+            if size >= CHUNK_SIZE:
+                self._write_chunk(writer, "".join(buffered), chunked)
+                buffered, size = [], 0
+                await writer.drain()
+        if buffered:
+            self._write_chunk(writer, "".join(buffered), chunked)
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return keep_alive
+        
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, text: str, chunked: bool) -> None:
+        data = text.encode()
+        if chunked:
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        else:
+            writer.write(data)
+            
+    # Handlers
+    
+    def list_classes(self, request: Request) -> Response:
+        return json_response([{"id": c.id, "name": c.name, "students_count": c.students_count}
+                              for c in self.timetable.classes.values()])
+                              
+    def list_teachers(self, request: Request) -> Response:
+        return json_response([{"id": t.id, "name": t.name, "subjects": t.subjects}
+                              for t in self.timetable.teachers.values()])
+                              
+    def _view(self, request: Request, kind: str) -> Response:
+        id_ = request.params["id"]
+        known = self.timetable.classes if kind == "class" else self.timetable.teachers
+        if id_ not in known:
+            raise HTTPError(404, f"{kind} '{id_}' not found")
+        if request.arg("format") == "text":
+            text = self.timetable.render_cache.render(kind, id_)
+            return Response(200, text.encode(), "text/plain; charset=utf-8")
+        body = self._views.get((kind, id_))
+        if body is None:
+            if kind == "class":
+                entries = self.timetable.get_entries_for_class(id_)
+            else:
+                entries = self.timetable.get_entries_for_teacher(id_)
+            body = self._views[kind, id_] = json.dumps(
+                {"id": id_, "name": known[id_].name, "entries": _sorted_entries(entries)}).encode()
+        return Response(200, body)
+        
+    def get_class(self, request: Request) -> Response:
+        return self._view(request, "class")
+        
+    def get_teacher(self, request: Request) -> Response:
+        return self._view(request, "teacher")
+        
+    def get_day(self, request: Request) -> Response:
+        day = _parse_day(request.params["day"])
+        return json_response({"day": day.name,
+                              "entries": _sorted_entries(self.timetable.get_entries_for_day(day))})
+                              
+    def free_slots(self, request: Request) -> Response:
+        days = [_parse_day(text) for text in request.query.get("day", ())]
+        limit = request.arg("limit")
+        slots = self.timetable.find_free_slots(
+            request.arg("teacher"), request.arg("class"), request.arg("room"),
+            days or None, _int(limit, "limit") if limit is not None else None)
+        return json_response({"free": [
+            {"day": day.name, "period": slot.period, "start_time": slot.start_time,
+             "end_time": slot.end_time} for day, slot in slots]})
+             
+    def validate(self, request: Request) -> Response:
+        # Conflicts can only change with the entries, so the last scan is reused
+        version, errors = self._validated
+        if version != self._version:
+            errors = self.timetable.validate()
+            self._validated = (self._version, errors)
+        violations = self.timetable.rule_engine.messages()
+        return json_response({"valid": not errors and not violations,
+                              "errors": errors, "violations": violations})
+                              
+    def export(self, request: Request) -> Response:
+        from exporter import TimetableExporter
+        fmt = request.arg("format", "json")
+        try:
+            exporter = TimetableExporter(self.timetable, fmt)
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from None
+        content_type = {"text": "text/plain", "csv": "text/csv", "html": "text/html",
+                        "json": "application/x-ndjson"}[fmt]
+        # Streamed from a snapshot, so later writes neither wait nor show up
+        return Response(200, content_type=content_type + "; charset=utf-8",
+                        chunks=exporter.snapshot().stream())
+                        
+    def add_entry(self, request: Request) -> Response:
+        data = request.json()
+        day = _parse_day(_required(data, "day"))
+        period = _int(_required(data, "period"), "period")
+        slots = {slot.period: slot for slot in self.timetable.time_slots}
+        if period not in slots:
+            raise HTTPError(400, f"unknown period {period}")
+        room = data.get("room")
+        entry = TimetableEntry(day, slots[period], _required(data, "class_id"),
+                               _required(data, "subject_code"), _required(data, "teacher_id"),
+                               None if room is None else str(room))
+        errors = self.timetable.reference_errors(entry)
+        if errors:
+            raise HTTPError(400, "; ".join(errors))
+        report = self.timetable.add_entries([entry])
+        if not report.ok:
+            return json_response({"added": 0, "conflicts": report.conflicts[0].reasons}, 409)
+        return json_response({"added": 1, "entry": entry_to_dict(entry)}, 201)
+        
+    def remove_entry(self, request: Request) -> Response:
+        day = _parse_day(request.params["day"])
+        period = _int(request.params["period"], "period")
+        if not self.timetable.remove_entry(day, period, request.params["class_id"]):
+            raise HTTPError(404, "no such entry")
+        return json_response({"removed": 1})
+        
+    def add_subject(self, request: Request) -> Response:
+        data = request.json()
+        self.timetable.add_subject(Subject(_required(data, "code"), _required(data, "name")))
+        return json_response({"added": 1}, 201)
+        
+    def add_teacher(self, request: Request) -> Response:
+        data = request.json()
+        subjects = data.get("subjects") or []
+        if not isinstance(subjects, list):
+            raise HTTPError(400, "'subjects' must be a list")
+        self.timetable.add_teacher(Teacher(_required(data, "id"), _required(data, "name"),
+                                           [str(code) for code in subjects]))
+        return json_response({"added": 1}, 201)
+        
+    def add_class(self, request: Request) -> Response:
+        data = request.json()
+        self.timetable.add_class(SchoolClass(
+            _required(data, "id"), _required(data, "name"),
+            _int(data.get("students_count", 0), "students_count")))
+        return json_response({"added": 1}, 201)
+
+
+def serve(timetable: Timetable, host: str = "127.0.0.1", port: int = 8080, store=None) -> None:
+    """Serve a timetable until interrupted."""
+    async def run() -> None:
+        server = TimetableServer(timetable, store)
+        listener = await server.start(host, port)
+        print(f"Serving timetable on http://{host}:{server.port}/", file=sys.stderr)
+        try:
+            await listener.serve_forever()
+        finally:
+            await server.close()
+            
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
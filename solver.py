@@ -0,0 +1,291 @@
+"""
+School Timetable Generator
+Constraint solver that builds a conflict-free timetable from classes,
+teachers, time slots and weekly subject-hour requirements.
+"""
+
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from occupancy import popcount
+
+
+def parse_hours(spec: str) -> Dict[str, int]:
+    """
+    Parse a weekly hours specification such as "MATH=5,ENG=4".
+    Raises ValueError on malformed input.
+    """
+    hours: Dict[str, int] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        code, sep, count = item.partition("=")
+        if not sep or not code.strip():
+            raise ValueError(f"expected SUBJECT=HOURS, got '{item}'")
+        hours[code.strip()] = int(count)
+    return hours
+
+
+class _LessonGroup:
+    """All weekly lessons of one subject for one class, taught by one teacher."""
+    
+    __slots__ = ("class_index", "teacher_index", "subject_code",
+                 "remaining", "day_counts")
+                 
+    def __init__(self, class_index: int, teacher_index: int,
+                 subject_code: str, hours: int, day_count: int):
+        self.class_index = class_index
+        self.teacher_index = teacher_index
+        self.subject_code = subject_code
+        self.remaining = hours
+        self.day_counts = [0] * day_count
+
+
+class TimetableSolver:
+    """
+    Generates timetables by backtracking search with forward checking.
+    
+    Each (class, subject) requirement is first given a qualified teacher,
+    balancing teaching load. Lessons are then placed one at a time, always
+    picking the most constrained lesson group (fewest free slots relative to
+    the lessons it still needs) and preferring days on which the subject has
+    not been taught yet. After every placement, the groups sharing the class
+    or teacher are checked for enough remaining slots, so dead ends are
+    detected before descending further.
+    """
+    
+    def __init__(self, classes: Iterable[SchoolClass], teachers: Iterable[Teacher],
+                 time_slots: Iterable[TimeSlot],
+                 requirements: Dict[str, Dict[str, int]],
+                 subjects: Iterable[Subject] = (),
+                 days: Optional[Iterable[DayOfWeek]] = None):
+        self.classes: List[SchoolClass] = list(classes)
+        self.teachers: List[Teacher] = list(teachers)
+        self.time_slots: List[TimeSlot] = sorted(time_slots, key=lambda s: s.period)
+        self.requirements = requirements
+        self.subjects: List[Subject] = list(subjects)
+        self.days: List[DayOfWeek] = list(days) if days is not None else list(DayOfWeek)
+        self.backtracks = 0
+        self._check_inputs()
+        
+    @classmethod
+    def from_timetable(cls, timetable: Timetable,
+                       requirements: Dict[str, Dict[str, int]]) -> "TimetableSolver":
+        """Create a solver for the subjects, teachers, classes and slots of a timetable."""
+        return cls(timetable.classes.values(), timetable.teachers.values(),
+                   timetable.time_slots, requirements, timetable.subjects.values())
+                   
+    @property
+    def slot_count(self) -> int:
+        """Number of teaching slots in a week."""
+        return len(self.days) * len(self.time_slots)
+        
+    def _check_inputs(self) -> None:
+        """Reject requirements that can never be satisfied."""
+        class_ids = {c.id for c in self.classes}
+        qualified = {code for t in self.teachers for code in t.subjects}
+        for class_id, hours in self.requirements.items():
+            if class_id not in class_ids:
+                raise ValueError(f"Unknown class {class_id} in requirements")
+            if sum(hours.values()) > self.slot_count:
+                raise ValueError(
+                    f"Class {class_id} needs {sum(hours.values())} lessons "
+                    f"but the week has only {self.slot_count} slots"
+                )
+            for code, count in hours.items():
+                if count < 0:
+                    raise ValueError(f"Negative hours for {code} in class {class_id}")
+                if count and code not in qualified:
+                    raise ValueError(f"No teacher is qualified to teach {code}")
+                    
+    def solve(self, seed: Optional[int] = None, max_attempts: int = 20,
+              max_backtracks: int = 5000) -> Optional[Timetable]:
+        """
+        Generate a conflict-free timetable.
+        Returns None if no solution was found within the search budget.
+        """
+        rng = random.Random(seed)
+        self.backtracks = 0
+        for _ in range(max_attempts):
+            groups = self._assign_teachers(rng)
+            if groups is None:
+                continue
+            placement = self._search(groups, rng, max_backtracks)
+            if placement is not None:
+                return self._build_timetable(placement)
+        return None
+        
+    def _assign_teachers(self, rng: random.Random) -> Optional[List[_LessonGroup]]:
+        """
+        Give every (class, subject) requirement a qualified teacher.
+        Subjects with the fewest qualified teachers are assigned first and
+        the least loaded teacher wins. Returns None if capacity runs out.
+        """
+        qualified: Dict[str, List[int]] = {}
+        for index, teacher in enumerate(self.teachers):
+            for code in teacher.subjects:
+                qualified.setdefault(code, []).append(index)
+                
+        class_index = {c.id: i for i, c in enumerate(self.classes)}
+        pairs = [(class_id, code, count)
+                 for class_id, hours in self.requirements.items()
+                 for code, count in hours.items() if count > 0]
+        rng.shuffle(pairs)
+        pairs.sort(key=lambda p: (len(qualified[p[1]]), -p[2]))
+        
+        load = [0] * len(self.teachers)
+        groups = []
+        for class_id, code, count in pairs:
+            candidates = [t for t in qualified[code] if load[t] + count <= self.slot_count]
+            if not candidates:
+                return None
+            best = min(load[t] for t in candidates)
+            teacher = rng.choice([t for t in candidates if load[t] == best])
+            load[teacher] += count
+            groups.append(_LessonGroup(class_index[class_id], teacher, code,
+                                       count, len(self.days)))
+        return groups
+        
+    def _search(self, groups: List[_LessonGroup], rng: random.Random,
+                max_backtracks: int) -> Optional[List[Tuple[_LessonGroup, int]]]:
+        """
+        Place every lesson of every group into a slot.
+        Returns the (group, slot index) placements, or None if the backtrack
+        budget is exhausted.
+        """
+        period_count = len(self.time_slots)
+        full = (1 << self.slot_count) - 1
+        class_free = [full] * len(self.classes)
+        teacher_free = [full] * len(self.teachers)
+        class_groups: Dict[int, List[_LessonGroup]] = {}
+        teacher_groups: Dict[int, List[_LessonGroup]] = {}
+        for group in groups:
+            class_groups.setdefault(group.class_index, []).append(group)
+            teacher_groups.setdefault(group.teacher_index, []).append(group)
+        active = list(groups)
+        
+        def domain(group: _LessonGroup) -> int:
+            return class_free[group.class_index] & teacher_free[group.teacher_index]
+            
+        def place(group: _LessonGroup, slot: int) -> None:
+            bit = 1 << slot
+            class_free[group.class_index] &= ~bit
+            teacher_free[group.teacher_index] &= ~bit
+            group.remaining -= 1
+            group.day_counts[slot // period_count] += 1
+            
+        def unplace(group: _LessonGroup, slot: int) -> None:
+            bit = 1 << slot
+            class_free[group.class_index] |= bit
+            teacher_free[group.teacher_index] |= bit
+            group.remaining += 1
+            group.day_counts[slot // period_count] -= 1
+            
+        def consistent(group: _LessonGroup) -> bool:
+            # Forward checking: every group sharing the class or the teacher
+            # must still have at least as many free slots as lessons left.
+            for neighbours in (class_groups[group.class_index],
+                               teacher_groups[group.teacher_index]):
+                for other in neighbours:
+                    if other.remaining and popcount(domain(other)) < other.remaining:
+                        return False
+            return True
+            
+        def select():
+            # Most constrained group first: smallest slack between free
+            # slots and lessons still to place.
+            best, best_slack = None, None
+            for group in active:
+                if not group.remaining:
+                    continue
+                slack = popcount(domain(group)) - group.remaining
+                if best is None or slack < best_slack:
+                    best, best_slack = group, slack
+                    if slack <= 0:
+                        break
+            if best is None:
+                return None
+            mask = domain(best)
+            candidates = []
+            while mask:
+                low = mask & -mask
+                slot = low.bit_length() - 1
+                candidates.append((best.day_counts[slot // period_count], rng.random(), slot))
+                mask ^= low
+            candidates.sort()
+            return [best, [slot for _, _, slot in candidates], 0, None]
+            
+        rng.shuffle(active)
+        stack = []
+        backtracks = 0
+        frame = select()
+        while frame is not None:
+            group, candidates = frame[0], frame[1]
+            placed = False
+            while frame[2] < len(candidates):
+                slot = candidates[frame[2]]
+                frame[2] += 1
+                place(group, slot)
+                if consistent(group):
+                    frame[3] = slot
+                    placed = True
+                    break
+                unplace(group, slot)
+            if placed:
+                stack.append(frame)
+                frame = select()
+                continue
+            # Dead end: undo the most recent placement and try its next slot
+            backtracks += 1
+            self.backtracks += 1
+            if not stack or backtracks > max_backtracks:
+                return None
+            frame = stack.pop()
+            unplace(frame[0], frame[3])
+            
+        return [(frame[0], frame[3]) for frame in stack]
+        
+    def _build_timetable(self, placement: List[Tuple[_LessonGroup, int]]) -> Timetable:
+        """Turn slot placements into a populated Timetable."""
+        timetable = Timetable()
+        for subject in self.subjects:
+            timetable.add_subject(subject)
+        for teacher in self.teachers:
+            timetable.add_teacher(teacher)
+        for school_class in self.classes:
+            timetable.add_class(school_class)
+        for time_slot in self.time_slots:
+            timetable.add_time_slot(time_slot)
+            
+        period_count = len(self.time_slots)
+        placement = sorted(placement, key=lambda p: (p[0].class_index, p[1]))
+        for group, slot in placement:
+            day, period_index = divmod(slot, period_count)
+            entry = TimetableEntry(
+                self.days[day],
+                self.time_slots[period_index],
+                self.classes[group.class_index].id,
+                group.subject_code,
+                self.teachers[group.teacher_index].id,
+            )
+            if not timetable.add_entry(entry):
+                raise RuntimeError(f"Solver produced a conflicting entry: {entry}")
+        return timetable
+
+
+def generate_timetable(classes: Iterable[SchoolClass], teachers: Iterable[Teacher],
+                       time_slots: Iterable[TimeSlot],
+                       requirements: Dict[str, Dict[str, int]],
+                       subjects: Iterable[Subject] = (),
+                       seed: Optional[int] = None) -> Optional[Timetable]:
+    """
+    Generate a conflict-free timetable.
+    Returns None if the solver could not find a solution.
+    """
+    solver = TimetableSolver(classes, teachers, time_slots, requirements, subjects)
+    return solver.solve(seed=seed)
@@ -0,0 +1,238 @@
+"""
+SQLite Timetable Storage
+Saves and loads timetables to a local SQLite file and writes changes
+incrementally, in batched transactions, as they happen.
+"""
+
+import gc
+import sqlite3
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from timetable import (
+    Timetable, TimetableObserver, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subjects (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS teachers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    subjects TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS classes (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    students_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS time_slots (
+    period INTEGER PRIMARY KEY,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    day INTEGER NOT NULL,
+    period INTEGER NOT NULL,
+    class_id TEXT NOT NULL,
+    subject_code TEXT NOT NULL,
+    teacher_id TEXT NOT NULL,
+    room TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_by_class ON entries (day, period, class_id);
+CREATE INDEX IF NOT EXISTS entries_by_teacher ON entries (teacher_id);
+"""
+
+_INSERT_ENTRY = ("INSERT INTO entries (day, period, class_id, subject_code, teacher_id, room) "
+                 "VALUES (?, ?, ?, ?, ?, ?)")
+# Removes one matching row; the oldest if duplicates were ever stored
+_DELETE_ENTRY = ("DELETE FROM entries WHERE seq = (SELECT MIN(seq) FROM entries "
+                 "WHERE day = ? AND period = ? AND class_id = ? AND subject_code = ? "
+                 "AND teacher_id = ? AND room IS ?)")
+_UPSERT_SUBJECT = "INSERT OR REPLACE INTO subjects (code, name) VALUES (?, ?)"
+_UPSERT_TEACHER = "INSERT OR REPLACE INTO teachers (id, name, subjects) VALUES (?, ?, ?)"
+_UPSERT_CLASS = "INSERT OR REPLACE INTO classes (id, name, students_count) VALUES (?, ?, ?)"
+_UPSERT_TIME_SLOT = "INSERT OR REPLACE INTO time_slots (period, start_time, end_time) VALUES (?, ?, ?)"
+_DELETE_SUBJECT = "DELETE FROM subjects WHERE code = ?"
+_DELETE_TEACHER = "DELETE FROM teachers WHERE id = ?"
+_DELETE_CLASS = "DELETE FROM classes WHERE id = ?"
+_DELETE_TIME_SLOT = "DELETE FROM time_slots WHERE period = ?"
+
+
+def _entry_row(entry: TimetableEntry) -> tuple:
+    return (entry.day.value, entry.time_slot.period, entry.class_id,
+            entry.subject_code, entry.teacher_id, entry.room)
+
+
+class TimetableStore(TimetableObserver):
+    """
+    A timetable persisted in a SQLite file.
+    
+    save() writes a whole timetable once; after that (or after load()) the
+    store observes the timetable and queues every mutation. Queued writes
+    are flushed in a single transaction when batch_size changes have
+    accumulated, on flush(), and on close().
+    """
+    
+    def __init__(self, path: str, batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        try:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(SCHEMA)
+        except sqlite3.Error:
+            # Not a database, for example
+            self.connection.close()
+            raise
+        self.timetable: Optional[Timetable] = None
+        self._pending: List[Tuple[str, tuple]] = []
+        
+    def __enter__(self) -> "TimetableStore":
+        return self
+        
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        
+    def attach(self, timetable: Timetable) -> None:
+        """Start writing the timetable's changes to this store."""
+        self.detach()
+        self.timetable = timetable
+        timetable.add_observer(self)
+        
+    def detach(self) -> None:
+        """Flush pending writes and stop following the current timetable."""
+        if self.timetable is not None:
+            self.flush()
+            self.timetable.remove_observer(self)
+            self.timetable = None
+            
+    def save(self, timetable: Timetable) -> None:
+        """Replace the stored data with the timetable and follow its changes."""
+        self.detach()
+        with self.connection:
+            for table in ("subjects", "teachers", "classes", "time_slots", "entries"):
+                self.connection.execute(f"DELETE FROM {table}")
+            self.connection.executemany(
+                _UPSERT_SUBJECT, [(s.code, s.name) for s in timetable.subjects.values()])
+            self.connection.executemany(
+                _UPSERT_TEACHER, [(t.id, t.name, ",".join(t.subjects))
+                                  for t in timetable.teachers.values()])
+            self.connection.executemany(
+                _UPSERT_CLASS, [(c.id, c.name, c.students_count)
+                                for c in timetable.classes.values()])
+            self.connection.executemany(
+                _UPSERT_TIME_SLOT, [(s.period, s.start_time, s.end_time)
+                                    for s in timetable.time_slots])
+            self.connection.executemany(
+                _INSERT_ENTRY, [_entry_row(e) for e in timetable.entries])
+        self.attach(timetable)
+        
+    def load(self) -> Timetable:
+        """Read the stored timetable and follow its changes."""
+        self.detach()
+        timetable = Timetable()
+        cursor = self.connection.cursor()
+        for code, name in cursor.execute("SELECT code, name FROM subjects ORDER BY rowid"):
+            timetable.add_subject(Subject(code, name))
+        for id_, name, subjects in cursor.execute(
+                "SELECT id, name, subjects FROM teachers ORDER BY rowid"):
+            timetable.add_teacher(Teacher(id_, name, subjects.split(",") if subjects else []))
+        for id_, name, count in cursor.execute(
+                "SELECT id, name, students_count FROM classes ORDER BY rowid"):
+            timetable.add_class(SchoolClass(id_, name, count))
+            
+        slots: Dict[int, TimeSlot] = {}
+        for period, start, end in cursor.execute(
+                "SELECT period, start_time, end_time FROM time_slots ORDER BY rowid"):
+            slots[period] = TimeSlot(period, start, end)
+            timetable.add_time_slot(slots[period])
+            
+        days = list(DayOfWeek)
+        intern = sys.intern
+        rows = cursor.execute(
+            "SELECT day, period, class_id, subject_code, teacher_id, room FROM entries ORDER BY seq")
+        # Nothing created here can form a reference cycle, so pause the
+        # cyclic GC instead of letting it rescan the growing heap repeatedly
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for day, period, class_id, subject_code, teacher_id, room in rows:
+                time_slot = slots.get(period)
+                if time_slot is None:
+                    time_slot = slots[period] = TimeSlot(period, "", "")
+                # SQLite returns a fresh string per row; intern the ids so
+                # each distinct id is stored once
+                if room is not None:
+                    room = intern(room)
+                # Stored entries are loaded as-is; validate() reports any clashes
+                timetable._insert(TimetableEntry(days[day], time_slot, intern(class_id),
+                                                 intern(subject_code), intern(teacher_id), room))
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        self.attach(timetable)
+        return timetable
+        
+    def _queue(self, sql: str, params: tuple) -> None:
+        self._pending.append((sql, params))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+            
+    def flush(self) -> None:
+        """Write all queued changes in one transaction."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        with self.connection:
+            # Consecutive statements of the same kind go through one executemany
+            start = 0
+            while start < len(pending):
+                sql = pending[start][0]
+                end = start
+                while end < len(pending) and pending[end][0] == sql:
+                    end += 1
+                self.connection.executemany(sql, [params for _, params in pending[start:end]])
+                start = end
+                
+    def close(self) -> None:
+        """Flush pending writes and close the database."""
+        self.detach()
+        self.connection.close()
+        
+    def entry_added(self, entry: TimetableEntry) -> None:
+        self._queue(_INSERT_ENTRY, _entry_row(entry))
+        
+    def entry_removed(self, entry: TimetableEntry) -> None:
+        self._queue(_DELETE_ENTRY, _entry_row(entry))
+        
+    def time_slot_added(self, time_slot: TimeSlot) -> None:
+        self._queue(_UPSERT_TIME_SLOT, (time_slot.period, time_slot.start_time, time_slot.end_time))
+        
+    def subject_added(self, subject: Subject, previous: Optional[Subject]) -> None:
+        self._queue(_UPSERT_SUBJECT, (subject.code, subject.name))
+        
+    def teacher_added(self, teacher: Teacher, previous: Optional[Teacher]) -> None:
+        self._queue(_UPSERT_TEACHER, (teacher.id, teacher.name, ",".join(teacher.subjects)))
+        
+    def class_added(self, school_class: SchoolClass, previous: Optional[SchoolClass]) -> None:
+        self._queue(_UPSERT_CLASS, (school_class.id, school_class.name,
+                                    school_class.students_count))
+                                    
+    def time_slot_removed(self, time_slot: TimeSlot) -> None:
+        self._queue(_DELETE_TIME_SLOT, (time_slot.period,))
+        
+    def subject_removed(self, subject: Subject) -> None:
+        self._queue(_DELETE_SUBJECT, (subject.code,))
+        
+    def teacher_removed(self, teacher: Teacher) -> None:
+        self._queue(_DELETE_TEACHER, (teacher.id,))
+        
+    def class_removed(self, school_class: SchoolClass) -> None:
+        self._queue(_DELETE_CLASS, (school_class.id,))
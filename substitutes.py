@@ -0,0 +1,140 @@
+"""
+Substitute Teacher Finder
+Proposes qualified, free cover teachers for every lesson of an absent
+teacher over a range of dates, spreading the cover fairly.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from occupancy import popcount
+from timetable import Timetable, TimetableObserver, TimetableEntry, Teacher, DayOfWeek
+
+
+# Whether a teacher is free on a day in a period
+IsFree = Callable[[str, DayOfWeek, int], bool]
+
+
+@dataclass
+class Cover:
+    """A lesson of the absent teacher on one date, and who could take it."""
+    date: date
+    entry: TimetableEntry
+    # The proposed substitute, None if nobody qualified is free
+    substitute: Optional[str]
+    # Every qualified and free teacher, best first
+    candidates: List[str] = field(default_factory=list)
+    school_id: Optional[str] = None
+
+
+def school_days(start: date, end: Optional[date] = None) -> List[Tuple[date, DayOfWeek]]:
+    """(date, weekday) for every school day from start to end inclusive."""
+    end = end if end is not None else start
+    if end < start:
+        raise ValueError("end date is before start date")
+    days = []
+    current = start
+    while current <= end:
+        if current.weekday() < len(DayOfWeek):
+            days.append((current, DayOfWeek(current.weekday())))
+        current += timedelta(days=1)
+    return days
+
+
+class SubstituteFinder(TimetableObserver):
+    """
+    Cover proposals for one Timetable.
+    
+    Keeps an inverted subject -> teachers index, updated as teachers are
+    added and removed, and reads availability from the timetable's
+    occupancy matrix, so each lesson costs one index lookup and one bit
+    test per qualified teacher. Among the free candidates the one with the
+    fewest covers so far is proposed, then the one teaching least that
+    day, then least that week.
+    """
+    
+    def __init__(self, timetable: Timetable):
+        self.timetable = timetable
+        self.occupancy = timetable.enable_occupancy()
+        self._teachers_by_subject: Dict[str, Set[str]] = {}
+        for teacher in timetable.teachers.values():
+            self._index(teacher)
+        timetable.add_observer(self)
+        
+    def detach(self) -> None:
+        """Stop following the timetable."""
+        self.timetable.remove_observer(self)
+        
+    def _index(self, teacher: Teacher) -> None:
+        for code in teacher.subjects:
+            self._teachers_by_subject.setdefault(code, set()).add(teacher.id)
+            
+    def _unindex(self, teacher: Teacher) -> None:
+        for code in teacher.subjects:
+            teachers = self._teachers_by_subject.get(code)
+            if teachers is not None:
+                teachers.discard(teacher.id)
+                if not teachers:
+                    del self._teachers_by_subject[code]
+                    
+    def teacher_added(self, teacher: Teacher, previous: Optional[Teacher]) -> None:
+        if previous is not None:
+            self._unindex(previous)
+        self._index(teacher)
+        
+    def teacher_removed(self, teacher: Teacher) -> None:
+        self._unindex(teacher)
+        
+    def qualified(self, subject_code: str) -> List[str]:
+        """Ids of the teachers who can teach a subject."""
+        return sorted(self._teachers_by_subject.get(subject_code, ()))
+        
+    def is_free(self, teacher_id: str, day: DayOfWeek, period: int) -> bool:
+        """Whether a teacher has no lesson in a slot of this timetable."""
+        return self.occupancy.is_free(day, period, teacher_id=teacher_id)
+        
+    def find_cover(self, teacher_id: str, start: date, end: Optional[date] = None,
+                   cover_counts: Optional[Dict[str, int]] = None) -> List[Cover]:
+        """
+        Cover for every lesson of an absent teacher from start to end
+        (inclusive; just start by default), in date and period order.
+        cover_counts maps teacher ids to covers already taken, for example
+        earlier in the term, and is updated with the new proposals.
+        """
+        counts = cover_counts if cover_counts is not None else {}
+        return self._plan(teacher_id, school_days(start, end), self.is_free, counts, set())
+        
+    def _plan(self, teacher_id: str, days: List[Tuple[date, DayOfWeek]], is_free: IsFree,
+              counts: Dict[str, int], booked: Set[Tuple[date, int, str]],
+              school_id: Optional[str] = None) -> List[Cover]:
+        """Propose cover, recording each proposal in counts and booked."""
+        occupancy = self.occupancy
+        masks = occupancy.teacher_masks
+        week_load: Dict[str, int] = {}
+        lessons = {}
+        for entry in self.timetable.get_entries_for_teacher(teacher_id):
+            lessons.setdefault(entry.day, []).append(entry)
+        covers = []
+        for when, day in days:
+            day_mask = occupancy.day_mask(day)
+            for entry in sorted(lessons.get(day, ()), key=lambda e: e.time_slot.period):
+                period = entry.time_slot.period
+                ranked = []
+                for candidate in self._teachers_by_subject.get(entry.subject_code, ()):
+                    if candidate == teacher_id or (when, period, candidate) in booked or \
+                            not is_free(candidate, day, period):
+                        continue
+                    mask = masks.get(candidate, 0)
+                    if candidate not in week_load:
+                        week_load[candidate] = popcount(mask)
+                    ranked.append((counts.get(candidate, 0), popcount(mask & day_mask),
+                                   week_load[candidate], candidate))
+                ranked.sort()
+                candidates = [item[-1] for item in ranked]
+                substitute = candidates[0] if candidates else None
+                if substitute is not None:
+                    counts[substitute] = counts.get(substitute, 0) + 1
+                    booked.add((when, period, substitute))
+                covers.append(Cover(when, entry, substitute, candidates, school_id))
+        return covers
@@ -0,0 +1,57 @@
+"""
+Unit tests for the benchmark generator and harness.
+"""
+
+import unittest
+from benchmarks import SchoolConfig, generate_school, run_benchmarks, compare_results, BENCHMARKS
+
+
+class TestSchoolGenerator(unittest.TestCase):
+    """Test cases for generate_school."""
+    
+    def test_generated_school_is_valid_and_seeded(self):
+        """Test that a school is conflict-free and reproducible."""
+        config = SchoolConfig(classes=12, teachers=30, subjects=6, rooms=10, seed=3)
+        school = generate_school(config)
+        timetable = school.timetable()
+        self.assertEqual(timetable.validate(), [])
+        self.assertEqual(len(timetable.entries), len(school.entries))
+        self.assertGreater(len(school.entries), 12 * 35 * 0.7)
+        self.assertEqual(generate_school(config).entries, school.entries)
+        self.assertNotEqual(generate_school(SchoolConfig(classes=12, teachers=30, subjects=6,
+                                                         rooms=10, seed=4)).entries,
+                            school.entries)
+                            
+    def test_config_is_checked(self):
+        """Test that impossible configurations are rejected."""
+        with self.assertRaises(ValueError):
+            SchoolConfig(days=6)
+        with self.assertRaises(ValueError):
+            SchoolConfig(density=1.5)
+
+
+class TestHarness(unittest.TestCase):
+    """Test cases for run_benchmarks and compare_results."""
+    
+    def test_run_every_benchmark(self):
+        """Test that every benchmark runs and reports timings."""
+        results = run_benchmarks(SchoolConfig(classes=4, teachers=10, rooms=4), repeat=1)
+        self.assertEqual(set(results["results"]), set(BENCHMARKS))
+        for result in results["results"].values():
+            self.assertGreater(result["ops"], 0)
+            self.assertGreaterEqual(result["best"], 0)
+            
+    def test_compare_results(self):
+        """Test that only slowdowns beyond the threshold are reported."""
+        baseline = {"results": {"validate": {"best": 1.0}, "add_entry": {"best": 1.0}}}
+        current = {"results": {"validate": {"best": 1.5}, "add_entry": {"best": 1.05},
+                               "storage_load": {"best": 9.0}}}
+        regressions = compare_results(baseline, current, threshold=0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("validate"))
+        with self.assertRaises(ValueError):
+            run_benchmarks(only=["nothing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit tests for the columnar entry table.
+"""
+
+import sys
+import unittest
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from columnar import EntryTable
+
+
+class TestEntryTable(unittest.TestCase):
+    """Test cases for EntryTable."""
+    
+    def setUp(self):
+        """Set up a timetable with three entries."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        self.timetable.add_class(SchoolClass("C2", "Grade 9B", 28))
+        self.timetable.add_time_slot(TimeSlot(1, "08:00", "08:50"))
+        self.timetable.add_time_slot(TimeSlot(2, "09:00", "09:50"))
+        slots = self.timetable.time_slots
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, slots[0], "C1", "MATH", "T001", "R101"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, slots[1], "C2", "MATH", "T001"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.FRIDAY, slots[0], "C2", "MATH", "T001", "R101"))
+        self.table = EntryTable.from_timetable(self.timetable)
+        
+    def test_round_trip(self):
+        """Test that entries come back equal to the originals."""
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(list(self.table), self.timetable.entries)
+        self.assertIsNone(self.table[1].room)
+        self.assertEqual(self.table[-1].day, DayOfWeek.FRIDAY)
+        with self.assertRaises(IndexError):
+            self.table[3]
+            
+    def test_identifiers_are_interned(self):
+        """Test that each distinct id and time slot is stored once."""
+        self.assertEqual(len(self.table.class_ids), 2)
+        self.assertEqual(len(self.table.teacher_ids), 1)
+        self.assertEqual(len(self.table.rooms), 1)
+        self.assertEqual(len(self.table.time_slots), 2)
+        self.assertEqual(self.table.nbytes, 3 * 21)
+        
+    def test_entries_for_class_and_teacher(self):
+        """Test the per-class and per-teacher lookups."""
+        self.assertEqual(self.table.indexes_for_class("C2"), [1, 2])
+        self.assertEqual(len(self.table.entries_for_teacher("T001")), 3)
+        self.assertEqual(self.table.entries_for_class("C9"), [])
+        
+    def test_to_timetable(self):
+        """Test loading the table back into a timetable."""
+        timetable = self.table.to_timetable()
+        self.assertEqual(timetable.entries, self.timetable.entries)
+        self.assertEqual(timetable.validate(), [])
+        
+    def test_to_timetable_conflicts(self):
+        """Test that conflicting rows are refused rather than dropped."""
+        timetable = Timetable()
+        timetable.add_entry(TimetableEntry(
+            DayOfWeek.FRIDAY, self.timetable.time_slots[0], "C2", "MATH", "T001"))
+        with self.assertRaises(ValueError):
+            self.table.to_timetable(timetable)
+        self.assertEqual(len(timetable), 1)
+        
+    def test_model_classes_use_slots(self):
+        """Test that entries carry no per-instance __dict__ where supported."""
+        if sys.version_info < (3, 10):
+            self.skipTest("dataclass slots need Python 3.10")
+        self.assertFalse(hasattr(self.table[0], "__dict__"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+"""
+Unit and stress tests for thread-safe timetables.
+"""
+
+import random
+import threading
+import unittest
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from concurrency import ReadWriteLock
+
+
+class TestReadWriteLock(unittest.TestCase):
+    """Test cases for ReadWriteLock."""
+    
+    def test_readers_share_and_writers_exclude(self):
+        """Test that readers hold the lock together but a writer waits for them."""
+        lock = ReadWriteLock()
+        both_reading = threading.Barrier(2, timeout=5)
+        events = []
+        
+        def reader():
+            with lock.reading():
+                # Only passes if the other reader is inside at the same time
+                both_reading.wait()
+                events.append("read")
+                
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in readers:
+            thread.start()
+        for thread in readers:
+            thread.join()
+        self.assertEqual(events, ["read", "read"])
+        
+        lock.acquire_read()
+        writer = threading.Thread(target=lambda: (lock.acquire_write(), events.append("write"),
+                                                  lock.release_write()))
+        writer.start()
+        writer.join(0.1)
+        self.assertEqual(events, ["read", "read"])
+        lock.release_read()
+        writer.join(5)
+        self.assertEqual(events[-1], "write")
+        
+    def test_reentrancy(self):
+        """Test nested locking by one thread."""
+        lock = ReadWriteLock()
+        with lock.writing():
+            with lock.writing(), lock.reading():
+                pass
+        with lock.reading(), lock.reading():
+            with self.assertRaises(RuntimeError):
+                lock.acquire_write()
+        # Fully released: a new writer gets in at once
+        with lock.writing():
+            pass
+
+
+class TestThreadSafeTimetable(unittest.TestCase):
+    """Stress tests for a timetable shared by many threads."""
+    
+    def setUp(self):
+        """Set up a school with few enough slots that writers collide."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.teachers = [f"T{i}" for i in range(6)]
+        self.classes = [f"C{i}" for i in range(6)]
+        for teacher_id in self.teachers:
+            self.timetable.add_teacher(Teacher(teacher_id, teacher_id, ["MATH"]))
+        for class_id in self.classes:
+            self.timetable.add_class(SchoolClass(class_id, class_id, 25))
+        self.slots = [TimeSlot(p, f"{7 + p:02d}:00", f"{7 + p:02d}:50") for p in (1, 2, 3)]
+        for slot in self.slots:
+            self.timetable.add_time_slot(slot)
+        self.safety = self.timetable.enable_thread_safety()
+        self.timetable.enable_render_cache(max_size=4)
+        
+    def test_concurrent_writers_and_readers(self):
+        """Test that no update is lost and no double booking gets in."""
+        added = []
+        removed = []
+        errors = []
+        stop = threading.Event()
+        
+        def writer(seed):
+            rng = random.Random(seed)
+            count = removals = 0
+            for _ in range(300):
+                day = rng.choice(list(DayOfWeek))
+                slot = rng.choice(self.slots)
+                class_id = rng.choice(self.classes)
+                if rng.random() < 0.2:
+                    removals += self.timetable.remove_entry(day, slot.period, class_id)
+                elif self.timetable.add_entry(TimetableEntry(
+                        day, slot, class_id, "MATH", rng.choice(self.teachers))):
+                    count += 1
+            added.append(count)
+            removed.append(removals)
+            
+        def reader(seed):
+            rng = random.Random(seed)
+            try:
+                while not stop.is_set():
+                    self.timetable.get_entries_for_class(rng.choice(self.classes))
+                    self.timetable.display_teacher_timetable(rng.choice(self.teachers))
+                    self.timetable.find_free_slots(class_id=rng.choice(self.classes))
+                    errors.extend(self.timetable.validate())
+            except Exception as e:
+                errors.append(repr(e))
+                
+        readers = [threading.Thread(target=reader, args=(i,)) for i in range(4)]
+        writers = [threading.Thread(target=writer, args=(100 + i,)) for i in range(8)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+            
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.timetable.entries), sum(added) - sum(removed))
+        self.assertEqual(self.timetable.validate(), [])
+        with self.safety.reading():
+            for entry in self.timetable.entries:
+                self.assertIs(self.timetable._class_slots[
+                    entry.day, entry.time_slot.period, entry.class_id], entry)
+                    
+    def test_detach(self):
+        """Test that detaching restores the plain methods."""
+        self.safety.detach()
+        self.assertIsNone(self.timetable.thread_safety)
+        self.assertNotIn("add_entry", self.timetable.__dict__)
+
+
+class TestThreadSafetyWithInstrumentation(unittest.TestCase):
+    """Test that locking and timing wrap each other in either order."""
+    
+    def setUp(self):
+        """Set up a timetable with one time slot."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        self.timetable.add_time_slot(TimeSlot(1, "08:00", "08:50"))
+        
+    def enable(self, safety_first: bool):
+        if safety_first:
+            safety = self.timetable.enable_thread_safety()
+            instrumentation = self.timetable.enable_instrumentation()
+        else:
+            instrumentation = self.timetable.enable_instrumentation()
+            safety = self.timetable.enable_thread_safety()
+        return safety, instrumentation
+        
+    def add(self, day: DayOfWeek) -> bool:
+        return self.timetable.add_entry(TimetableEntry(
+            day, self.timetable.time_slots[0], "C1", "MATH", "T001"))
+            
+    def assertLocked(self, safety) -> None:
+        # A thread holding a read lock may not take the write lock
+        with safety.reading():
+            with self.assertRaises(RuntimeError):
+                self.add(DayOfWeek.FRIDAY)
+                
+    def assertUnlocked(self, safety) -> None:
+        with safety.reading():
+            self.assertTrue(self.add(DayOfWeek.FRIDAY))
+        
+    def test_both_enabled(self):
+        """Test that both layers apply, whichever was enabled first."""
+        for safety_first in (True, False):
+            with self.subTest(safety_first=safety_first):
+                self.setUp()
+                safety, instrumentation = self.enable(safety_first)
+                self.assertTrue(self.add(DayOfWeek.MONDAY))
+                self.assertEqual(instrumentation.methods["add_entry"].calls, 1)
+                self.assertLocked(safety)
+                
+    def test_detach_thread_safety(self):
+        """Test that detaching the locks keeps the timing."""
+        for safety_first in (True, False):
+            with self.subTest(safety_first=safety_first):
+                self.setUp()
+                safety, instrumentation = self.enable(safety_first)
+                safety.detach()
+                self.assertIsNone(self.timetable.thread_safety)
+                self.assertTrue(self.add(DayOfWeek.MONDAY))
+                self.assertEqual(instrumentation.methods["add_entry"].calls, 1)
+                self.assertUnlocked(safety)
+                instrumentation.detach()
+                self.assertNotIn("add_entry", vars(self.timetable))
+                
+    def test_detach_instrumentation(self):
+        """Test that detaching the timing keeps the locks."""
+        for safety_first in (True, False):
+            with self.subTest(safety_first=safety_first):
+                self.setUp()
+                safety, instrumentation = self.enable(safety_first)
+                instrumentation.detach()
+                self.assertIsNone(self.timetable.instrumentation)
+                self.assertTrue(self.add(DayOfWeek.MONDAY))
+                self.assertEqual(instrumentation.methods["add_entry"].calls, 0)
+                self.assertLocked(safety)
+                safety.detach()
+                self.assertNotIn("add_entry", vars(self.timetable))
+
+
+if __name__ == '__main__':
+    unittest.main()
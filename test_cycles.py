@@ -0,0 +1,126 @@
+"""
+Unit tests for rotating and cyclic timetables.
+"""
+
+import unittest
+from datetime import date
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from cycles import Cycle, CyclicEntry, CyclicTimetable
+
+
+# A Monday, the first day of term
+TERM_START = date(2026, 9, 7)
+
+
+class TestCycle(unittest.TestCase):
+    """Test cases for Cycle."""
+    
+    def test_ab_weeks(self):
+        """Test labels and date lookup of a two-week rotation."""
+        cycle = Cycle(10, TERM_START)
+        self.assertEqual(cycle.labels[0], "A MONDAY")
+        self.assertEqual(cycle.labels[9], "B FRIDAY")
+        self.assertEqual(cycle.day_of(date(2026, 9, 15)), 6)
+        self.assertEqual(cycle.day_of(date(2026, 9, 21)), 0)
+        self.assertIsNone(cycle.day_of(date(2026, 9, 12)))
+        self.assertEqual(cycle.every(0), cycle.mask("A MONDAY", "B MONDAY"))
+        
+    def test_six_day_cycle_with_holidays(self):
+        """Test a six-day rotation that skips weekends and holidays."""
+        cycle = Cycle(6, TERM_START, holidays=[date(2026, 9, 9), date(2026, 9, 12)])
+        self.assertEqual(cycle.labels[5], "Day 6")
+        days = [cycle.day_of(date(2026, 9, day)) for day in range(7, 19)]
+        self.assertEqual(days, [0, 1, None, 2, 3, None, None, 4, 5, 0, 1, 2])
+        # Before the start of the cycle, counting backwards
+        self.assertEqual(Cycle(6, TERM_START).day_of(date(2026, 9, 4)), 5)
+        with self.assertRaises(ValueError):
+            cycle.weekday_of(0)
+        with self.assertRaises(ValueError):
+            Cycle(6, date(2026, 9, 6))
+
+
+class TestCyclicTimetable(unittest.TestCase):
+    """Test cases for CyclicTimetable."""
+    
+    def setUp(self):
+        """Set up an A/B-week school with one teacher and two classes."""
+        self.cycle = Cycle(10, TERM_START)
+        self.timetable = CyclicTimetable(self.cycle)
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        self.timetable.add_class(SchoolClass("C2", "Grade 9B", 25))
+        self.slot = TimeSlot(1, "08:00", "08:50")
+        self.timetable.add_time_slot(self.slot)
+        
+    def entry(self, days, class_id="C1", room="R101"):
+        return CyclicEntry(days, self.slot, class_id, "MATH", "T001", room)
+        
+    def test_conflicts_on_masks(self):
+        """Test that only entries sharing a cycle day clash."""
+        every_monday = self.cycle.every(0)
+        self.assertTrue(self.timetable.add_entry(self.entry(every_monday)))
+        self.assertEqual(self.timetable.conflicts(self.entry(self.cycle.mask("B MONDAY"), "C2")),
+                         ["teacher", "room"])
+        self.assertTrue(self.timetable.add_entry(self.entry(self.cycle.mask("A TUESDAY"), "C2")))
+        self.assertEqual(len(self.timetable.entries), 2)
+        self.assertEqual(self.timetable.validate(), [])
+        with self.assertRaises(ValueError):
+            self.timetable.add_entry(self.entry(1 << 10))
+            
+    def test_queries_and_dates(self):
+        """Test day and date queries and removing one occurrence."""
+        self.timetable.add_entry(self.entry(self.cycle.every(0)))
+        self.assertEqual(len(self.timetable.entries_on(date(2026, 9, 14))), 1)
+        self.assertEqual(self.timetable.entries_on(date(2026, 9, 15)), [])
+        self.assertTrue(self.timetable.remove_entry(5, 1, "C1"))
+        self.assertFalse(self.timetable.remove_entry(5, 1, "C1"))
+        self.assertEqual(self.timetable.entries_on(date(2026, 9, 14)), [])
+        self.assertEqual([e.days for e in self.timetable.entries], [self.cycle.mask(0)])
+        self.assertEqual([e.days for e in self.timetable.get_entries_for_day(0)],
+                         [self.cycle.mask(0)])
+        self.assertEqual(self.timetable.get_entries_for_day(5), [])
+        self.assertEqual(self.timetable.get_entries_for_day(10), [])
+        # The freed day can be booked again
+        self.assertTrue(self.timetable.add_entry(self.entry(self.cycle.mask(5), "C2")))
+        self.assertEqual([e.class_id for e in self.timetable.get_entries_for_day(5)], ["C2"])
+        text = self.timetable.display_teacher_timetable("T001")
+        self.assertIn("A MONDAY", text)
+        self.assertIn("B MONDAY", text)
+        
+    def test_weeks_round_trip(self):
+        """Test merging cloned weekly timetables and splitting them again."""
+        weeks = []
+        for week in range(2):
+            timetable = Timetable()
+            timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+            timetable.add_time_slot(self.slot)
+            for day in DayOfWeek:
+                timetable.add_entry(TimetableEntry(day, self.slot, "C1", "MATH", "T001"))
+            # Week B has a different lesson on Friday
+            if week == 1:
+                timetable.remove_entry(DayOfWeek.FRIDAY, 1, "C1")
+                timetable.add_entry(TimetableEntry(DayOfWeek.FRIDAY, self.slot, "C1", "ART", "T002"))
+            weeks.append(timetable)
+        cyclic = CyclicTimetable.from_weeks(self.cycle, weeks)
+        self.assertEqual(len(cyclic.entries), 2)
+        for week, original in enumerate(weeks):
+            split = cyclic.week(week)
+            key = lambda e: (e.day.value, e.time_slot.period, e.subject_code)
+            self.assertEqual(sorted(map(key, split.entries)), sorted(map(key, original.entries)))
+        with self.assertRaises(ValueError):
+            cyclic.week(2)
+            
+    def test_validate_reports_cycle_day(self):
+        """Test that double bookings are reported with their cycle day label."""
+        self.timetable.add_entry(self.entry(self.cycle.mask(0, 1), room=None))
+        self.timetable._insert(self.entry(self.cycle.mask(1), "C2", room=None))
+        self.assertEqual(self.timetable.validate(),
+                         ["Teacher T001 has conflict on A TUESDAY period 1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Unit tests for multi-school districts.
+"""
+
+import unittest
+from datetime import date
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from district import District
+
+
+class TestDistrict(unittest.TestCase):
+    """Test cases for District."""
+    
+    def setUp(self):
+        """Set up two schools sharing a teacher and a sports hall."""
+        self.district = District(shared_rooms=["HALL"])
+        self.slot = TimeSlot(1, "08:00", "08:50")
+        for school_id in ("NORTH", "SOUTH"):
+            school = self.district.add_school(school_id)
+            school.add_subject(Subject("MATH", "Mathematics"))
+            school.add_class(SchoolClass("C1", f"{school_id} Grade 9", 25))
+            school.add_time_slot(self.slot)
+        self.district.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]), ["NORTH", "SOUTH"])
+        
+    def entry(self, teacher_id="T001", room=None, day=DayOfWeek.MONDAY):
+        return TimetableEntry(day, self.slot, "C1", "MATH", teacher_id, room)
+        
+    def test_shared_teacher_conflict(self):
+        """Test that a teacher cannot be booked at two schools at once."""
+        self.assertTrue(self.district.add_entry("NORTH", self.entry()))
+        self.assertFalse(self.district.add_entry("SOUTH", self.entry()))
+        self.assertTrue(self.district.add_entry("SOUTH", self.entry(day=DayOfWeek.TUESDAY)))
+        self.assertEqual(self.district.schools_for_teacher("T001"), ["NORTH", "SOUTH"])
+        entries = self.district.get_entries_for_teacher("T001")
+        self.assertEqual({k: len(v) for k, v in entries.items()}, {"NORTH": 1, "SOUTH": 1})
+        
+    def test_rooms_are_local_unless_shared(self):
+        """Test that only shared rooms clash across schools."""
+        self.assertTrue(self.district.add_entry("NORTH", self.entry("T1", "R101")))
+        self.assertTrue(self.district.add_entry("SOUTH", self.entry("T2", "R101")))
+        self.district.remove_entry("SOUTH", DayOfWeek.MONDAY, 1, "C1")
+        self.district.remove_entry("NORTH", DayOfWeek.MONDAY, 1, "C1")
+        self.assertTrue(self.district.add_entry("NORTH", self.entry("T1", "HALL")))
+        self.assertFalse(self.district.add_entry("SOUTH", self.entry("T2", "HALL")))
+        self.assertFalse(self.district.is_free(DayOfWeek.MONDAY, 1, room="HALL"))
+        self.district.remove_entry("NORTH", DayOfWeek.MONDAY, 1, "C1")
+        self.assertTrue(self.district.is_free(DayOfWeek.MONDAY, 1, room="HALL"))
+        
+    def test_direct_shard_changes_are_tracked(self):
+        """Test that entries added straight to a shard reach the index."""
+        self.district.school("NORTH").add_entry(self.entry())
+        self.assertFalse(self.district.is_free(DayOfWeek.MONDAY, 1, teacher_id="T001"))
+        self.assertTrue(self.district.has_conflict("SOUTH", self.entry()))
+        
+    def test_validate_reports_cross_school_conflicts(self):
+        """Test validation of shards and of cross-school bookings."""
+        self.district.school("NORTH").add_entry(self.entry())
+        self.district.school("SOUTH").add_entry(self.entry())
+        self.district.school("SOUTH")._insert(self.entry("T2"))
+        expected = [
+            "SOUTH: Class C1 has conflict on MONDAY period 1",
+            "Teacher T001 has conflict across schools NORTH, SOUTH on MONDAY period 1",
+        ]
+        self.assertEqual(self.district.validate(workers=1), expected)
+        self.assertEqual(self.district.validate(workers=2), expected)
+        
+    def test_add_and_remove_school_with_entries(self):
+        """Test that existing entries are indexed when a shard joins or leaves."""
+        timetable = Timetable()
+        timetable.add_time_slot(self.slot)
+        timetable.add_entry(self.entry("T009"))
+        self.district.add_school("EAST", timetable)
+        self.assertEqual(self.district.schools_for_teacher("T009"), ["EAST"])
+        with self.assertRaises(ValueError):
+            self.district.add_school("EAST")
+        self.assertIs(self.district.remove_school("EAST"), timetable)
+        self.assertEqual(self.district.schools_for_teacher("T009"), [])
+        timetable.add_entry(self.entry("T010", day=DayOfWeek.FRIDAY))
+        self.assertEqual(self.district.schools_for_teacher("T010"), [])
+        
+    def test_find_cover_across_schools(self):
+        """Test that substitutes busy at another school are not proposed."""
+        self.district.add_teacher(Teacher("T002", "Ms. Jones", ["MATH"]), ["NORTH"])
+        self.district.add_teacher(Teacher("T003", "Mr. Brown", ["MATH"]), ["SOUTH"])
+        self.district.add_entry("NORTH", self.entry())
+        self.district.add_entry("SOUTH", self.entry(day=DayOfWeek.TUESDAY))
+        # T002 also teaches at SOUTH on Monday, so cannot cover at NORTH
+        self.district.add_teacher(Teacher("T002", "Ms. Jones", ["MATH"]), ["SOUTH"])
+        self.district.school("SOUTH").add_class(SchoolClass("C2", "SOUTH Grade 10", 25))
+        self.district.add_entry("SOUTH", TimetableEntry(
+            DayOfWeek.MONDAY, self.slot, "C2", "MATH", "T002"))
+        covers = self.district.find_cover("T001", date(2026, 10, 19), date(2026, 10, 20))
+        self.assertEqual([(c.school_id, c.date.day, c.substitute) for c in covers],
+                         [("NORTH", 19, None), ("SOUTH", 20, "T003")])
+        # T003 has the lighter week
+        self.assertEqual(covers[1].candidates, ["T003", "T002"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Unit tests for bulk timetable export.
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from exporter import TimetableExporter, export_timetables
+
+
+class TestTimetableExporter(unittest.TestCase):
+    """Test cases for TimetableExporter."""
+    
+    def setUp(self):
+        """Set up a timetable with two classes, two teachers and a free class."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_subject(Subject("ENG", "English"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_teacher(Teacher("T002", "Ms. <Johnson>", ["ENG"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        self.timetable.add_class(SchoolClass("C2", "Grade 9B", 28))
+        self.timetable.add_class(SchoolClass("C/3", "Grade 10", 20))
+        self.timetable.add_time_slot(TimeSlot(1, "08:00", "08:50"))
+        self.timetable.add_time_slot(TimeSlot(2, "09:00", "09:50"))
+        slots = self.timetable.time_slots
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.TUESDAY, slots[1], "C1", "MATH", "T001", "R101"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, slots[0], "C1", "ENG", "T002"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, slots[0], "C2", "MATH", "T001", "R102"))
+            
+    def test_text_matches_display(self):
+        """Test that text output is identical to the display methods."""
+        exporter = TimetableExporter(self.timetable)
+        for kind, id_, name, entries in exporter.views():
+            text = "".join(exporter.render((kind, id_, name, entries)))
+            if kind == "class":
+                expected = self.timetable.display_class_timetable(id_)
+            else:
+                expected = self.timetable.display_teacher_timetable(id_)
+            self.assertEqual(text, expected + "\n")
+            
+    def test_write_all_csv(self):
+        """Test that all views go into one CSV table."""
+        output = io.StringIO()
+        count = TimetableExporter(self.timetable, "csv").write_all(output)
+        self.assertEqual(count, 5)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]["id"], "C1")
+        self.assertEqual(rows[0]["day"], "MONDAY")
+        self.assertEqual(rows[-1]["teacher"], "Ms. <Johnson>")
+        
+    def test_write_all_json_lines(self):
+        """Test that JSON output has one parseable view per line."""
+        output = io.StringIO()
+        TimetableExporter(self.timetable, "json").write_all(output)
+        views = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([v["id"] for v in views], ["C1", "C2", "C/3", "T001", "T002"])
+        self.assertEqual(len(views[3]["entries"]), 2)
+        self.assertIsNone(views[0]["entries"][0]["room"])
+        
+    def test_html_is_escaped(self):
+        """Test that names are escaped in HTML output."""
+        output = io.StringIO()
+        TimetableExporter(self.timetable, "html").write_all(output)
+        self.assertIn("Ms. &lt;Johnson&gt;", output.getvalue())
+        self.assertNotIn("<Johnson>", output.getvalue())
+        
+    def test_export_to_directory(self):
+        """Test that each view is written to its own file."""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = export_timetables(self.timetable, directory, "text", workers=2)
+            self.assertEqual(len(paths), 5)
+            self.assertEqual(sorted(os.listdir(directory)), sorted(
+                ["class_C1.txt", "class_C2.txt", "class_C%2F3.txt",
+                 "teacher_T001.txt", "teacher_T002.txt"]))
+            with open(os.path.join(directory, "class_C%2F3.txt")) as handle:
+                self.assertEqual(handle.read(), "No timetable entries for class C/3\n")
+                
+    def test_export_file_names_are_distinct(self):
+        """Test that ids that would sanitize alike get their own files."""
+        self.timetable.add_class(SchoolClass("C_3", "Grade 10B", 20))
+        with tempfile.TemporaryDirectory() as directory:
+            paths = export_timetables(self.timetable, directory, "text", workers=1)
+            self.assertEqual(len(set(paths)), 6)
+            with open(os.path.join(directory, "class_C_3.txt")) as handle:
+                self.assertEqual(handle.read(), "No timetable entries for class C_3\n")
+                
+    def test_export_ids_differing_in_case(self):
+        """Test that ids differing only in case get distinct file names."""
+        self.timetable.add_class(SchoolClass("c1", "Grade 9C", 20))
+        self.timetable.add_class(SchoolClass("C1+2", "Grade 9D", 20))
+        with tempfile.TemporaryDirectory() as directory:
+            paths = export_timetables(self.timetable, directory, "text", workers=1)
+            names = [os.path.basename(path) for path in paths]
+            self.assertEqual(names[:5], ["class_C1.txt", "class_C2.txt", "class_C%2F3.txt",
+                                         "class_c1+2.txt", "class_C1%2B2.txt"])
+            self.assertEqual(len({name.casefold() for name in names}), len(names))
+            with open(os.path.join(directory, "class_c1+2.txt")) as handle:
+                self.assertEqual(handle.read(), "No timetable entries for class c1\n")
+                
+    def test_unknown_format(self):
+        """Test that an unknown format is rejected."""
+        with self.assertRaises(ValueError):
+            TimetableExporter(self.timetable, "pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Unit tests for streaming timetable import.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from importer import RowError, TimetableImporter, read_rows
+from timetable import Timetable, TimeSlot, DayOfWeek
+
+
+class TestTimetableImporter(unittest.TestCase):
+    """Test cases for TimetableImporter."""
+    
+    def setUp(self):
+        """Set up an empty timetable and a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+        self.timetable = Timetable()
+        self.timetable.add_time_slot(TimeSlot(1, "08:00", "08:50"))
+        self.timetable.add_time_slot(TimeSlot(2, "09:00", "09:50"))
+        self.importer = TimetableImporter(self.timetable, batch_size=2)
+        
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.directory)
+        
+    def write(self, name, text):
+        """Write a file in the temporary directory and return its path."""
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        return path
+        
+    def load_rosters(self):
+        """Import subjects, teachers and classes."""
+        self.importer.import_subjects(self.write(
+            "subjects.csv", "code,name\nMATH,Mathematics\nENG,English\n"))
+        self.importer.import_teachers(self.write(
+            "teachers.jsonl",
+            '{"id": "T001", "name": "Mr. Smith", "subjects": ["MATH"]}\n'
+            '{"id": "T002", "name": "Ms. Johnson", "subjects": "ENG;MATH"}\n'))
+        self.importer.import_classes(self.write(
+            "classes.csv", "id,name,students_count\nC1,Grade 9A,25\nC2,Grade 9B,\n"))
+            
+    def test_read_rows_line_numbers(self):
+        """Test that rows carry their line numbers."""
+        path = self.write("rows.jsonl", '{"a": 1}\n\n{"a": 2}\n')
+        self.assertEqual(list(read_rows(path)), [(1, {"a": 1}), (3, {"a": 2})])
+        path = self.write("rows.csv", "a\n1\n2\n")
+        self.assertEqual([line for line, _ in read_rows(path)], [2, 3])
+        
+    def test_import_rosters(self):
+        """Test importing subjects, teachers and classes."""
+        self.load_rosters()
+        self.assertEqual(self.timetable.subjects["ENG"].name, "English")
+        self.assertEqual(self.timetable.teachers["T002"].subjects, ["ENG", "MATH"])
+        self.assertEqual(self.timetable.classes["C2"].students_count, 0)
+        
+    def test_import_time_slots(self):
+        """Test importing time slots."""
+        report = self.importer.import_time_slots(self.write(
+            "slots.csv", "period,start_time,end_time\n3,10:00,10:50\nx,11:00,11:50\n"))
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(report.errors[0].line, 3)
+        self.assertEqual(self.timetable.time_slots[-1].period, 3)
+        
+    def test_import_entries(self):
+        """Test importing lesson rows with day names, abbreviations and numbers."""
+        self.load_rosters()
+        report = self.importer.import_entries(self.write(
+            "entries.csv",
+            "day,period,class_id,subject_code,teacher_id,room\n"
+            "MONDAY,1,C1,MATH,T001,R101\n"
+            "tue,1,C1,ENG,T002,\n"
+            "4,2,C2,ENG,T002,R102\n"))
+        self.assertTrue(report.ok)
+        self.assertEqual(report.imported, 3)
+        days = [e.day for e in self.timetable.entries]
+        self.assertEqual(days, [DayOfWeek.MONDAY, DayOfWeek.TUESDAY, DayOfWeek.FRIDAY])
+        self.assertIsNone(self.timetable.entries[1].room)
+        
+    def test_undecodable_rows(self):
+        """Test that rows that are not UTF-8 are reported, not raised."""
+        path = os.path.join(self.directory, "rows.csv")
+        with open(path, "wb") as handle:
+            handle.write("a,b\nFR,Fran\xe7ais\nDE,Deutsch\n".encode("latin-1"))
+        self.assertEqual(list(read_rows(path)), [
+            (2, {"__error__": "not valid UTF-8 text"}), (3, {"a": "DE", "b": "Deutsch"})])
+        path = os.path.join(self.directory, "rows.jsonl")
+        with open(path, "wb") as handle:
+            handle.write('{"a": "\xe7"}\n{"a": 1}\n'.encode("latin-1"))
+        report = self.importer.import_subjects(path)
+        self.assertEqual(report.errors[0], RowError(1, "not valid UTF-8 text"))
+        path = os.path.join(self.directory, "header.csv")
+        with open(path, "wb") as handle:
+            handle.write("\xe7\n1\n".encode("latin-1"))
+        with self.assertRaises(ValueError):
+            list(read_rows(path))
+            
+    def test_byte_order_mark(self):
+        """Test that a CSV saved with a byte order mark imports normally."""
+        path = os.path.join(self.directory, "subjects.csv")
+        with open(path, "w", encoding="utf-8-sig") as handle:
+            handle.write("code,name\nFR,Fran\u00e7ais\n")
+        report = self.importer.import_subjects(path)
+        self.assertEqual((report.imported, report.failed), (1, 0))
+        self.assertEqual(self.timetable.subjects["FR"].name, "Fran\u00e7ais")
+        path = os.path.join(self.directory, "rows.jsonl")
+        with open(path, "w", encoding="utf-8-sig") as handle:
+            handle.write('{"a": 1}\n')
+        self.assertEqual(list(read_rows(path)), [(1, {"a": 1})])
+        
+    def test_bad_rows_reported_with_line_numbers(self):
+        """Test that bad and conflicting rows are skipped and reported."""
+        self.load_rosters()
+        report = self.importer.import_entries(self.write(
+            "entries.jsonl",
+            '{"day": "MON", "period": 1, "class_id": "C1", "subject_code": "MATH", "teacher_id": "T001"}\n'
+            '{"day": "Funday", "period": 1, "class_id": "C1", "subject_code": "MATH", "teacher_id": "T001"}\n'
+            '{"day": "MON", "period": 9, "class_id": "C1", "subject_code": "MATH", "teacher_id": "T001"}\n'
+            'not json\n'
+            '{"day": "MON", "period": 1, "class_id": "C2", "subject_code": "MATH", "teacher_id": "T001"}\n'
+            '{"day": "MON", "period": 2, "class_id": "C9", "subject_code": "MATH", "teacher_id": "T001"}\n'
+            '{"day": "MON", "period": 2, "class_id": "C1", "teacher_id": "T001"}\n'))
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(report.failed, 6)
+        self.assertEqual([e.line for e in report.errors], [2, 3, 4, 5, 6, 7])
+        self.assertEqual(report.errors[0], RowError(2, "unknown day 'Funday'"))
+        self.assertEqual(str(report.errors[3]),
+                         "line 5: conflict: teacher already booked on MONDAY period 1")
+        self.assertEqual(str(report.errors[5]), "line 7: missing subject_code")
+        
+    def test_error_list_is_capped(self):
+        """Test that only the first max_errors problems are kept."""
+        importer = TimetableImporter(self.timetable, max_errors=2)
+        report = importer.import_classes(self.write("classes.csv", "id,name\n" + "x,\n" * 5))
+        self.assertEqual(report.failed, 5)
+        self.assertEqual(len(report.errors), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
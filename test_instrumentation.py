@@ -0,0 +1,86 @@
+"""
+Unit tests for timetable instrumentation.
+"""
+
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from instrumentation import _percentile
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for Instrumentation."""
+    
+    def setUp(self):
+        """Set up an instrumented timetable with one entry."""
+        self.timetable = Timetable()
+        self.instrumentation = self.timetable.enable_instrumentation()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        self.timetable.add_time_slot(TimeSlot(1, "08:00", "08:50"))
+        self.entry = TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[0],
+                                    "C1", "MATH", "T001")
+        self.timetable.add_entry(self.entry)
+        
+    def test_counts_calls(self):
+        """Test that calls, including nested ones, are counted."""
+        self.assertFalse(self.timetable.add_entry(self.entry))
+        self.timetable.validate()
+        methods = self.instrumentation.stats()["methods"]
+        self.assertEqual(methods["add_entry"]["calls"], 2)
+        self.assertEqual(methods["has_conflict"]["calls"], 2)
+        self.assertEqual(methods["validate"]["calls"], 1)
+        self.assertNotIn("remove_entry", methods)
+        self.assertLessEqual(methods["add_entry"]["p50"], methods["add_entry"]["max"])
+        
+    def test_gauges_and_caches(self):
+        """Test that sizes and render cache statistics are reported."""
+        self.timetable.enable_render_cache()
+        self.timetable.display_class_timetable("C1")
+        stats = self.instrumentation.stats()
+        self.assertEqual(stats["gauges"]["entries"], 1)
+        self.assertEqual(stats["gauges"]["classes"], 1)
+        self.assertEqual(stats["caches"]["render"]["misses"], 1)
+        
+    def test_detach_and_reset(self):
+        """Test that detaching restores the plain methods."""
+        self.instrumentation.reset()
+        self.assertEqual(self.instrumentation.stats()["methods"], {})
+        self.instrumentation.detach()
+        self.assertIsNone(self.timetable.instrumentation)
+        self.assertNotIn("add_entry", vars(self.timetable))
+        self.timetable.validate()
+        self.assertEqual(self.instrumentation.methods["validate"].calls, 0)
+        
+    def test_profile(self):
+        """Test that a profiled operation is written in pstats format."""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "validate.prof")
+            self.instrumentation.start_profile("validate", path)
+            self.timetable.validate()
+            self.assertEqual(self.instrumentation.stop_profile(), path)
+            functions = {name for _, _, name in pstats.Stats(path).stats}
+            self.assertIn("validate", functions)
+            with self.assertRaises(ValueError):
+                self.instrumentation.start_profile("_insert", path)
+        finally:
+            shutil.rmtree(directory)
+            
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        samples = [float(i) for i in range(1, 101)]
+        self.assertEqual(_percentile(samples, 0.5), 50.0)
+        self.assertEqual(_percentile(samples, 0.99), 99.0)
+        self.assertEqual(_percentile([], 0.5), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
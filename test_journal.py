@@ -0,0 +1,132 @@
+"""
+Unit tests for the change journal.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from storage import TimetableStore
+
+
+def index_state(timetable):
+    """Everything the timetable indexes, in comparable form."""
+    return (
+        sorted(map(str, timetable.entries)),
+        sorted((k[0].value, k[1], k[2], str(v)) for k, v in timetable._teacher_slots.items()),
+        sorted((k[0].value, k[1], k[2], str(v)) for k, v in timetable._class_slots.items()),
+        sorted((k[0].value, k[1], k[2], str(v)) for k, v in timetable._room_slots.items()),
+        {k: len(v) for k, v in timetable._by_class.items()},
+        {k: len(v) for k, v in timetable._by_teacher.items()},
+        {k.name: len(v) for k, v in timetable._by_day.items()},
+        dict(timetable.subjects), dict(timetable.teachers), dict(timetable.classes),
+        [str(slot) for slot in timetable.time_slots],
+    )
+
+
+class TestChangeJournal(unittest.TestCase):
+    """Test cases for ChangeJournal."""
+    
+    def setUp(self):
+        """Set up a journaled timetable with one entry."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        self.timetable.add_class(SchoolClass("C2", "Grade 9B", 28))
+        self.timetable.add_time_slot(TimeSlot(1, "08:00", "08:50"))
+        self.timetable.add_time_slot(TimeSlot(2, "09:00", "09:50"))
+        self.slots = self.timetable.time_slots
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.slots[0], "C1", "MATH", "T001", "R101"))
+        self.journal = self.timetable.enable_journal()
+        self.start = index_state(self.timetable)
+        
+    def make_changes(self):
+        """Add, replace and remove things, one step each."""
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.slots[1], "C2", "MATH", "T001", "R101"))
+        self.timetable.add_teacher(Teacher("T001", "Dr. Smith", ["MATH"]))
+        self.timetable.add_teacher(Teacher("T002", "Ms. Johnson", ["ENG"]))
+        self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1")
+        self.timetable.add_time_slot(TimeSlot(3, "10:00", "10:50"))
+        self.timetable.remove_class("C1")
+        
+    def test_undo_everything_restores_indexes(self):
+        """Test that undoing every step gives back the original indexes."""
+        self.make_changes()
+        changed = index_state(self.timetable)
+        self.assertEqual(len(self.journal), 6)
+        while self.journal.undo():
+            pass
+        self.assertEqual(index_state(self.timetable), self.start)
+        self.assertEqual(self.timetable.validate(), [])
+        while self.journal.redo():
+            pass
+        self.assertEqual(index_state(self.timetable), changed)
+        
+    def test_undo_single_steps(self):
+        """Test undoing a replacement and a removal."""
+        self.make_changes()
+        self.journal.undo()
+        self.assertIn("C1", self.timetable.classes)
+        self.journal.undo()
+        self.journal.undo()
+        self.assertEqual(len(self.timetable.get_entries_for_class("C1")), 1)
+        self.assertFalse(self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.slots[0], "C2", "MATH", "T001")))
+            
+    def test_step_groups_changes(self):
+        """Test that a step block is undone as one."""
+        with self.journal.step():
+            for day in (DayOfWeek.TUESDAY, DayOfWeek.WEDNESDAY):
+                self.timetable.add_entry(TimetableEntry(day, self.slots[0], "C1", "MATH", "T001"))
+        self.assertEqual(len(self.journal), 1)
+        self.journal.undo()
+        self.assertEqual(len(self.timetable.entries), 1)
+        
+    def test_new_change_discards_redo(self):
+        """Test that changing after undo drops the undone steps."""
+        self.make_changes()
+        self.journal.undo()
+        self.assertTrue(self.journal.can_redo)
+        self.timetable.add_subject(Subject("ENG", "English"))
+        self.assertFalse(self.journal.can_redo)
+        self.assertFalse(self.journal.redo())
+        
+    def test_snapshots(self):
+        """Test restoring snapshots backwards and forwards."""
+        start = self.journal.snapshot()
+        self.make_changes()
+        end = self.journal.snapshot()
+        changed = index_state(self.timetable)
+        self.journal.restore(start)
+        self.assertEqual(index_state(self.timetable), self.start)
+        self.journal.restore(end)
+        self.assertEqual(index_state(self.timetable), changed)
+        self.journal.restore(start)
+        self.timetable.add_subject(Subject("ENG", "English"))
+        with self.assertRaises(ValueError):
+            self.journal.restore(end)
+            
+    def test_undo_is_persisted(self):
+        """Test that undone changes reach an attached store."""
+        directory = tempfile.mkdtemp()
+        try:
+            with TimetableStore(os.path.join(directory, "t.db")) as store:
+                store.save(self.timetable)
+                self.make_changes()
+                while self.journal.undo():
+                    pass
+                store.flush()
+                self.assertEqual(index_state(store.load()), self.start)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+Unit tests for the scriptable subcommands.
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from main import run_command, EXIT_OK, EXIT_FAILED, EXIT_USAGE
+
+
+class TestCommands(unittest.TestCase):
+    """Test cases for run_command."""
+    
+    def setUp(self):
+        """Set up a stored school with two subjects, two teachers and a class."""
+        self.directory = tempfile.mkdtemp()
+        self.db = os.path.join(self.directory, "timetable.db")
+        files = {
+            "subjects.csv": "code,name\nMATH,Mathematics\nENG,English\n",
+            "teachers.csv": "id,name,subjects\nT001,Mr. Smith,MATH\nT002,Ms. Johnson,ENG\n",
+            "classes.csv": "id,name,students_count\nC1,Grade 9A,25\n",
+        }
+        for name, text in files.items():
+            with open(os.path.join(self.directory, name), "w") as handle:
+                handle.write(text)
+        for kind in ("subjects", "teachers", "classes"):
+            self.run_json("import", kind, os.path.join(self.directory, kind + ".csv"))
+            
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        
+    def run_command(self, *argv):
+        """Run a subcommand on the test database; returns (exit code, stdout)."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            code = run_command(["--db", self.db, *argv])
+        return code, output.getvalue()
+        
+    def run_json(self, *argv):
+        """Run a subcommand and parse its JSON output."""
+        code, output = self.run_command(*argv)
+        return code, json.loads(output)
+        
+    def test_add_entry_and_validate(self):
+        """Test adding entries, a refused conflict and validation."""
+        code, result = self.run_json("add-entry", "--day", "mon", "--period", "1",
+                                     "--class", "C1", "--subject", "MATH", "--teacher", "T001")
+        self.assertEqual((code, result["added"]), (EXIT_OK, 1))
+        code, result = self.run_json("add-entry", "--day", "Monday", "--period", "1",
+                                     "--class", "C1", "--subject", "ENG", "--teacher", "T002")
+        self.assertEqual((code, result["conflicts"]), (EXIT_FAILED, ["class"]))
+        code, result = self.run_json("validate")
+        self.assertEqual((code, result["valid"], result["entries"]), (EXIT_OK, True, 1))
+        
+    def test_validate_rules(self):
+        """Test the optional rule checks of validate."""
+        self.run_command("add-entry", "--day", "mon", "--period", "1", "--class", "C1",
+                         "--subject", "ENG", "--teacher", "T001")
+        code, result = self.run_json("validate")
+        self.assertEqual(code, EXIT_OK)
+        code, result = self.run_json("validate", "--rules")
+        self.assertEqual(code, EXIT_FAILED)
+        self.assertEqual([v["rule"] for v in result["violations"]], ["qualification"])
+        
+    def test_remove_entry(self):
+        """Test that removing a missing entry fails."""
+        self.run_command("add-entry", "--day", "0", "--period", "2", "--class", "C1",
+                         "--subject", "MATH", "--teacher", "T001")
+        args = ("remove-entry", "--day", "mon", "--period", "2", "--class", "C1")
+        self.assertEqual(self.run_json(*args), (EXIT_OK, {"removed": 1}))
+        self.assertEqual(self.run_json(*args), (EXIT_FAILED, {"removed": 0}))
+        
+    def test_bad_arguments(self):
+        """Test that unknown days and periods are usage errors."""
+        with self.assertRaises(SystemExit) as raised:
+            self.run_command("remove-entry", "--day", "someday", "--period", "1", "--class", "C1")
+        self.assertEqual(raised.exception.code, EXIT_USAGE)
+        code, _ = self.run_command("add-entry", "--day", "mon", "--period", "99", "--class", "C1",
+                                   "--subject", "MATH", "--teacher", "T001")
+        self.assertEqual(code, EXIT_USAGE)
+        
+    def test_generate_show_and_export(self):
+        """Test generating a week, showing a view and exporting every view."""
+        code, result = self.run_json("generate", "MATH=3,ENG=2", "--seed", "1")
+        self.assertEqual((code, result["entries"]), (EXIT_OK, 5))
+        code, result = self.run_json("show", "teacher", "T002", "--format", "json")
+        self.assertEqual((code, len(result["entries"])), (EXIT_OK, 2))
+        code, output = self.run_command("show", "class", "C1")
+        self.assertIn("Timetable for Grade 9A", output)
+        self.assertEqual(self.run_command("show", "class", "C9")[0], EXIT_FAILED)
+        out = os.path.join(self.directory, "out")
+        self.assertEqual(self.run_json("export", out, "--format", "html"),
+                         (EXIT_OK, {"written": 3, "directory": out}))
+                         
+    def test_free_slots(self):
+        """Test listing free slots for a teacher and class."""
+        self.run_command("add-entry", "--day", "mon", "--period", "1", "--class", "C1",
+                         "--subject", "MATH", "--teacher", "T001")
+        code, result = self.run_json("free-slots", "--teacher", "T001", "--class", "C1",
+                                     "--day", "mon", "--limit", "3")
+        self.assertEqual(code, EXIT_OK)
+        self.assertEqual([slot["period"] for slot in result["free"]], [2, 3, 4])
+        
+    def test_cover(self):
+        """Test proposing cover for an absent teacher."""
+        self.run_command("add-entry", "--day", "mon", "--period", "1", "--class", "C1",
+                         "--subject", "MATH", "--teacher", "T001")
+        code, result = self.run_json("cover", "--teacher", "T001", "--from", "2026-10-19",
+                                     "--to", "2026-10-23")
+        self.assertEqual((code, result["uncovered"]), (EXIT_FAILED, 1))
+        self.assertEqual(result["covers"][0]["day"], "MONDAY")
+        code, _ = self.run_command("cover", "--teacher", "T001", "--from", "2026-10-19",
+                                   "--to", "2026-10-18")
+        self.assertEqual(code, EXIT_USAGE)
+        
+    def test_stats(self):
+        """Test that stats reports operation counters and gauges."""
+        self.run_command("generate", "MATH=3,ENG=2", "--seed", "1")
+        code, result = self.run_json("stats", "--repeat", "2", "--render-cache")
+        self.assertEqual(code, EXIT_OK)
+        self.assertEqual(result["methods"]["validate"]["calls"], 2)
+        self.assertEqual(result["gauges"]["entries"], 5)
+        self.assertEqual(result["caches"]["render"]["hits"], 3)
+        self.assertIsNone(result["profile"])
+        
+    def test_import_reports_rejected_rows(self):
+        """Test that rejected import rows give a failing exit code."""
+        path = os.path.join(self.directory, "entries.csv")
+        with open(path, "w") as handle:
+            handle.write("day,period,class_id,subject_code,teacher_id\nMon,1,C9,MATH,T001\n")
+        code, result = self.run_json("import", "entries", path)
+        self.assertEqual((code, result["failed"]), (EXIT_FAILED, 1))
+        self.assertEqual(result["errors"][0]["line"], 2)
+        
+    def test_missing_database(self):
+        """Test that read commands refuse a database that does not exist."""
+        missing = os.path.join(self.directory, "missing.db")
+        for argv in (["validate"], ["show", "class", "C1"], ["free-slots", "--teacher", "T001"]):
+            with self.subTest(command=argv[0]):
+                with contextlib.redirect_stdout(io.StringIO()), \
+                        contextlib.redirect_stderr(io.StringIO()):
+                    code = run_command(["--db", missing, *argv])
+                self.assertEqual(code, EXIT_FAILED)
+                self.assertFalse(os.path.exists(missing))
+                
+    def test_default_slots_not_saved_without_entries(self):
+        """Test that the default time slots are only written with entries using them."""
+        with sqlite3.connect(self.db) as connection:
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM time_slots").fetchone(), (0,))
+        self.run_command("add-entry", "--day", "mon", "--period", "1", "--class", "C1",
+                         "--subject", "MATH", "--teacher", "T001")
+        with sqlite3.connect(self.db) as connection:
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM time_slots").fetchone(), (7,))
+            
+    def test_not_a_database(self):
+        """Test that a file that is not a database fails cleanly."""
+        path = os.path.join(self.directory, "notes.txt")
+        with open(path, "w") as handle:
+            handle.write("not a database\n" * 100)
+        errors = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(errors):
+            code = run_command(["--db", path, "validate"])
+        self.assertEqual(code, EXIT_FAILED)
+        self.assertIn("error:", errors.getvalue())
+        
+    def test_add_entry_unknown_references(self):
+        """Test that entries naming unknown ids are refused and not saved."""
+        code, output = self.run_command("add-entry", "--day", "mon", "--period", "1",
+                                        "--class", "NOPE", "--subject", "XX", "--teacher", "ZZ")
+        self.assertEqual((code, output), (EXIT_FAILED, ""))
+        code, result = self.run_json("validate", "--rules")
+        self.assertEqual((code, result["entries"]), (EXIT_OK, 0))
+        
+    def test_import_undecodable_file(self):
+        """Test that a file that is not UTF-8 fails cleanly."""
+        path = os.path.join(self.directory, "subjects-latin1.csv")
+        with open(path, "wb") as handle:
+            handle.write("code,name\nFR,Fran\xe7ais\nDE,German\n".encode("latin-1"))
+        code, result = self.run_json("import", "subjects", path)
+        self.assertEqual((code, result["imported"]), (EXIT_FAILED, 1))
+        self.assertEqual(result["errors"], [{"line": 2, "message": "not valid UTF-8 text"}])
+        with open(path, "wb") as handle:
+            handle.write("c\xf3digo,name\n".encode("latin-1"))
+        self.assertEqual(self.run_command("import", "subjects", path), (EXIT_FAILED, ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
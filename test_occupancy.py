@@ -0,0 +1,110 @@
+"""
+Unit tests for the bitset occupancy matrix.
+"""
+
+import unittest
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+
+
+class TestOccupancyMatrix(unittest.TestCase):
+    """Test cases for OccupancyMatrix."""
+    
+    def setUp(self):
+        """Set up a timetable with two periods and two entries."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_teacher(Teacher("T002", "Ms. Johnson", ["ENG"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        self.timetable.add_class(SchoolClass("C2", "Grade 9B", 28))
+        self.timetable.add_time_slot(TimeSlot(1, "08:00", "08:50"))
+        self.timetable.add_time_slot(TimeSlot(2, "09:00", "09:50"))
+        self.slots = self.timetable.time_slots
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.slots[0], "C1", "MATH", "T001", "R101"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.slots[1], "C2", "ENG", "T002", "R101"))
+        self.occupancy = self.timetable.enable_occupancy()
+        
+    def test_enable_occupancy_is_idempotent(self):
+        """Test that the timetable keeps a single matrix."""
+        self.assertIs(self.timetable.enable_occupancy(), self.occupancy)
+        
+    def test_built_from_existing_entries(self):
+        """Test that existing entries are loaded into the bitsets."""
+        self.assertFalse(self.occupancy.is_free(DayOfWeek.MONDAY, 1, teacher_id="T001"))
+        self.assertTrue(self.occupancy.is_free(DayOfWeek.MONDAY, 2, teacher_id="T001"))
+        self.assertFalse(self.occupancy.is_free(DayOfWeek.MONDAY, 2, room="R101"))
+        
+    def test_free_slots_intersection(self):
+        """Test slots free for a teacher, a class and a room together."""
+        free = self.occupancy.free_slots(teacher_id="T001", class_id="C2", room="R101")
+        self.assertEqual(len(free), 10 - 2)
+        self.assertNotIn((DayOfWeek.MONDAY, self.slots[0]), free)
+        self.assertNotIn((DayOfWeek.MONDAY, self.slots[1]), free)
+        self.assertIn((DayOfWeek.TUESDAY, self.slots[0]), free)
+        
+    def test_kept_in_sync(self):
+        """Test that adding and removing entries updates the bitsets."""
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.FRIDAY, self.slots[1], "C1", "MATH", "T001"))
+        self.assertEqual(self.occupancy.teacher_load(), {"T001": 2, "T002": 1})
+        self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1")
+        self.assertEqual(self.occupancy.teacher_load(), {"T001": 1, "T002": 1})
+        self.assertEqual(self.occupancy.class_load(), {"C1": 1, "C2": 1})
+        self.assertEqual(self.occupancy.room_usage(), {"R101": 1})
+        
+    def test_new_time_slot(self):
+        """Test that periods added later get their own slots."""
+        self.timetable.add_time_slot(TimeSlot(3, "10:00", "10:50"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.timetable.time_slots[2], "C1", "MATH", "T001"))
+        self.assertFalse(self.occupancy.is_free(DayOfWeek.MONDAY, 3, class_id="C1"))
+        self.assertEqual(len(self.occupancy.free_slots(class_id="C1")), 15 - 2)
+        
+    def test_period_fill(self):
+        """Test the number of lessons running in each slot."""
+        fill = self.occupancy.period_fill()
+        self.assertEqual(fill[(DayOfWeek.MONDAY, 1)], 1)
+        self.assertEqual(fill[(DayOfWeek.TUESDAY, 1)], 0)
+        self.assertEqual(sum(fill.values()), 2)
+        
+    def test_day_mask(self):
+        """Test selecting the slots of a single day."""
+        monday = self.occupancy.day_mask(DayOfWeek.MONDAY)
+        self.assertEqual(self.occupancy.busy_mask(teacher_id="T001") & ~monday, 0)
+        self.assertEqual(len(self.occupancy.slots_in(monday)), 2)
+        
+    def test_find_free_slots_ranking(self):
+        """Test that lighter days come first, then earlier periods."""
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.TUESDAY, self.slots[0], "C1", "ENG", "T002"))
+        free = self.occupancy.find_free_slots(teacher_id="T001", class_id="C1", room="R101")
+        self.assertEqual(len(free), 10 - 3)
+        self.assertEqual(free[0], (DayOfWeek.WEDNESDAY, self.slots[0]))
+        self.assertEqual(free[2], (DayOfWeek.FRIDAY, self.slots[0]))
+        self.assertEqual(free[3], (DayOfWeek.WEDNESDAY, self.slots[1]))
+        # C1 already has a lesson on Tuesday, so Tuesday comes last
+        self.assertEqual(free[-1], (DayOfWeek.TUESDAY, self.slots[1]))
+        
+    def test_find_free_slots_days_and_limit(self):
+        """Test restricting the days and the number of suggestions."""
+        free = self.timetable.find_free_slots("T001", "C1", days=[DayOfWeek.MONDAY, DayOfWeek.FRIDAY],
+                                              limit=2)
+        self.assertEqual(free, [(DayOfWeek.FRIDAY, self.slots[0]),
+                                (DayOfWeek.FRIDAY, self.slots[1])])
+        self.assertEqual(self.timetable.find_free_slots(room="R101", days=[]), [])
+        
+    def test_detach(self):
+        """Test that a detached matrix stops following the timetable."""
+        self.occupancy.detach()
+        self.assertIsNone(self.timetable.occupancy)
+        self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1")
+        self.assertEqual(self.occupancy.teacher_load()["T001"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
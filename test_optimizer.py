@@ -0,0 +1,99 @@
+"""
+Unit tests for the timetable optimizer.
+"""
+
+import unittest
+from collections import Counter
+from optimizer import CostWeights, TimetableOptimizer, optimize_timetable, timetable_cost
+from solver import TimetableSolver
+from test_solver import make_school
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+
+
+def lessons(timetable):
+    """Count lessons by (class, subject, teacher, room), ignoring their slots."""
+    return Counter((e.class_id, e.subject_code, e.teacher_id, e.room)
+                   for e in timetable.entries)
+
+
+class TestTimetableOptimizer(unittest.TestCase):
+    """Test cases for TimetableOptimizer."""
+    
+    def setUp(self):
+        """Set up a small timetable with a teacher gap and a repeated subject."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        for period in range(1, 5):
+            self.timetable.add_time_slot(TimeSlot(period, f"{7 + period:02}:00", f"{7 + period:02}:50"))
+        slots = self.timetable.time_slots
+        self.timetable.add_entry(TimetableEntry(DayOfWeek.MONDAY, slots[0], "C1", "MATH", "T001", "R101"))
+        self.timetable.add_entry(TimetableEntry(DayOfWeek.MONDAY, slots[3], "C1", "MATH", "T001", "R101"))
+        
+    def test_cost(self):
+        """Test the soft cost of gaps and repeated subjects."""
+        optimizer = TimetableOptimizer(self.timetable, CostWeights(1.0, 2.0, 1.0))
+        # Two free periods between the lessons, one repeated subject
+        self.assertEqual(optimizer.cost(), 2 * 1.0 + 1 * 2.0)
+        
+    def test_timetable_cost(self):
+        """Test that timetable_cost scores like the optimizer."""
+        weights = CostWeights(1.0, 2.0, 3.0)
+        self.assertEqual(timetable_cost(self.timetable, weights), 2 * 1.0 + 1 * 2.0)
+        generated = TimetableSolver(*make_school(3, 10)).solve(seed=3)
+        self.assertEqual(timetable_cost(generated, weights, max_daily_lessons=2),
+                         TimetableOptimizer(generated, weights, max_daily_lessons=2).cost())
+                         
+    def test_heavy_day_cost(self):
+        """Test the penalty for lessons above the daily maximum."""
+        optimizer = TimetableOptimizer(self.timetable, CostWeights(0.0, 0.0, 3.0),
+                                       max_daily_lessons=1)
+        self.assertEqual(optimizer.cost(), 3.0)
+        
+    def test_optimize_removes_soft_violations(self):
+        """Test that a small timetable is optimized to zero cost."""
+        optimizer = TimetableOptimizer(self.timetable)
+        result = optimizer.optimize(time_budget=0, seed=1, max_moves=2000)
+        self.assertEqual(optimizer.best_cost, 0.0)
+        self.assertEqual(TimetableOptimizer(result).cost(), 0.0)
+        self.assertEqual(lessons(result), lessons(self.timetable))
+        # The input timetable is left untouched
+        self.assertEqual(len(self.timetable.get_entries_for_day(DayOfWeek.MONDAY)), 2)
+        
+    def test_optimize_requires_budget(self):
+        """Test that an unbounded run is rejected."""
+        with self.assertRaises(ValueError):
+            TimetableOptimizer(self.timetable).optimize(time_budget=0)
+            
+    def test_optimize_generated_school(self):
+        """Test that optimizing keeps hard constraints and lowers the cost."""
+        timetable = TimetableSolver(*make_school(10, 30)).solve(seed=2)
+        optimizer = TimetableOptimizer(timetable)
+        initial = optimizer.cost()
+        result = optimizer.optimize(time_budget=0, seed=2, max_moves=20000)
+        
+        self.assertEqual(result.validate(), [])
+        self.assertEqual(lessons(result), lessons(timetable))
+        self.assertLess(optimizer.best_cost, initial)
+        # The incrementally tracked cost matches a full re-score
+        self.assertAlmostEqual(TimetableOptimizer(result).cost(), optimizer.best_cost)
+        
+    def test_same_seed_same_result(self):
+        """Test that a move budget and seed make optimization reproducible."""
+        timetable = TimetableSolver(*make_school(3, 10)).solve(seed=4)
+        first = TimetableOptimizer(timetable).optimize(time_budget=0, seed=5, max_moves=5000)
+        second = TimetableOptimizer(timetable).optimize(time_budget=0, seed=5, max_moves=5000)
+        self.assertEqual([str(e) for e in first.entries], [str(e) for e in second.entries])
+        
+    def test_optimize_timetable(self):
+        """Test the time-budgeted convenience function."""
+        result = optimize_timetable(self.timetable, time_budget=0.05, seed=1)
+        self.assertEqual(lessons(result), lessons(self.timetable))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for parallel multi-start solving.
+"""
+
+import pickle
+import unittest
+from parallel import (
+    decode_problem, encode_problem, pack_entries, solve_parallel, unpack_entries
+)
+from optimizer import TimetableOptimizer, timetable_cost
+from solver import TimetableSolver
+from test_solver import make_school
+from timetable import Teacher, TimeSlot
+
+
+class TestEncoding(unittest.TestCase):
+    """Test cases for the compact problem and entry encodings."""
+    
+    def test_problem_round_trip(self):
+        """Test that an encoded problem rebuilds the same solver inputs."""
+        classes, teachers, time_slots, requirements = make_school(3, 10)
+        solver = decode_problem(encode_problem(classes, teachers, time_slots, requirements))
+        self.assertEqual(solver.classes, classes)
+        self.assertEqual(solver.teachers, teachers)
+        self.assertEqual(solver.time_slots, time_slots)
+        self.assertEqual(solver.requirements, requirements)
+        
+    def test_encoded_problem_is_smaller(self):
+        """Test that the encoded problem pickles smaller than the objects."""
+        school = make_school(20, 50)
+        self.assertLess(len(pickle.dumps(encode_problem(*school))), len(pickle.dumps(school)))
+        
+    def test_entries_round_trip(self):
+        """Test packing and unpacking generated entries."""
+        school = make_school(3, 10)
+        timetable = TimetableSolver(*school).solve(seed=1)
+        class_ids = [c.id for c in school[0]]
+        teacher_ids = [t.id for t in school[1]]
+        codes = sorted(school[3]["C00"])
+        data = pack_entries(timetable, class_ids, teacher_ids, codes,
+                            [s.period for s in school[2]])
+        self.assertEqual(len(data), len(timetable.entries) * 5 * 2)
+        entries = unpack_entries(data, school[2], class_ids, teacher_ids, codes)
+        self.assertEqual(entries, timetable.entries)
+
+
+class TestSolveParallel(unittest.TestCase):
+    """Test cases for solve_parallel."""
+    
+    def test_pool_matches_inline(self):
+        """Test that a process pool returns the same best result as inline runs."""
+        school = make_school(4, 12)
+        inline = solve_parallel(*school, attempts=3, workers=1, optimize_moves=2000)
+        pooled = solve_parallel(*school, attempts=3, workers=2, optimize_moves=2000)
+        self.assertEqual(pooled.seed, inline.seed)
+        self.assertEqual(pooled.cost, inline.cost)
+        self.assertEqual(pooled.timetable.entries, inline.timetable.entries)
+        self.assertEqual(pooled.solved, 3)
+        
+    def test_best_result(self):
+        """Test that the returned timetable is valid and has the reported cost."""
+        school = make_school(4, 12)
+        result = solve_parallel(*school, attempts=3, workers=1, base_seed=10)
+        self.assertIn(result.seed, (10, 11, 12))
+        self.assertEqual(result.timetable.validate(), [])
+        self.assertEqual(TimetableOptimizer(result.timetable).cost(), result.cost)
+        for seed in (10, 11, 12):
+            other = TimetableSolver(*school).solve(seed=seed)
+            self.assertGreaterEqual(TimetableOptimizer(other).cost(), result.cost)
+            
+    def test_many_periods(self):
+        """Test that more periods than the optimizer supports can be solved without moves."""
+        classes, teachers, _, requirements = make_school(2, 12)
+        time_slots = [TimeSlot(p, f"{p:02}:00", f"{p:02}:50") for p in range(1, 21)]
+        result = solve_parallel(classes, teachers, time_slots, requirements,
+                                attempts=2, workers=1)
+        self.assertEqual(result.solved, 2)
+        self.assertEqual(result.timetable.validate(), [])
+        self.assertEqual(timetable_cost(result.timetable), result.cost)
+        
+    def test_no_solution(self):
+        """Test that None is returned when every attempt fails."""
+        classes, _, time_slots, _ = make_school(2, 0)
+        teachers = [Teacher("T001", "Mr. Smith", ["MATH"])]
+        requirements = {c.id: {"MATH": 20} for c in classes}
+        self.assertIsNone(solve_parallel(classes, teachers, time_slots, requirements,
+                                         attempts=1, workers=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Unit tests for the rendered timetable cache.
+"""
+
+import unittest
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+
+
+class TestRenderCache(unittest.TestCase):
+    """Test cases for RenderCache."""
+    
+    def setUp(self):
+        """Set up a timetable with two classes sharing a teacher."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_subject(Subject("ENG", "English"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_teacher(Teacher("T002", "Ms. Johnson", ["ENG"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        self.timetable.add_class(SchoolClass("C2", "Grade 9B", 28))
+        self.timetable.add_time_slot(TimeSlot(1, "08:00", "08:50"))
+        self.timetable.add_time_slot(TimeSlot(2, "09:00", "09:50"))
+        self.slots = self.timetable.time_slots
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.slots[0], "C1", "MATH", "T001"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.slots[1], "C2", "MATH", "T001"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.slots[0], "C2", "ENG", "T002"))
+        self.cache = self.timetable.enable_render_cache(max_size=3)
+        
+    def render_all(self):
+        """Render every class and teacher view once."""
+        self.timetable.display_class_timetable("C1")
+        self.timetable.display_class_timetable("C2")
+        self.timetable.display_teacher_timetable("T002")
+        
+    def test_hits_and_misses(self):
+        """Test that a repeated render is served from the cache."""
+        first = self.timetable.display_class_timetable("C1")
+        second = self.timetable.display_class_timetable("C1")
+        self.assertEqual(first, second)
+        self.assertEqual(first, self.timetable._render_class_timetable("C1"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        
+    def test_entry_change_drops_only_affected_views(self):
+        """Test that adding an entry drops its class and teacher views."""
+        self.render_all()
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.TUESDAY, self.slots[0], "C1", "ENG", "T002"))
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn("English", self.timetable.display_class_timetable("C1"))
+        self.timetable.display_class_timetable("C2")
+        self.assertEqual(self.cache.hits, 1)
+        
+    def test_reference_change_drops_dependent_views(self):
+        """Test that replacing a teacher drops the views naming them."""
+        self.render_all()
+        self.timetable.add_teacher(Teacher("T001", "Dr. Smith", ["MATH"]))
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn("Dr. Smith", self.timetable.display_class_timetable("C1"))
+        self.timetable.add_subject(Subject("ENG", "English Language"))
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn("English Language", self.timetable.display_teacher_timetable("T002"))
+        
+    def test_not_found_view_invalidated_by_new_class(self):
+        """Test that adding a missing class replaces its cached message."""
+        self.assertIn("not found", self.timetable.display_class_timetable("C9"))
+        self.timetable.add_class(SchoolClass("C9", "Grade 12", 20))
+        self.assertIn("No timetable entries", self.timetable.display_class_timetable("C9"))
+        
+    def test_lru_eviction(self):
+        """Test that the least recently used view is evicted first."""
+        self.render_all()
+        self.timetable.display_class_timetable("C1")
+        self.timetable.display_teacher_timetable("T001")
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(len(self.cache), 3)
+        self.timetable.display_class_timetable("C1")
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        
+    def test_detach(self):
+        """Test that a detached cache is no longer used."""
+        self.cache.detach()
+        self.assertIsNone(self.timetable.render_cache)
+        self.timetable.display_class_timetable("C1")
+        self.assertEqual(self.cache.misses, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Unit tests for the incremental validation rules.
+"""
+
+import unittest
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from rules import RuleEngine, Rule, MaxPeriodsPerDayRule, RoomCapacityRule, default_rules
+
+
+class TestRuleEngine(unittest.TestCase):
+    """Test cases for RuleEngine and the shipped rules."""
+    
+    def setUp(self):
+        """Set up a timetable with two subjects, a teacher and a class."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_subject(Subject("ENG", "English"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 30))
+        self.slots = [TimeSlot(p, f"{7 + p:02d}:00", f"{7 + p:02d}:50") for p in (1, 2, 3)]
+        for slot in self.slots:
+            self.timetable.add_time_slot(slot)
+        self.engine = self.timetable.enable_rules()
+        
+    def entry(self, period=1, subject="MATH", teacher="T001", room=None, class_id="C1"):
+        return TimetableEntry(DayOfWeek.MONDAY, self.slots[period - 1], class_id,
+                              subject, teacher, room)
+                              
+    def test_qualification_follows_entries_and_teachers(self):
+        """Test that qualification violations appear and clear incrementally."""
+        self.assertTrue(self.engine.ok)
+        self.timetable.add_entry(self.entry(subject="ENG"))
+        self.assertEqual([v.rule for v in self.engine.violations], ["qualification"])
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH", "ENG"]))
+        self.assertTrue(self.engine.ok)
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.assertEqual(len(self.engine), 1)
+        self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1")
+        self.assertTrue(self.engine.ok)
+        
+    def test_unknown_references(self):
+        """Test that unknown ids are reported until they are added."""
+        self.timetable.add_entry(self.entry(subject="ART", teacher="T009", class_id="C2"))
+        self.assertEqual(self.engine.messages(), [
+            "Unknown subject ART, teacher T009, class C2 (MONDAY period 1, class C2)"])
+        self.timetable.add_subject(Subject("ART", "Art"))
+        self.timetable.add_class(SchoolClass("C2", "Grade 9B", 20))
+        self.assertEqual(self.engine.messages(), [
+            "Unknown teacher T009 (MONDAY period 1, class C2)"])
+        self.timetable.add_teacher(Teacher("T009", "Ms. Lee", ["ART"]))
+        self.assertTrue(self.engine.ok)
+        self.timetable.remove_subject("ART")
+        self.assertEqual(len(self.engine), 1)
+        
+    def test_max_periods_per_day(self):
+        """Test the daily limit as lessons are added and removed."""
+        self.engine.add_rule(MaxPeriodsPerDayRule(2))
+        for period in (1, 2):
+            self.timetable.add_entry(self.entry(period))
+        self.assertTrue(self.engine.ok)
+        self.timetable.add_entry(self.entry(3))
+        self.assertEqual(self.engine.messages(),
+                         ["Teacher T001 teaches 3 periods on MONDAY (max 2)"])
+        self.timetable.remove_entry(DayOfWeek.MONDAY, 2, "C1")
+        self.assertTrue(self.engine.ok)
+        with self.assertRaises(ValueError):
+            self.engine.add_rule(MaxPeriodsPerDayRule(3))
+            
+    def test_room_capacity(self):
+        """Test capacity violations, including a class that grows."""
+        self.timetable.add_entry(self.entry(room="R1"))
+        self.timetable.add_entry(self.entry(2, room="LAB"))
+        self.engine.add_rule(RoomCapacityRule({"R1": 30, "LAB": 20}))
+        self.assertEqual([v.entry.room for v in self.engine.violations], ["LAB"])
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 31))
+        self.assertEqual(len(self.engine), 2)
+        self.engine.remove_rule("room_capacity")
+        self.assertTrue(self.engine.ok)
+        
+    def test_existing_entries_and_custom_rules(self):
+        """Test an engine built over existing entries with a custom rule."""
+        
+        class NoRoomRule(Rule):
+            name = "no_room"
+            
+            def entry_added(self, engine, entry):
+                if entry.room is None:
+                    engine.report(self.name, id(entry), "No room", entry)
+                    
+            def entry_removed(self, engine, entry):
+                engine.resolve(self.name, id(entry))
+                
+        timetable = Timetable()
+        timetable.add_entry(self.entry())
+        engine = RuleEngine(timetable, default_rules(max_periods_per_day=1) + [NoRoomRule()])
+        self.assertEqual(sorted(v.rule for v in engine.violations), ["no_room", "unknown_reference"])
+        timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1")
+        self.assertTrue(engine.ok)
+        engine.detach()
+        timetable.add_entry(self.entry())
+        self.assertTrue(engine.ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+"""
+Unit tests for the JSON API server, against localhost only.
+"""
+
+import asyncio
+import json
+import unittest
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from server import TimetableServer
+
+
+async def fetch(port, method, path, body=None, keep_alive=None):
+    """Send requests on one connection; returns [(status, headers, body)]."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    requests = keep_alive or [(method, path, body)]
+    responses = []
+    try:
+        for index, (method, path, body) in enumerate(requests):
+            data = b"" if body is None else json.dumps(body).encode()
+            last = index == len(requests) - 1
+            writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                          f"Content-Length: {len(data)}\r\n"
+                          f"Connection: {'close' if last else 'keep-alive'}\r\n\r\n").encode() + data)
+            head = (await reader.readuntil(b"\r\n\r\n")).decode()
+            lines = head.split("\r\n")
+            headers = dict(line.lower().split(": ", 1) for line in lines[1:] if line)
+            if headers.get("transfer-encoding") == "chunked":
+                content = b""
+                while True:
+                    size = int(await reader.readline(), 16)
+                    chunk = await reader.readexactly(size + 2)
+                    if not size:
+                        break
+                    content += chunk[:-2]
+            else:
+                content = await reader.readexactly(int(headers["content-length"]))
+            responses.append((int(lines[0].split()[1]), headers, content))
+    finally:
+        writer.close()
+    return responses
+
+
+class TestTimetableServer(unittest.TestCase):
+    """Test cases for TimetableServer."""
+    
+    def setUp(self):
+        """Set up a small school with one lesson."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        self.timetable.add_class(SchoolClass("C2", "Grade 9B", 25))
+        for period in (1, 2):
+            self.timetable.add_time_slot(TimeSlot(period, f"0{7 + period}:00", f"0{7 + period}:50"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.timetable.time_slots[0], "C1", "MATH", "T001", "R101"))
+            
+    def serve(self, *requests):
+        """Start a server, send requests on one connection, and stop it."""
+        async def run():
+            server = TimetableServer(self.timetable)
+            await server.start()
+            try:
+                return await fetch(server.port, None, None, keep_alive=list(requests))
+            finally:
+                await server.close()
+        return asyncio.run(run())
+        
+    def test_reads(self):
+        """Test the class, teacher, day and free-slot views."""
+        responses = self.serve(("GET", "/classes/C1", None), ("GET", "/teachers/T001?format=text", None),
+                               ("GET", "/days/mon", None), ("GET", "/free-slots?class=C1&day=mon", None),
+                               ("GET", "/classes/C9", None), ("GET", "/days/sunday", None),
+                               ("GET", "/nowhere", None), ("PUT", "/classes", None))
+        statuses = [status for status, _, _ in responses]
+        self.assertEqual(statuses, [200, 200, 200, 200, 404, 400, 404, 405])
+        self.assertEqual(json.loads(responses[0][2])["entries"][0]["room"], "R101")
+        self.assertIn("Timetable for Mr. Smith", responses[1][2].decode())
+        self.assertEqual(len(json.loads(responses[2][2])["entries"]), 1)
+        self.assertEqual(json.loads(responses[3][2])["free"][0]["period"], 2)
+        
+    def test_writes_and_validation(self):
+        """Test adding and removing entries, a conflict and validation."""
+        lesson = {"day": "mon", "period": 1, "class_id": "C2", "subject_code": "MATH",
+                  "teacher_id": "T001"}
+        responses = self.serve(
+            ("POST", "/entries", lesson),
+            ("POST", "/entries", dict(lesson, period=2, subject_code="ART", teacher_id="T009")),
+            ("POST", "/subjects", {"code": "ART", "name": "Art"}),
+            ("POST", "/entries", dict(lesson, period=2, subject_code="ART")),
+            ("GET", "/validate", None),
+            ("DELETE", "/entries/MONDAY/2/C2", None),
+            ("DELETE", "/entries/MONDAY/2/C2", None),
+            ("POST", "/entries", {"day": "mon"}),
+            ("GET", "/validate", None))
+        statuses = [status for status, _, _ in responses]
+        self.assertEqual(statuses, [409, 400, 201, 201, 200, 200, 404, 400, 200])
+        self.assertEqual(json.loads(responses[0][2])["conflicts"], ["teacher"])
+        self.assertEqual(json.loads(responses[1][2])["error"],
+                         "unknown subject 'ART'; unknown teacher 'T009'")
+        report = json.loads(responses[4][2])
+        self.assertFalse(report["valid"])
+        self.assertEqual(len(report["violations"]), 1)
+        self.assertTrue(json.loads(responses[8][2])["valid"])
+        self.assertEqual(len(self.timetable.entries), 1)
+        
+    def test_cached_views_follow_changes(self):
+        """Test that a cached class view is dropped when the class changes."""
+        lesson = {"day": "tue", "period": 1, "class_id": "C1", "subject_code": "MATH",
+                  "teacher_id": "T001"}
+        responses = self.serve(("GET", "/classes/C1", None), ("POST", "/entries", lesson),
+                               ("GET", "/classes/C1", None), ("GET", "/teachers/T001", None),
+                               ("POST", "/classes", {"id": "C1", "name": "Grade 10A"}),
+                               ("GET", "/classes/C1", None))
+        views = [json.loads(body) for _, _, body in responses]
+        self.assertEqual([len(views[i]["entries"]) for i in (0, 2, 3)], [1, 2, 2])
+        self.assertEqual(views[5]["name"], "Grade 10A")
+        
+    def test_streamed_export(self):
+        """Test that exports are streamed with chunked encoding."""
+        (status, headers, content), = self.serve(("GET", "/export?format=json", None))
+        self.assertEqual((status, headers["transfer-encoding"]), (200, "chunked"))
+        views = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([(v["view"], v["id"]) for v in views],
+                         [("class", "C1"), ("class", "C2"), ("teacher", "T001")])
+        (status, _, _), = self.serve(("GET", "/export?format=pdf", None))
+        self.assertEqual(status, 400)
+        
+    def test_responses_sent_outside_write_lock(self):
+        """Test that exports and writes are sent after the write lock is released."""
+        async def run():
+            server = TimetableServer(self.timetable)
+            send = server._send
+            held = []
+            
+            async def recording_send(*args):
+                held.append(server._write_lock.locked())
+                return await send(*args)
+            server._send = recording_send
+            await server.start()
+            try:
+                await fetch(server.port, None, None, keep_alive=[
+                    ("GET", "/export?format=csv", None),
+                    ("POST", "/classes", {"id": "C3", "name": "Grade 9C"})])
+            finally:
+                await server.close()
+            return held
+        self.assertEqual(asyncio.run(run()), [False, False])
+        
+    def test_export_is_a_snapshot(self):
+        """Test that changes made while an export streams do not show up in it."""
+        from exporter import TimetableExporter
+        stream = TimetableExporter(self.timetable, "json").snapshot().stream()
+        first = next(stream)
+        self.timetable.add_class(SchoolClass("C3", "Grade 9C", 25))
+        self.timetable.add_teacher(Teacher("T001", "Mrs. Smith", ["MATH"]))
+        rest = first + "".join(stream)
+        self.assertEqual(len(rest.splitlines()), 3)
+        self.assertNotIn("C3", rest)
+        self.assertIn("Mr. Smith", rest)
+        self.assertNotIn("Mrs. Smith", rest)
+
+
+if __name__ == '__main__':
+    unittest.main()
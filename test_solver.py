@@ -0,0 +1,117 @@
+"""
+Unit tests for the timetable generator.
+"""
+
+import unittest
+from solver import TimetableSolver, generate_timetable, parse_hours
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, DayOfWeek
+)
+
+
+SUBJECT_HOURS = {
+    "MATH": 6, "ENG": 6, "SCI": 5, "HIST": 3, "GEO": 3,
+    "ART": 2, "MUS": 2, "PE": 2, "LANG": 3, "IT": 3,
+}
+
+
+def make_school(class_count, teacher_count):
+    """Build classes, teachers and time slots for a school with a full week."""
+    codes = list(SUBJECT_HOURS)
+    teachers = [
+        Teacher(f"T{i:03}", f"Teacher {i}", [codes[i % len(codes)]])
+        for i in range(teacher_count)
+    ]
+    classes = [SchoolClass(f"C{i:02}", f"Class {i}", 25) for i in range(class_count)]
+    time_slots = [TimeSlot(p, f"{7 + p:02}:00", f"{7 + p:02}:50") for p in range(1, 8)]
+    requirements = {c.id: dict(SUBJECT_HOURS) for c in classes}
+    return classes, teachers, time_slots, requirements
+
+
+class TestParseHours(unittest.TestCase):
+    """Test cases for parse_hours."""
+    
+    def test_parse_hours(self):
+        """Test parsing a weekly hours specification."""
+        self.assertEqual(parse_hours("MATH=5, ENG=4,"), {"MATH": 5, "ENG": 4})
+        
+    def test_parse_hours_invalid(self):
+        """Test that malformed specifications are rejected."""
+        with self.assertRaises(ValueError):
+            parse_hours("MATH")
+        with self.assertRaises(ValueError):
+            parse_hours("MATH=five")
+
+
+class TestTimetableSolver(unittest.TestCase):
+    """Test cases for TimetableSolver."""
+    
+    def test_generates_required_hours_without_conflicts(self):
+        """Test that every class gets its hours from qualified teachers."""
+        classes, teachers, time_slots, requirements = make_school(4, 12)
+        timetable = generate_timetable(classes, teachers, time_slots, requirements,
+                                       [Subject("MATH", "Mathematics")], seed=1)
+                                       
+        self.assertIsNotNone(timetable)
+        self.assertEqual(timetable.validate(), [])
+        self.assertEqual(len(timetable.entries), 4 * sum(SUBJECT_HOURS.values()))
+        self.assertIn("MATH", timetable.subjects)
+        for school_class in classes:
+            counts = {}
+            for entry in timetable.get_entries_for_class(school_class.id):
+                counts[entry.subject_code] = counts.get(entry.subject_code, 0) + 1
+                teacher = timetable.teachers[entry.teacher_id]
+                self.assertIn(entry.subject_code, teacher.subjects)
+            self.assertEqual(counts, SUBJECT_HOURS)
+            
+    def test_same_seed_same_timetable(self):
+        """Test that a seed makes generation reproducible."""
+        school = make_school(3, 10)
+        first = TimetableSolver(*school).solve(seed=7)
+        second = TimetableSolver(*school).solve(seed=7)
+        self.assertEqual([str(e) for e in first.entries], [str(e) for e in second.entries])
+        
+    def test_from_timetable(self):
+        """Test generating from the data held by an existing timetable."""
+        timetable = Timetable()
+        timetable.add_subject(Subject("MATH", "Mathematics"))
+        timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH"]))
+        timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        timetable.add_time_slot(TimeSlot(1, "08:00", "08:50"))
+        
+        result = TimetableSolver.from_timetable(timetable, {"C1": {"MATH": 5}}).solve()
+        days = [entry.day for entry in result.entries]
+        self.assertEqual(sorted(days, key=lambda d: d.value), list(DayOfWeek))
+        
+    def test_unqualified_subject(self):
+        """Test that a subject nobody can teach is rejected."""
+        classes, teachers, time_slots, _ = make_school(1, 10)
+        with self.assertRaises(ValueError):
+            TimetableSolver(classes, teachers, time_slots, {"C00": {"DRAMA": 1}})
+            
+    def test_too_many_hours(self):
+        """Test that more lessons than weekly slots are rejected."""
+        classes, teachers, time_slots, _ = make_school(1, 10)
+        with self.assertRaises(ValueError):
+            TimetableSolver(classes, teachers, time_slots, {"C00": {"MATH": 36}})
+            
+    def test_infeasible_returns_none(self):
+        """Test that an over-subscribed teacher yields no timetable."""
+        classes, _, time_slots, _ = make_school(2, 0)
+        teachers = [Teacher("T001", "Mr. Smith", ["MATH"])]
+        requirements = {c.id: {"MATH": 20} for c in classes}
+        solver = TimetableSolver(classes, teachers, time_slots, requirements)
+        self.assertIsNone(solver.solve(seed=1, max_attempts=2))
+        
+    def test_full_school(self):
+        """Test filling a 60-class, 150-teacher school with a packed week."""
+        school = make_school(60, 150)
+        timetable = TimetableSolver(*school).solve(seed=3)
+        self.assertIsNotNone(timetable)
+        self.assertEqual(len(timetable.entries), 60 * 35)
+        self.assertEqual(timetable.validate(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Unit tests for SQLite timetable storage.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from storage import TimetableStore
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+
+
+class TestTimetableStore(unittest.TestCase):
+    """Test cases for TimetableStore."""
+    
+    def setUp(self):
+        """Set up a sample timetable and a temporary database path."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "timetable.db")
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_teacher(Teacher("T001", "Mr. Smith", ["MATH", "SCI"]))
+        self.timetable.add_teacher(Teacher("T002", "Ms. Johnson"))
+        self.timetable.add_class(SchoolClass("C1", "Grade 9A", 25))
+        self.timetable.add_time_slot(TimeSlot(1, "08:00", "08:50"))
+        self.timetable.add_time_slot(TimeSlot(2, "09:00", "09:50"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, self.timetable.time_slots[0], "C1", "MATH", "T001", "R101"))
+        self.timetable.add_entry(TimetableEntry(
+            DayOfWeek.FRIDAY, self.timetable.time_slots[1], "C1", "MATH", "T001"))
+            
+    def tearDown(self):
+        """Remove the temporary database."""
+        shutil.rmtree(self.directory)
+        
+    def reload(self):
+        """Load the database from a fresh connection."""
+        with TimetableStore(self.path) as store:
+            return store.load()
+            
+    def test_save_and_load(self):
+        """Test that a saved timetable loads back unchanged."""
+        with TimetableStore(self.path) as store:
+            store.save(self.timetable)
+        loaded = self.reload()
+        
+        self.assertEqual(loaded.subjects, self.timetable.subjects)
+        self.assertEqual(loaded.teachers, self.timetable.teachers)
+        self.assertEqual(loaded.classes, self.timetable.classes)
+        self.assertEqual(loaded.time_slots, self.timetable.time_slots)
+        self.assertEqual(loaded.entries, self.timetable.entries)
+        # Loaded entries are fully indexed
+        self.assertFalse(loaded.add_entry(TimetableEntry(
+            DayOfWeek.MONDAY, loaded.time_slots[0], "C2", "ENG", "T002", "R101")))
+            
+    def test_incremental_writes(self):
+        """Test that changes after save() reach the database."""
+        with TimetableStore(self.path) as store:
+            store.save(self.timetable)
+            self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1")
+            self.timetable.add_entry(TimetableEntry(
+                DayOfWeek.TUESDAY, self.timetable.time_slots[0], "C1", "MATH", "T001"))
+            self.timetable.add_teacher(Teacher("T002", "Ms. Johnson", ["ENG"]))
+            self.timetable.add_time_slot(TimeSlot(3, "10:00", "10:50"))
+        loaded = self.reload()
+        
+        self.assertEqual([str(e) for e in loaded.entries],
+                         ["FRIDAY 2: MATH - T001 in TBA", "TUESDAY 1: MATH - T001 in TBA"])
+        self.assertEqual(loaded.teachers["T002"].subjects, ["ENG"])
+        self.assertEqual([s.period for s in loaded.time_slots], [1, 2, 3])
+        
+    def test_writes_are_batched(self):
+        """Test that changes are queued until a batch fills up."""
+        store = TimetableStore(self.path, batch_size=3)
+        store.save(self.timetable)
+        self.timetable.add_subject(Subject("ENG", "English"))
+        self.timetable.add_subject(Subject("SCI", "Science"))
+        self.assertEqual(len(self.reload().subjects), 1)
+        self.timetable.add_subject(Subject("HIST", "History"))
+        self.assertEqual(len(self.reload().subjects), 4)
+        store.close()
+        
+    def test_load_follows_changes(self):
+        """Test that a loaded timetable keeps writing to its store."""
+        with TimetableStore(self.path) as store:
+            store.save(self.timetable)
+        with TimetableStore(self.path) as store:
+            loaded = store.load()
+            loaded.remove_entry(DayOfWeek.FRIDAY, 2, "C1")
+        self.assertEqual(len(self.reload().entries), 1)
+        
+    def test_detach(self):
+        """Test that a detached timetable is no longer written."""
+        store = TimetableStore(self.path)
+        store.save(self.timetable)
+        store.detach()
+        self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1")
+        store.close()
+        self.assertEqual(len(self.reload().entries), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
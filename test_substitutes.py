@@ -0,0 +1,88 @@
+"""
+Unit tests for the substitute teacher finder.
+"""
+
+import unittest
+from datetime import date
+from timetable import (
+    Timetable, Subject, Teacher, SchoolClass,
+    TimeSlot, TimetableEntry, DayOfWeek
+)
+from substitutes import SubstituteFinder, school_days
+
+
+# A Monday
+MONDAY = date(2026, 10, 19)
+
+
+class TestSubstituteFinder(unittest.TestCase):
+    """Test cases for SubstituteFinder."""
+    
+    def setUp(self):
+        """Set up an absent maths teacher, two other maths teachers and an English teacher."""
+        self.timetable = Timetable()
+        self.timetable.add_subject(Subject("MATH", "Mathematics"))
+        self.timetable.add_subject(Subject("ENG", "English"))
+        self.slots = [TimeSlot(p, f"{7 + p:02d}:00", f"{7 + p:02d}:50") for p in (1, 2, 3)]
+        for slot in self.slots:
+            self.timetable.add_time_slot(slot)
+        for class_id in ("C1", "C2", "C3"):
+            self.timetable.add_class(SchoolClass(class_id, class_id, 25))
+        self.timetable.add_teacher(Teacher("T001", "Absent", ["MATH"]))
+        self.timetable.add_teacher(Teacher("T002", "Busy", ["MATH"]))
+        self.timetable.add_teacher(Teacher("T003", "Spare", ["MATH", "ENG"]))
+        self.timetable.add_teacher(Teacher("T004", "English", ["ENG"]))
+        self.finder = SubstituteFinder(self.timetable)
+        
+    def add(self, day, period, class_id, teacher_id, subject="MATH"):
+        self.assertTrue(self.timetable.add_entry(TimetableEntry(
+            day, self.slots[period - 1], class_id, subject, teacher_id)))
+            
+    def test_school_days(self):
+        """Test that weekends are skipped and bad ranges are refused."""
+        days = school_days(MONDAY, date(2026, 10, 27))
+        self.assertEqual(len(days), 7)
+        self.assertEqual(days[5], (date(2026, 10, 26), DayOfWeek.MONDAY))
+        self.assertEqual(school_days(date(2026, 10, 24)), [])
+        with self.assertRaises(ValueError):
+            school_days(MONDAY, date(2026, 10, 18))
+            
+    def test_qualified_index_follows_teachers(self):
+        """Test the subject index after replacing and removing teachers."""
+        self.assertEqual(self.finder.qualified("MATH"), ["T001", "T002", "T003"])
+        self.timetable.add_teacher(Teacher("T004", "English", ["ENG", "MATH"]))
+        self.timetable.remove_teacher("T002")
+        self.assertEqual(self.finder.qualified("MATH"), ["T001", "T003", "T004"])
+        self.assertEqual(self.finder.qualified("ART"), [])
+        
+    def test_only_free_qualified_teachers(self):
+        """Test that busy and unqualified teachers are never proposed."""
+        self.add(DayOfWeek.MONDAY, 1, "C1", "T001")
+        self.add(DayOfWeek.MONDAY, 1, "C2", "T003", "ENG")
+        covers = self.finder.find_cover("T001", MONDAY)
+        self.assertEqual(len(covers), 1)
+        self.assertEqual(covers[0].substitute, "T002")
+        self.assertEqual(covers[0].candidates, ["T002"])
+        self.add(DayOfWeek.MONDAY, 1, "C3", "T002")
+        covers = self.finder.find_cover("T001", MONDAY)
+        self.assertIsNone(covers[0].substitute)
+        
+    def test_cover_is_spread(self):
+        """Test that cover alternates between equally free teachers."""
+        for period in (1, 2, 3):
+            self.add(DayOfWeek.MONDAY, period, "C1", "T001")
+        # T002 teaches once on Monday, so T003 is proposed first
+        self.add(DayOfWeek.TUESDAY, 1, "C2", "T003")
+        self.add(DayOfWeek.MONDAY, 3, "C2", "T002")
+        covers = self.finder.find_cover("T001", MONDAY, date(2026, 10, 26))
+        self.assertEqual([(c.date.day, c.entry.time_slot.period, c.substitute) for c in covers],
+                         [(19, 1, "T003"), (19, 2, "T002"), (19, 3, "T003"),
+                          (26, 1, "T002"), (26, 2, "T003"), (26, 3, "T003")])
+        counts = {"T003": 10}
+        covers = self.finder.find_cover("T001", MONDAY, cover_counts=counts)
+        self.assertEqual([c.substitute for c in covers], ["T002", "T002", "T003"])
+        self.assertEqual(counts, {"T002": 2, "T003": 11})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ Unit tests for the school timetable application.
 import unittest
 from timetable import (
     Timetable, Subject, Teacher, SchoolClass, 
-    TimeSlot, TimetableEntry, DayOfWeek
+    TimeSlot, TimetableEntry, DayOfWeek, EntryConflict
 )
 
 
@@ -177,6 +177,50 @@ class TestTimetable(unittest.TestCase):
         self.assertFalse(result)
         self.assertEqual(len(self.timetable.entries), 1)
         
+    def test_add_entry_room_conflict(self):
+        """Test that adding an entry with room conflict fails."""
+        entry1 = TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C1",
+            "MATH",
+            "T001",
+            "LAB1"
+        )
+        self.timetable.add_entry(entry1)
+        
+        # Try to add conflicting entry (same room, same time)
+        entry2 = TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C2",
+            "ENG",
+            "T002",
+            "LAB1"
+        )
+        result = self.timetable.add_entry(entry2)
+        self.assertFalse(result)
+        self.assertEqual(len(self.timetable.entries), 1)
+        
+    def test_add_entry_without_room_never_conflicts(self):
+        """Test that entries without a room (TBA) never clash on rooms."""
+        entry1 = TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C1",
+            "MATH",
+            "T001"
+        )
+        entry2 = TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C2",
+            "ENG",
+            "T002"
+        )
+        self.assertTrue(self.timetable.add_entry(entry1))
+        self.assertTrue(self.timetable.add_entry(entry2))
+        
     def test_add_entry_no_conflict(self):
         """Test adding entries without conflicts."""
         entry1 = TimetableEntry(
@@ -203,6 +247,67 @@ class TestTimetable(unittest.TestCase):
         self.assertTrue(result2)
         self.assertEqual(len(self.timetable.entries), 2)
         
+    def test_add_entries(self):
+        """Test adding a batch of entries."""
+        entries = [
+            TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[0], "C1", "MATH", "T001", "R101"),
+            TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[0], "C2", "ENG", "T002", "R102"),
+            TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[1], "C1", "ENG", "T002", "R101"),
+        ]
+        report = self.timetable.add_entries(entries)
+        self.assertTrue(report.ok)
+        self.assertEqual(report.added, 3)
+        self.assertEqual(self.timetable.entries, entries)
+        
+    def test_add_entries_atomic_conflict(self):
+        """Test that an atomic batch with a conflict adds nothing."""
+        existing = TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[0], "C1", "MATH", "T001")
+        self.timetable.add_entry(existing)
+        batch = [
+            TimetableEntry(DayOfWeek.TUESDAY, self.timetable.time_slots[0], "C1", "MATH", "T001", "LAB1"),
+            # Clashes with the existing entry
+            TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[0], "C2", "MATH", "T001"),
+            # Clashes with the first entry of the batch
+            TimetableEntry(DayOfWeek.TUESDAY, self.timetable.time_slots[0], "C2", "ENG", "T002", "LAB1"),
+        ]
+        report = self.timetable.add_entries(batch)
+        
+        self.assertFalse(report.ok)
+        self.assertEqual(report.added, 0)
+        self.assertEqual(report.conflicts, [
+            EntryConflict(1, batch[1], ["teacher"]),
+            EntryConflict(2, batch[2], ["room"]),
+        ])
+        self.assertEqual(self.timetable.entries, [existing])
+        # The slots claimed by the rejected batch are free again
+        self.assertTrue(self.timetable.add_entry(batch[0]))
+        
+    def test_add_entries_non_atomic(self):
+        """Test that a non-atomic batch adds every entry that fits."""
+        batch = [
+            TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[0], "C1", "MATH", "T001"),
+            TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[0], "C1", "ENG", "T001"),
+            TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[1], "C1", "ENG", "T002"),
+        ]
+        report = self.timetable.add_entries(iter(batch), atomic=False)
+        self.assertEqual(report.added, 2)
+        self.assertEqual([c.index for c in report.conflicts], [1])
+        self.assertEqual(report.conflicts[0].reasons, ["teacher", "class"])
+        self.assertEqual(self.timetable.entries, [batch[0], batch[2]])
+        
+    def test_add_entries_failing_iterable(self):
+        """Test that a batch whose iterable raises leaves no slots claimed."""
+        def batch():
+            yield TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[0], "C1", "MATH", "T001")
+            raise ValueError("bad row")
+            
+        with self.assertRaises(ValueError):
+            self.timetable.add_entries(batch())
+        self.assertEqual(self.timetable.entries, [])
+        self.assertFalse(self.timetable.has_conflict(TimetableEntry(
+            DayOfWeek.MONDAY, self.timetable.time_slots[0], "C1", "ENG", "T002")))
+        self.assertFalse(self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1"))
+        
     def test_remove_entry(self):
         """Test removing a timetable entry."""
         entry = TimetableEntry(
@@ -219,11 +324,79 @@ class TestTimetable(unittest.TestCase):
         self.assertTrue(result)
         self.assertEqual(len(self.timetable.entries), 0)
         
+    def test_entries_read_only(self):
+        """Test that changing the entries list fails instead of being lost."""
+        entry = TimetableEntry(DayOfWeek.MONDAY, self.timetable.time_slots[0],
+                               "C1", "MATH", "T001", "R101")
+        self.timetable.add_entry(entry)
+        entries = self.timetable.entries
+        self.assertEqual(entries, [entry])
+        self.assertEqual(len(self.timetable), 1)
+        with self.assertRaises(TypeError):
+            entries.append(entry)
+        with self.assertRaises(TypeError):
+            del entries[0]
+        copy = entries.copy()
+        copy.append(entry)
+        self.assertEqual(len(copy), 2)
+        self.assertEqual(len(self.timetable), 1)
+        
     def test_remove_nonexistent_entry(self):
         """Test removing a non-existent entry."""
         result = self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1")
         self.assertFalse(result)
         
+    def test_remove_entry_frees_slot(self):
+        """Test that removing an entry frees the teacher and class slot."""
+        entry = TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C1",
+            "MATH",
+            "T001",
+            "R101"
+        )
+        self.timetable.add_entry(entry)
+        self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1")
+        
+        # Same teacher in another class, and same class with another teacher
+        entry2 = TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C2",
+            "MATH",
+            "T001"
+        )
+        entry3 = TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C1",
+            "ENG",
+            "T002"
+        )
+        self.assertTrue(self.timetable.add_entry(entry2))
+        self.assertTrue(self.timetable.add_entry(entry3))
+        
+    def test_conflict_different_day_same_period(self):
+        """Test that the same period on another day is not a conflict."""
+        entry1 = TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C1",
+            "MATH",
+            "T001"
+        )
+        entry2 = TimetableEntry(
+            DayOfWeek.TUESDAY,
+            self.timetable.time_slots[0],
+            "C1",
+            "MATH",
+            "T001"
+        )
+        self.assertTrue(self.timetable.add_entry(entry1))
+        self.assertFalse(self.timetable.has_conflict(entry2))
+        self.assertTrue(self.timetable.add_entry(entry2))
+        
     def test_get_entries_for_class(self):
         """Test getting entries for a specific class."""
         entry1 = TimetableEntry(
@@ -310,6 +483,59 @@ class TestTimetable(unittest.TestCase):
         self.assertEqual(len(monday_entries), 1)
         self.assertEqual(monday_entries[0].day, DayOfWeek.MONDAY)
         
+    def test_indexes_follow_removal(self):
+        """Test that query indexes stay consistent after removals."""
+        entry1 = TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C1",
+            "MATH",
+            "T001"
+        )
+        entry2 = TimetableEntry(
+            DayOfWeek.TUESDAY,
+            self.timetable.time_slots[1],
+            "C2",
+            "MATH",
+            "T001"
+        )
+        self.timetable.add_entry(entry1)
+        self.timetable.add_entry(entry2)
+        
+        self.assertTrue(self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1"))
+        self.assertEqual(self.timetable.entries, [entry2])
+        self.assertEqual(self.timetable.get_entries_for_class("C1"), [])
+        self.assertEqual(self.timetable.get_entries_for_teacher("T001"), [entry2])
+        self.assertEqual(self.timetable.get_entries_for_day(DayOfWeek.MONDAY), [])
+        self.assertEqual(self.timetable.get_entries_for_day(DayOfWeek.TUESDAY), [entry2])
+        
+    def test_remove_loaded_clashes(self):
+        """Test that slot indexes stay in step when clashing entries are loaded and removed."""
+        slot = self.timetable.time_slots[0]
+        first = TimetableEntry(DayOfWeek.MONDAY, slot, "C1", "MATH", "T001", "R101")
+        second = TimetableEntry(DayOfWeek.MONDAY, slot, "C2", "ENG", "T001", "R101")
+        # As storage.load() does: stored entries are loaded without checks
+        self.timetable._insert(first)
+        self.timetable._insert(second)
+        self.assertEqual(len(self.timetable.validate()), 2)
+        probe = TimetableEntry(DayOfWeek.MONDAY, slot, "C3", "ENG", "T001")
+        self.assertTrue(self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C1"))
+        # The second entry still holds the teacher and room
+        self.assertTrue(self.timetable.has_conflict(probe))
+        self.assertIs(self.timetable._teacher_slots[DayOfWeek.MONDAY, 1, "T001"], second)
+        self.assertEqual(self.timetable.validate(), [])
+        self.assertTrue(self.timetable.remove_entry(DayOfWeek.MONDAY, 1, "C2"))
+        self.assertFalse(self.timetable.has_conflict(probe))
+        self.assertEqual(self.timetable._teacher_slots, {})
+        self.assertEqual(self.timetable._room_slots, {})
+        self.assertEqual(self.timetable._shadowed, {})
+        # Removing the later entry first leaves the first in place
+        self.timetable._insert(first)
+        self.timetable._insert(second)
+        self.timetable._remove(second)
+        self.assertIs(self.timetable._room_slots[DayOfWeek.MONDAY, 1, "R101"], first)
+        self.assertEqual(self.timetable._shadowed, {})
+        
     def test_validate_valid_timetable(self):
         """Test validation of a valid timetable."""
         entry1 = TimetableEntry(
@@ -333,6 +559,53 @@ class TestTimetable(unittest.TestCase):
         errors = self.timetable.validate()
         self.assertEqual(len(errors), 0)
         
+    def test_validate_reports_each_conflict_once(self):
+        """Test that validation reports each double booking once."""
+        # Bypass add_entry so the conflicts reach the timetable
+        for class_id in ("C1", "C2", "C3"):
+            self.timetable._insert(TimetableEntry(
+                DayOfWeek.MONDAY,
+                self.timetable.time_slots[0],
+                class_id,
+                "MATH",
+                "T001"
+            ))
+        self.timetable._insert(TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C1",
+            "ENG",
+            "T002"
+        ))
+        
+        errors = self.timetable.validate()
+        self.assertEqual(errors, [
+            "Teacher T001 has conflict on MONDAY period 1",
+            "Class C1 has conflict on MONDAY period 1",
+        ])
+        
+    def test_validate_reports_room_conflict(self):
+        """Test that validation reports rooms booked twice."""
+        self.timetable._insert(TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C1",
+            "MATH",
+            "T001",
+            "LAB1"
+        ))
+        self.timetable._insert(TimetableEntry(
+            DayOfWeek.MONDAY,
+            self.timetable.time_slots[0],
+            "C2",
+            "ENG",
+            "T002",
+            "LAB1"
+        ))
+        
+        errors = self.timetable.validate()
+        self.assertEqual(errors, ["Room LAB1 has conflict on MONDAY period 1"])
+        
     def test_display_class_timetable(self):
         """Test displaying a class timetable."""
         entry = TimetableEntry(
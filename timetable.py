@@ -3,11 +3,18 @@ School Timetable Application
 Core data models for managing school timetables.
 """
 
+import sys
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Set
+from typing import Callable, List, Dict, Iterable, Optional, Set, Tuple
 from enum import Enum
 
 
+# Model objects use __slots__ where dataclasses support it (Python 3.10+),
+# which drops the per-instance __dict__ that dominates memory per entry;
+# other modules pass it to their own model dataclasses the same way
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
 class DayOfWeek(Enum):
     """Days of the week for scheduling."""
     MONDAY = 0
@@ -15,9 +22,13 @@ class DayOfWeek(Enum):
     WEDNESDAY = 2
     THURSDAY = 3
     FRIDAY = 4
+    
+    # Members are singletons, so identity hashing agrees with equality and
+    # is much cheaper than Enum's name-based __hash__ in the slot indexes.
+    __hash__ = object.__hash__
 
 
-@dataclass
+@dataclass(**SLOTS)
 class TimeSlot:
     """Represents a time slot in the school day."""
     period: int
@@ -28,7 +39,7 @@ class TimeSlot:
         return f"Period {self.period} ({self.start_time}-{self.end_time})"
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Subject:
     """Represents a school subject."""
     code: str
@@ -38,7 +49,7 @@ class Subject:
         return f"{self.code} - {self.name}"
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Teacher:
     """Represents a teacher."""
     id: str
@@ -49,7 +60,7 @@ class Teacher:
         return f"{self.name} ({self.id})"
 
 
-@dataclass
+@dataclass(**SLOTS)
 class SchoolClass:
     """Represents a class/grade."""
     id: str
@@ -60,7 +71,7 @@ class SchoolClass:
         return f"{self.name} ({self.students_count} students)"
 
 
-@dataclass
+@dataclass(**SLOTS)
 class TimetableEntry:
     """Represents a single entry in the timetable."""
     day: DayOfWeek
@@ -75,31 +86,270 @@ class TimetableEntry:
                 f"{self.subject_code} - {self.teacher_id} in {self.room or 'TBA'}")
 
 
+@dataclass
+class EntryConflict:
+    """An entry from a batch that could not be added."""
+    index: int
+    entry: TimetableEntry
+    reasons: List[str]  # "teacher", "class" and/or "room"
+    
+    def __str__(self):
+        return f"#{self.index} {self.entry}: {', '.join(self.reasons)} already booked"
+
+
+@dataclass
+class BatchReport:
+    """Outcome of Timetable.add_entries()."""
+    added: int = 0
+    conflicts: List[EntryConflict] = field(default_factory=list)
+    
+    @property
+    def ok(self) -> bool:
+        """True if no entry of the batch conflicted."""
+        return not self.conflicts
+
+
+class EntryList(list):
+    """
+    The list returned by Timetable.entries: a copy of the entries, so
+    changing it could not change the timetable. It refuses to be changed
+    rather than silently dropping the change; use add_entry() and
+    remove_entry() instead. Copies and pickles are plain lists.
+    """
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Timetable.entries is read-only; "
+                        "use add_entry() and remove_entry() to change the timetable")
+                        
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    
+    def __reduce__(self):
+        return list, (list(self),)
+        
+    def copy(self) -> List["TimetableEntry"]:
+        return list(self)
+
+
+class TimetableObserver:
+    """
+    Base class for objects that follow changes to a Timetable.
+    Subclasses override the notifications they care about.
+    """
+    
+    def entry_added(self, entry: TimetableEntry) -> None:
+        """Called after an entry has been stored."""
+        
+    def entry_removed(self, entry: TimetableEntry) -> None:
+        """Called after an entry has been removed."""
+        
+    def time_slot_added(self, time_slot: TimeSlot) -> None:
+        """Called after a time slot has been added."""
+        
+    def subject_added(self, subject: Subject, previous: Optional[Subject]) -> None:
+        """Called after a subject has been added or replaced."""
+        
+    def teacher_added(self, teacher: Teacher, previous: Optional[Teacher]) -> None:
+        """Called after a teacher has been added or replaced."""
+        
+    def class_added(self, school_class: SchoolClass, previous: Optional[SchoolClass]) -> None:
+        """Called after a class has been added or replaced."""
+        
+    def time_slot_removed(self, time_slot: TimeSlot) -> None:
+        """Called after a time slot has been removed."""
+        
+    def subject_removed(self, subject: Subject) -> None:
+        """Called after a subject has been removed."""
+        
+    def teacher_removed(self, teacher: Teacher) -> None:
+        """Called after a teacher has been removed."""
+        
+    def class_removed(self, school_class: SchoolClass) -> None:
+        """Called after a class has been removed."""
+
+
 class Timetable:
     """Main timetable class that manages all scheduling."""
     
     def __init__(self):
-        self.entries: List[TimetableEntry] = []
+        # Entries in insertion order, keyed by id() so removal is O(1)
+        self._entries: Dict[int, TimetableEntry] = {}
         self.subjects: Dict[str, Subject] = {}
         self.teachers: Dict[str, Teacher] = {}
         self.classes: Dict[str, SchoolClass] = {}
         self.time_slots: List[TimeSlot] = []
+        # Slot occupancy indexes, keyed by (day, period, teacher/class/room id)
+        self._teacher_slots: Dict[Tuple[DayOfWeek, int, str], TimetableEntry] = {}
+        self._class_slots: Dict[Tuple[DayOfWeek, int, str], TimetableEntry] = {}
+        self._room_slots: Dict[Tuple[DayOfWeek, int, str], TimetableEntry] = {}
+        # Entries loaded into an already held slot, keyed by ("teacher",
+        # "class" or "room",) + slot key, in load order; one takes the slot
+        # over when its holder is removed. Empty unless clashes were loaded
+        self._shadowed: Dict[tuple, List[TimetableEntry]] = {}
+        # Secondary indexes backing the get_entries_for_* queries
+        self._by_class: Dict[str, Dict[int, TimetableEntry]] = {}
+        self._by_teacher: Dict[str, Dict[int, TimetableEntry]] = {}
+        self._by_day: Dict[DayOfWeek, Dict[int, TimetableEntry]] = {}
+        self._observers: List[TimetableObserver] = []
+        # Optional bitset occupancy backend, see enable_occupancy()
+        self.occupancy = None
+        # Optional cache of rendered views, see enable_render_cache()
+        self.render_cache = None
+        # Optional operation timing, see enable_instrumentation()
+        self.instrumentation = None
+        # Optional undo/redo history, see enable_journal()
+        self.journal = None
+        # Optional live rule violations, see enable_rules()
+        self.rule_engine = None
+        # Optional reader-writer locking, see enable_thread_safety()
+        self.thread_safety = None
+        
+    @property
+    def entries(self) -> List[TimetableEntry]:
+        """
+        All timetable entries, in the order they were added, as a new
+        read-only EntryList. Use len(timetable) for just the count.
+        """
+        return EntryList(self._entries.values())
+        
+    def __len__(self) -> int:
+        """Number of entries, in O(1)."""
+        return len(self._entries)
+        
+    def add_observer(self, observer: TimetableObserver) -> None:
+        """Register an observer to be notified of entry changes."""
+        self._observers.append(observer)
+        
+    def remove_observer(self, observer: TimetableObserver) -> None:
+        """Stop notifying an observer."""
+        self._observers.remove(observer)
+        
+    def enable_occupancy(self):
+        """
+        Attach a bitset occupancy matrix that is kept in sync with every
+        mutation, and return it. Calling it again returns the same matrix.
+        """
+        if self.occupancy is None:
+            from occupancy import OccupancyMatrix
+            self.occupancy = OccupancyMatrix(self)
+        return self.occupancy
+        
+    def enable_render_cache(self, max_size: int = 256):
+        """
+        Cache the output of display_class_timetable() and
+        display_teacher_timetable(), and return the cache. Calling it again
+        returns the same cache.
+        """
+        if self.render_cache is None:
+            from render_cache import RenderCache
+            self.render_cache = RenderCache(self, max_size)
+        return self.render_cache
+        
+    def enable_instrumentation(self, sample_size: int = 10000):
+        """
+        Start timing the public operations of this timetable, and return
+        the Instrumentation holding the counters. Calling it again returns
+        the same object.
+        """
+        if self.instrumentation is None:
+            from instrumentation import Instrumentation
+            self.instrumentation = Instrumentation(self, sample_size)
+        return self.instrumentation
+        
+    def enable_journal(self):
+        """
+        Start recording every change in a ChangeJournal, which supports
+        undo, redo and snapshots, and return it. Calling it again returns
+        the same journal.
+        """
+        if self.journal is None:
+            from journal import ChangeJournal
+            self.journal = ChangeJournal(self)
+        return self.journal
+        
+    def enable_rules(self, rules=None):
+        """
+        Keep the violations of validation rules (by default the
+        qualification and unknown-reference rules) up to date with every
+        change, and return the RuleEngine holding them. Calling it again
+        returns the same engine; pass further rules to engine.add_rule().
+        """
+        if self.rule_engine is None:
+            from rules import RuleEngine
+            self.rule_engine = RuleEngine(self, rules)
+        return self.rule_engine
+        
+    def enable_thread_safety(self):
+        """
+        Guard the public operations with a reader-writer lock so several
+        threads can share this timetable, and return the ThreadSafety
+        holding the lock. Calling it again returns the same object.
+        """
+        if self.thread_safety is None:
+            from concurrency import ThreadSafety
+            self.thread_safety = ThreadSafety(self)
+        return self.thread_safety
         
     def add_subject(self, subject: Subject) -> None:
         """Add a subject to the timetable."""
+        previous = self.subjects.get(subject.code)
         self.subjects[subject.code] = subject
-        
+        for observer in self._observers:
+            observer.subject_added(subject, previous)
+            
     def add_teacher(self, teacher: Teacher) -> None:
         """Add a teacher to the timetable."""
+        previous = self.teachers.get(teacher.id)
         self.teachers[teacher.id] = teacher
-        
+        for observer in self._observers:
+            observer.teacher_added(teacher, previous)
+            
     def add_class(self, school_class: SchoolClass) -> None:
         """Add a class to the timetable."""
+        previous = self.classes.get(school_class.id)
         self.classes[school_class.id] = school_class
-        
+        for observer in self._observers:
+            observer.class_added(school_class, previous)
+            
     def add_time_slot(self, time_slot: TimeSlot) -> None:
         """Add a time slot to the timetable."""
         self.time_slots.append(time_slot)
+        for observer in self._observers:
+            observer.time_slot_added(time_slot)
+            
+    def remove_subject(self, code: str) -> Optional[Subject]:
+        """Remove a subject; returns it, or None if unknown. Entries are kept."""
+        subject = self.subjects.pop(code, None)
+        if subject is not None:
+            for observer in self._observers:
+                observer.subject_removed(subject)
+        return subject
+        
+    def remove_teacher(self, teacher_id: str) -> Optional[Teacher]:
+        """Remove a teacher; returns it, or None if unknown. Entries are kept."""
+        teacher = self.teachers.pop(teacher_id, None)
+        if teacher is not None:
+            for observer in self._observers:
+                observer.teacher_removed(teacher)
+        return teacher
+        
+    def remove_class(self, class_id: str) -> Optional[SchoolClass]:
+        """Remove a class; returns it, or None if unknown. Entries are kept."""
+        school_class = self.classes.pop(class_id, None)
+        if school_class is not None:
+            for observer in self._observers:
+                observer.class_removed(school_class)
+        return school_class
+        
+    def remove_time_slot(self, time_slot: TimeSlot) -> bool:
+        """Remove a time slot (the same object that was added). Entries are kept."""
+        for index, existing in enumerate(self.time_slots):
+            if existing is time_slot:
+                del self.time_slots[index]
+                for observer in self._observers:
+                    observer.time_slot_removed(time_slot)
+                return True
+        return False
         
     def add_entry(self, entry: TimetableEntry) -> bool:
         """
@@ -108,50 +358,215 @@ class Timetable:
         """
         if self.has_conflict(entry):
             return False
-        self.entries.append(entry)
+        self._insert(entry)
         return True
         
+    def add_entries(self, entries: Iterable[TimetableEntry], atomic: bool = True) -> BatchReport:
+        """
+        Add a batch of entries, checking them against the timetable and
+        against each other in one indexed pass.
+        With atomic=True nothing is added if any entry conflicts; otherwise
+        the non-conflicting entries are added. The report lists every
+        conflicting entry with its position in the batch.
+        """
+        teacher_slots, class_slots, room_slots = (
+            self._teacher_slots, self._class_slots, self._room_slots)
+        accepted: List[TimetableEntry] = []
+        report = BatchReport()
+        
+        def release() -> None:
+            # Free the slots claimed by this batch
+            for entry in accepted:
+                day, period = entry.day, entry.time_slot.period
+                del teacher_slots[(day, period, entry.teacher_id)]
+                del class_slots[(day, period, entry.class_id)]
+                if entry.room is not None:
+                    del room_slots[(day, period, entry.room)]
+                    
+        # Accepted entries claim their slots straight away, so later entries
+        # of the batch are checked against them by the same lookups.
+        try:
+            for index, entry in enumerate(entries):
+                day, period, room = entry.day, entry.time_slot.period, entry.room
+                teacher_key = (day, period, entry.teacher_id)
+                class_key = (day, period, entry.class_id)
+                room_key = (day, period, room)
+                reasons = []
+                if teacher_key in teacher_slots:
+                    reasons.append("teacher")
+                if class_key in class_slots:
+                    reasons.append("class")
+                if room is not None and room_key in room_slots:
+                    reasons.append("room")
+                if reasons:
+                    report.conflicts.append(EntryConflict(index, entry, reasons))
+                    continue
+                teacher_slots[teacher_key] = entry
+                class_slots[class_key] = entry
+                if room is not None:
+                    room_slots[room_key] = entry
+                accepted.append(entry)
+        except BaseException:
+            # The batch could not be read to the end (or an entry was
+            # malformed): nothing of it is added
+            release()
+            raise
+            
+        if report.conflicts and atomic:
+            release()
+            return report
+        for entry in accepted:
+            self._store(entry)
+        report.added = len(accepted)
+        return report
+        
+    def reference_errors(self, entry: TimetableEntry) -> List[str]:
+        """
+        Why an entry's ids are invalid: an unknown class, subject or
+        teacher, or a blank room. Rooms are not registered, so any other
+        room is accepted. Empty if the entry can be added.
+        """
+        errors = []
+        if entry.class_id not in self.classes:
+            errors.append(f"unknown class '{entry.class_id}'")
+        if entry.subject_code not in self.subjects:
+            errors.append(f"unknown subject '{entry.subject_code}'")
+        if entry.teacher_id not in self.teachers:
+            errors.append(f"unknown teacher '{entry.teacher_id}'")
+        if entry.room is not None and not entry.room.strip():
+            errors.append("blank room")
+        return errors
+        
     def has_conflict(self, new_entry: TimetableEntry) -> bool:
         """
         Check if a new entry conflicts with existing entries.
         Conflicts occur when:
         - Same teacher is scheduled at the same time
         - Same class is scheduled at the same time
+        - Same room is booked at the same time (entries without a room never clash)
         """
-        for entry in self.entries:
-            if entry.day == new_entry.day and entry.time_slot.period == new_entry.time_slot.period:
-                # Check teacher conflict
-                if entry.teacher_id == new_entry.teacher_id:
-                    return True
-                # Check class conflict
-                if entry.class_id == new_entry.class_id:
-                    return True
+        day, period = new_entry.day, new_entry.time_slot.period
+        # Check teacher conflict
+        if (day, period, new_entry.teacher_id) in self._teacher_slots:
+            return True
+        # Check class conflict
+        if (day, period, new_entry.class_id) in self._class_slots:
+            return True
+        # Check room conflict
+        if new_entry.room is not None and (day, period, new_entry.room) in self._room_slots:
+            return True
         return False
         
     def remove_entry(self, day: DayOfWeek, period: int, class_id: str) -> bool:
         """Remove an entry from the timetable. Returns True if found and removed."""
-        for i, entry in enumerate(self.entries):
-            if (entry.day == day and 
-                entry.time_slot.period == period and 
-                entry.class_id == class_id):
-                self.entries.pop(i)
-                return True
-        return False
+        entry = self._class_slots.get((day, period, class_id))
+        if entry is None:
+            return False
+        self._remove(entry)
+        return True
+        
+    def _insert(self, entry: TimetableEntry) -> None:
+        """Store an entry and record it in every index, without conflict checks."""
+        day, period = entry.day, entry.time_slot.period
+        key = (day, period, entry.teacher_id)
+        if self._teacher_slots.setdefault(key, entry) is not entry:
+            self._shadowed.setdefault(("teacher",) + key, []).append(entry)
+        key = (day, period, entry.class_id)
+        if self._class_slots.setdefault(key, entry) is not entry:
+            self._shadowed.setdefault(("class",) + key, []).append(entry)
+        if entry.room is not None:
+            key = (day, period, entry.room)
+            if self._room_slots.setdefault(key, entry) is not entry:
+                self._shadowed.setdefault(("room",) + key, []).append(entry)
+        self._store(entry)
+        
+    def _store(self, entry: TimetableEntry) -> None:
+        """Record an already slot-indexed entry in the entry and query indexes."""
+        key = id(entry)
+        self._entries[key] = entry
+        # Unrolled: this runs once per entry on every bulk load
+        bucket = self._by_class.get(entry.class_id)
+        if bucket is None:
+            bucket = self._by_class[entry.class_id] = {}
+        bucket[key] = entry
+        bucket = self._by_teacher.get(entry.teacher_id)
+        if bucket is None:
+            bucket = self._by_teacher[entry.teacher_id] = {}
+        bucket[key] = entry
+        bucket = self._by_day.get(entry.day)
+        if bucket is None:
+            bucket = self._by_day[entry.day] = {}
+        bucket[key] = entry
+        for observer in self._observers:
+            observer.entry_added(entry)
+            
+    def _remove(self, entry: TimetableEntry) -> None:
+        """Drop a stored entry from the timetable and every index."""
+        key = id(entry)
+        day, period = entry.day, entry.time_slot.period
+        del self._entries[key]
+        for label, slots, slot_key in (
+                ("teacher", self._teacher_slots, (day, period, entry.teacher_id)),
+                ("class", self._class_slots, (day, period, entry.class_id)),
+                ("room", self._room_slots, (day, period, entry.room))):
+            waiting = self._shadowed.get((label,) + slot_key) if self._shadowed else None
+            if slots.get(slot_key) is entry:
+                if waiting:
+                    slots[slot_key] = waiting.pop(0)
+                else:
+                    del slots[slot_key]
+            elif waiting:
+                for index, other in enumerate(waiting):
+                    if other is entry:
+                        del waiting[index]
+                        break
+            if waiting is not None and not waiting:
+                del self._shadowed[(label,) + slot_key]
+        for index, index_key in ((self._by_class, entry.class_id),
+                                 (self._by_teacher, entry.teacher_id),
+                                 (self._by_day, entry.day)):
+            bucket = index[index_key]
+            del bucket[key]
+            if not bucket:
+                del index[index_key]
+        for observer in self._observers:
+            observer.entry_removed(entry)
+            
+    def find_free_slots(self, teacher_id: Optional[str] = None, class_id: Optional[str] = None,
+                        room: Optional[str] = None, days: Optional[Iterable[DayOfWeek]] = None,
+                        limit: Optional[int] = None) -> List[Tuple[DayOfWeek, TimeSlot]]:
+        """
+        Slots where the given teacher, class and room are all free, best
+        first (see OccupancyMatrix.find_free_slots). The first call enables
+        the occupancy matrix.
+        """
+        return self.enable_occupancy().find_free_slots(teacher_id, class_id, room, days, limit)
         
     def get_entries_for_class(self, class_id: str) -> List[TimetableEntry]:
         """Get all timetable entries for a specific class."""
-        return [entry for entry in self.entries if entry.class_id == class_id]
+        return list(self._by_class.get(class_id, {}).values())
         
     def get_entries_for_teacher(self, teacher_id: str) -> List[TimetableEntry]:
         """Get all timetable entries for a specific teacher."""
-        return [entry for entry in self.entries if entry.teacher_id == teacher_id]
+        return list(self._by_teacher.get(teacher_id, {}).values())
         
     def get_entries_for_day(self, day: DayOfWeek) -> List[TimetableEntry]:
         """Get all timetable entries for a specific day."""
-        return [entry for entry in self.entries if entry.day == day]
+        return list(self._by_day.get(day, {}).values())
         
     def display_class_timetable(self, class_id: str) -> str:
         """Generate a formatted timetable display for a class."""
+        if self.render_cache is not None:
+            return self.render_cache.render("class", class_id)
+        return self._render_class_timetable(class_id)
+        
+    def display_teacher_timetable(self, teacher_id: str) -> str:
+        """Generate a formatted timetable display for a teacher."""
+        if self.render_cache is not None:
+            return self.render_cache.render("teacher", teacher_id)
+        return self._render_teacher_timetable(teacher_id)
+        
+    def _render_class_timetable(self, class_id: str) -> str:
         if class_id not in self.classes:
             return f"Class {class_id} not found"
             
@@ -172,16 +587,17 @@ class Timetable:
                 output.append(f"\n{entry.day.name}")
                 output.append("-" * 70)
                 
-            subject_name = self.subjects.get(entry.subject_code, Subject(entry.subject_code, entry.subject_code)).name
-            teacher_name = self.teachers.get(entry.teacher_id, Teacher(entry.teacher_id, entry.teacher_id)).name
+            subject = self.subjects.get(entry.subject_code)
+            subject_name = subject.name if subject is not None else entry.subject_code
+            teacher = self.teachers.get(entry.teacher_id)
+            teacher_name = teacher.name if teacher is not None else entry.teacher_id
             room = entry.room or "TBA"
             
             output.append(f"  {entry.time_slot} | {subject_name:20} | {teacher_name:20} | Room: {room}")
             
         return "\n".join(output)
         
-    def display_teacher_timetable(self, teacher_id: str) -> str:
-        """Generate a formatted timetable display for a teacher."""
+    def _render_teacher_timetable(self, teacher_id: str) -> str:
         if teacher_id not in self.teachers:
             return f"Teacher {teacher_id} not found"
             
@@ -202,8 +618,10 @@ class Timetable:
                 output.append(f"\n{entry.day.name}")
                 output.append("-" * 70)
                 
-            subject_name = self.subjects.get(entry.subject_code, Subject(entry.subject_code, entry.subject_code)).name
-            class_name = self.classes.get(entry.class_id, SchoolClass(entry.class_id, entry.class_id)).name
+            subject = self.subjects.get(entry.subject_code)
+            subject_name = subject.name if subject is not None else entry.subject_code
+            school_class = self.classes.get(entry.class_id)
+            class_name = school_class.name if school_class is not None else entry.class_id
             room = entry.room or "TBA"
             
             output.append(f"  {entry.time_slot} | {subject_name:20} | {class_name:20} | Room: {room}")
@@ -217,20 +635,81 @@ class Timetable:
         """
         errors = []
         
-        # Check for conflicts (shouldn't happen if add_entry is used properly)
-        for i, entry1 in enumerate(self.entries):
-            for entry2 in self.entries[i+1:]:
-                if (entry1.day == entry2.day and 
-                    entry1.time_slot.period == entry2.time_slot.period):
-                    if entry1.teacher_id == entry2.teacher_id:
-                        errors.append(
-                            f"Teacher {entry1.teacher_id} has conflict on "
-                            f"{entry1.day.name} period {entry1.time_slot.period}"
-                        )
-                    if entry1.class_id == entry2.class_id:
-                        errors.append(
-                            f"Class {entry1.class_id} has conflict on "
-                            f"{entry1.day.name} period {entry1.time_slot.period}"
-                        )
-                        
+        # Check for conflicts (shouldn't happen if add_entry is used properly).
+        # Occupied (day, period, id) slots are collected in a single pass and
+        # each double booking is reported once, when its second entry is seen.
+        seen_teachers: Set[Tuple[DayOfWeek, int, str]] = set()
+        seen_classes: Set[Tuple[DayOfWeek, int, str]] = set()
+        seen_rooms: Set[Tuple[DayOfWeek, int, str]] = set()
+        reported: Set[Tuple[str, DayOfWeek, int, str]] = set()
+        for entry in self._entries.values():
+            day, period = entry.day, entry.time_slot.period
+            
+            teacher_key = (day, period, entry.teacher_id)
+            if teacher_key not in seen_teachers:
+                seen_teachers.add(teacher_key)
+            elif ("teacher",) + teacher_key not in reported:
+                reported.add(("teacher",) + teacher_key)
+                errors.append(
+                    f"Teacher {entry.teacher_id} has conflict on "
+                    f"{day.name} period {period}"
+                )
+                
+            class_key = (day, period, entry.class_id)
+            if class_key not in seen_classes:
+                seen_classes.add(class_key)
+            elif ("class",) + class_key not in reported:
+                reported.add(("class",) + class_key)
+                errors.append(
+                    f"Class {entry.class_id} has conflict on "
+                    f"{day.name} period {period}"
+                )
+                
+            # Entries without a room are TBA and never clash
+            if entry.room is None:
+                continue
+            room_key = (day, period, entry.room)
+            if room_key not in seen_rooms:
+                seen_rooms.add(room_key)
+            elif ("room",) + room_key not in reported:
+                reported.add(("room",) + room_key)
+                errors.append(
+                    f"Room {entry.room} has conflict on "
+                    f"{day.name} period {period}"
+                )
+                
         return errors
+
+
+def wrap_method(timetable: Timetable, name: str, make_wrapper: Callable) -> Callable:
+    """
+    Shadow a method of one timetable with make_wrapper(current), where
+    current is whatever the attribute is now (the plain method or another
+    wrapper). The wrapper must call its own __wrapped__ attribute, which
+    is set here, so that unwrap_method() can later take it out of the
+    chain whatever was wrapped around it since. Returns the wrapper.
+    """
+    current = getattr(timetable, name)
+    wrapper = make_wrapper(current)
+    wrapper.__name__ = name
+    wrapper.__wrapped__ = current
+    setattr(timetable, name, wrapper)
+    return wrapper
+
+
+def unwrap_method(timetable: Timetable, name: str, wrapper: Callable) -> None:
+    """Remove a wrapper installed by wrap_method(), keeping any others."""
+    inner = wrapper.__wrapped__
+    outer = timetable.__dict__.get(name)
+    if outer is wrapper:
+        if getattr(inner, "__self__", None) is timetable:
+            # The plain method was wrapped: drop the instance attribute
+            del timetable.__dict__[name]
+        else:
+            setattr(timetable, name, inner)
+        return
+    while outer is not None:
+        if getattr(outer, "__wrapped__", None) is wrapper:
+            outer.__wrapped__ = inner
+            return
+        outer = getattr(outer, "__wrapped__", None)